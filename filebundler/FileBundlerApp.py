@@ -1,11 +1,10 @@
 # filebundler/FileBundlerApp.py
+import time
 import asyncio
 import logging
-import logfire
-import streamlit as st
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # from filebundler.features import tasks
 from filebundler.features.sort_files import sort_files
@@ -18,10 +17,10 @@ from filebundler.managers.BundleManager import BundleManager
 from filebundler.managers.SelectionsManager import SelectionsManager
 from filebundler.managers.ProjectSettingsManager import ProjectSettingsManager
 
-from filebundler.ui.notification import show_temp_notification
+from filebundler.utils.notifications import show_temp_notification
+from filebundler.utils import profiler, tracing
 
 
-logfire.configure(send_to_logfire='if-token-present', console=False)
 logger = logging.getLogger(__name__)
 
 
@@ -90,6 +89,9 @@ class FileBundlerApp(AppProtocol):
         """
         Refresh the project by reloading the directory structure and selections.
         """
+        # only the web app refreshes, headless commands never import streamlit
+        import streamlit as st
+
         self.__init__(self.project_path)
         st.rerun()
 
@@ -97,6 +99,18 @@ class FileBundlerApp(AppProtocol):
     def highest_token_item(self):
         return self._highest_token_item
 
+    def update_highest_token_item(self, counted_files: Iterable[Tuple[FileItem, int]]):
+        """
+        Set the file with the most tokens from already counted files, e.g. after
+        an index noticed changed files.
+
+        Args:
+            counted_files: (file item, token count) of every file of the project
+        """
+        self._highest_token_item = max(
+            counted_files, key=lambda counted: counted[1], default=(None, 0)
+        )[0]
+
     @property
     def nr_of_files(self):
         return len([fi for fi in self.file_items.values() if not fi.is_dir])
@@ -117,12 +131,14 @@ class FileBundlerApp(AppProtocol):
             bool: True if directory has visible content, False otherwise
         """
         try:
-            with logfire.span(
+            with tracing.span(
                 "loading directory {dir_path}",
+                detail=True,
                 dir_path=dir_path.relative_to(self.project_path),
                 _level="debug",
             ):
                 # Iterate directory
+                filter_start = time.perf_counter_ns()
                 filtered_filepaths: List[Path] = []
                 for filepath in dir_path.iterdir():
                     rel_path = filepath.relative_to(self.project_path).as_posix()
@@ -130,12 +146,15 @@ class FileBundlerApp(AppProtocol):
                         rel_path, self.psm.project_settings.include_patterns
                     ):
                         filtered_filepaths.append(filepath)
+                sort_start = time.perf_counter_ns()
+                profiler.record("filter", sort_start - filter_start)
 
                 # Apply max_files limit with warning
                 if len(filtered_filepaths) > self.psm.project_settings.max_files:
-                    st.warning(
+                    show_temp_notification(
                         f"Directory contains {len(filtered_filepaths)} files, exceeding limit of {self.psm.project_settings.max_files}. "
-                        f"Truncating to {self.psm.project_settings.max_files} files."
+                        f"Truncating to {self.psm.project_settings.max_files} files.",
+                        "warning",
                     )
                     sorted_filepaths = sort_files(
                         filtered_filepaths, self.psm.project_settings
@@ -144,6 +163,7 @@ class FileBundlerApp(AppProtocol):
                     sorted_filepaths = sort_files(
                         filtered_filepaths, self.psm.project_settings
                     )
+                profiler.record("sort", time.perf_counter_ns() - sort_start)
 
                 has_visible_content = False
                 subdirectory_tasks: List[Tuple[Path, FileItem]] = []
@@ -210,7 +230,9 @@ class FileBundlerApp(AppProtocol):
                 return has_visible_content
 
         except Exception as e:
-            st.error(f"Error loading directory {dir_path}: {str(e)}")
+            show_temp_notification(
+                f"Error loading directory {dir_path}: {str(e)}", "error"
+            )
             return False
 
     def load_directory_recursive(self, dir_path: Path, parent_item: FileItem):
@@ -224,7 +246,8 @@ class FileBundlerApp(AppProtocol):
         Returns:
             bool: True if directory has visible content, False otherwise
         """
-        return asyncio.run(self._load_directory_recursive_async(dir_path, parent_item))
+        with profiler.phase("scan"):
+            return asyncio.run(self._load_directory_recursive_async(dir_path, parent_item))
 
     def paths_to_file_items(self, paths: List[Path]):
         file_items: List[FileItem] = []
@@ -5,6 +5,7 @@ import logfire
 import streamlit as st
 
 from filebundler import constants
+from filebundler.utils import tracing
 
 from filebundler.state import initialize_session_state
 
@@ -42,6 +43,7 @@ def cleanup():
 
 def main():
     logfire.configure(send_to_logfire="if-token-present")
+    tracing.configure(env_settings.trace_granularity, env_settings.trace_sample_rate)
 
     """The actual Streamlit application logic"""
     try:
@@ -2,7 +2,7 @@
 import os
 
 from typing import Literal, Optional
-from pydantic import field_validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +13,10 @@ class EnvironmentSettings(BaseSettings):
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "WARNING"
     anthropic_api_key: Optional[str] = None
     gemini_api_key: Optional[str] = None
+    # logfire spans: "coarse" records phases, "full" also every directory, bundle file, etc.
+    trace_granularity: Literal["off", "coarse", "full"] = "coarse"
+    # share of traces sent to logfire
+    trace_sample_rate: float = Field(default=1.0, ge=0, le=1)
 
     @field_validator("log_level", mode="before")
     def validate_log_level(cls, value: str) -> str:
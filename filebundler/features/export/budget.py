@@ -0,0 +1,90 @@
+# filebundler/features/export/budget.py
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import OverflowStrategy
+
+# a truncated file that keeps less than this is not worth sending
+MIN_TRUNCATED_TOKENS = 50
+
+
+@dataclass
+class BudgetCostModel:
+    """How many tokens each part of an export costs, in the export's format"""
+
+    # tokens of a file's content
+    content_tokens: Callable[[FileItem], int]
+    # tokens of the markup wrapping a file's content
+    section_overhead: Callable[[FileItem], int]
+    # tokens of the line listing a file that was left out
+    omitted_listing: Callable[[FileItem], int]
+    # the first max_tokens tokens of a file's content, ending on a line boundary
+    truncate: Callable[[FileItem, int], str]
+    count_tokens: Callable[[str], int]
+
+
+@dataclass
+class BudgetPlan:
+    # files exported whole
+    included: List[FileItem] = field(default_factory=list)
+    # files exported partially, mapped to the content that fits
+    truncated: Dict[FileItem, str] = field(default_factory=dict)
+    # files left out of the export
+    dropped: List[FileItem] = field(default_factory=list)
+    used_tokens: int = 0
+
+
+def plan_token_budget(
+    ranked_items: List[FileItem],
+    token_budget: int,
+    overflow: OverflowStrategy,
+    costs: BudgetCostModel,
+) -> BudgetPlan:
+    """
+    Decide which files fit into a token budget.
+
+    Files are taken whole in ranked order. With the "truncate" strategy the
+    first file that doesn't fit is cut to fill the remaining budget and every
+    file after it is dropped; with "omit" files that don't fit are dropped and
+    smaller files further down the ranking may still get in. The listing of
+    dropped files is paid for out of the same budget: every file's listing is
+    reserved up front and given back when the file gets in, so a file is only
+    taken if the listing of the files after it still fits.
+
+    Args:
+        ranked_items: Files from most to least important
+        token_budget: Tokens available for the files (fixed export overhead already deducted)
+        overflow: What to do with files that don't fit whole
+        costs: Token costs of the export format
+
+    Returns:
+        BudgetPlan describing the included, truncated and dropped files
+    """
+    plan = BudgetPlan()
+    listings = {file_item: costs.omitted_listing(file_item) for file_item in ranked_items}
+    remaining = token_budget - sum(listings.values())
+    overflowed: List[FileItem] = []
+
+    for file_item in ranked_items:
+        cost = costs.content_tokens(file_item) + costs.section_overhead(file_item)
+        if cost - listings[file_item] <= remaining and (overflow == "omit" or not overflowed):
+            plan.included.append(file_item)
+            remaining -= cost - listings[file_item]
+        else:
+            overflowed.append(file_item)
+
+    if overflow == "truncate" and overflowed:
+        candidate = overflowed[0]
+        # the candidate is no longer listed as omitted if it gets truncated
+        room = remaining + listings[candidate] - costs.section_overhead(candidate)
+        if room >= MIN_TRUNCATED_TOKENS:
+            truncated_content = costs.truncate(candidate, room)
+            if truncated_content:
+                plan.truncated[candidate] = truncated_content
+                overflowed = overflowed[1:]
+                remaining = room - costs.count_tokens(truncated_content)
+
+    plan.dropped = overflowed
+    plan.used_tokens = token_budget - remaining
+    return plan
@@ -0,0 +1,94 @@
+# filebundler/features/export/delta.py
+"""
+Delta exports: only the files that changed since the last export of a bundle,
+or since a git revision.
+"""
+
+import logging
+import subprocess
+
+from pathlib import Path
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+
+logger = logging.getLogger(__name__)
+
+
+def changed_since_time(file_items: List[FileItem], since: datetime) -> List[FileItem]:
+    """Files modified after `since` (naive datetimes are local time, like ExportStats.last_exported)"""
+    cutoff = since.timestamp()
+    return [fi for fi in file_items if fi.path.stat().st_mtime > cutoff]
+
+
+def git_changed_paths(project_path: Path, revision: str) -> Set[str]:
+    """
+    Paths (relative to project_path) that differ from `revision` in the working
+    tree, including untracked files that aren't ignored.
+
+    Raises:
+        ValueError: if project_path isn't in a git repository or the revision is unknown
+    """
+
+    def run_git(*args: str) -> List[str]:
+        try:
+            completed = subprocess.run(
+                ["git", "-C", str(project_path), *args],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except FileNotFoundError:
+            raise ValueError("git is not installed, can't export changes since a revision")
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git {' '.join(args)} failed: {e.stderr.strip()}")
+        return [line for line in completed.stdout.splitlines() if line]
+
+    changed = run_git("diff", "--name-only", "--relative", revision, "--")
+    untracked = run_git("ls-files", "--others", "--exclude-standard")
+    return set(changed) | set(untracked)
+
+
+def changed_since_revision(
+    project_path: Path, file_items: List[FileItem], revision: str
+) -> List[FileItem]:
+    changed_paths = git_changed_paths(project_path, revision)
+    return [fi for fi in file_items if fi.relative.as_posix() in changed_paths]
+
+
+def split_changed(
+    file_items: List[FileItem], changed: List[FileItem]
+) -> Tuple[List[FileItem], List[FileItem]]:
+    """Split file_items into (changed, unchanged), both in the order of file_items"""
+    changed_set = set(changed)
+    return (
+        [fi for fi in file_items if fi in changed_set],
+        [fi for fi in file_items if fi not in changed_set],
+    )
+
+
+def select_delta(
+    file_items: List[FileItem], options: ExportOptions
+) -> Tuple[List[FileItem], List[FileItem]]:
+    """Split file_items into the files changed since options.changed_since(_revision) and the rest"""
+    if options.changed_since_revision:
+        project_path = file_items[0].project_path if file_items else Path.cwd()
+        changed = changed_since_revision(
+            project_path, file_items, options.changed_since_revision
+        )
+    elif options.changed_since:
+        changed = changed_since_time(file_items, options.changed_since)
+    else:
+        changed = file_items
+    return split_changed(file_items, changed)
+
+
+def describe_delta(options: ExportOptions) -> Optional[str]:
+    """What the delta export is relative to, None if the export isn't a delta"""
+    if options.changed_since_revision:
+        return options.changed_since_revision
+    if options.changed_since:
+        return options.changed_since.isoformat(timespec="seconds")
+    return None
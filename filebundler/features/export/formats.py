@@ -0,0 +1,595 @@
+# filebundler/features/export/formats.py
+"""
+Export formats: how a code bundle is written, and read back by `cli unbundle`.
+
+A format renders each file into a section body (the part the section cache
+keeps), wraps bodies into numbered sections, and writes a header, the
+sections and a footer to a stream one after the other. Contents are escaped
+in a single pass: str.translate for escaped XML, one replace for CDATA and the
+C JSON encoder for JSON Lines. Bundles are read back line by line, so each
+document is available as soon as it has been parsed.
+"""
+
+import io
+import base64
+import re
+import json
+import logging
+import xml.etree.ElementTree as ET
+
+from abc import ABC, abstractmethod
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+Attributes = Dict[str, Union[str, int]]
+# (relative path, token count) of a file that is only listed, not exported
+ListedFile = Tuple[str, int]
+
+
+class BundleDocument(NamedTuple):
+    """A document read back from an exported bundle"""
+
+    source: str
+    # None for references to an identical document
+    content: Optional[str]
+    duplicate_of: Optional[str] = None
+    chunk: int = 1
+    chunks: int = 1
+
+
+class ExportFormat(ABC):
+    """Writes and reads one code bundle format"""
+
+    name: str
+    # language of the payload, for syntax highlighting in previews
+    language: str
+    separator = "\n"
+    # whether section bodies escape the content, so they cost more tokens than the raw content
+    escapes_content = False
+
+    @abstractmethod
+    def section_body(self, source: str, content: str) -> str:
+        """The part of a file's section that only depends on the file, cached per file"""
+
+    @abstractmethod
+    def file_section(self, body: str, index: int, attributes: Attributes = {}) -> str:
+        """Wrap a section body into the section of the index-th document"""
+
+    @abstractmethod
+    def duplicate_section(
+        self, source: str, index: int, original_index: int, original_source: str
+    ) -> str:
+        """A document referencing an earlier document with identical content"""
+
+    @abstractmethod
+    def omitted_section(self, files: List[ListedFile]) -> str:
+        """Lists the files left out by the token budget"""
+
+    @abstractmethod
+    def unchanged_section(self, files: List[ListedFile], since: str) -> str:
+        """Lists the files a delta export skipped because they didn't change"""
+
+    @abstractmethod
+    def manifest_section(self, files: List[ListedFile]) -> str:
+        """Lists the files of an export without their contents"""
+
+    @abstractmethod
+    def header(self, bundle_name: str, tokens: int, attributes: Attributes = {}) -> str:
+        pass
+
+    @abstractmethod
+    def footer(self) -> str:
+        pass
+
+    @abstractmethod
+    def iter_documents(self, lines: Iterable[str]) -> Iterator[BundleDocument]:
+        """
+        Read the documents of a bundle written in this format as they are parsed.
+
+        Args:
+            lines: The bundle's lines with their line endings, e.g. an open file or stdin
+        """
+
+    def parse(self, text: str) -> List[BundleDocument]:
+        return list(self.iter_documents(io.StringIO(text)))
+
+    def write_documents(
+        self,
+        stream: TextIO,
+        bundle_name: str,
+        tokens: int,
+        sections: Iterable[str],
+        attributes: Attributes = {},
+    ):
+        """Write a whole bundle to a stream, one section at a time"""
+        stream.write(self.header(bundle_name, tokens, attributes))
+        for section in sections:
+            stream.write(section)
+            stream.write(self.separator)
+        stream.write(self.footer())
+
+    def render_documents(
+        self,
+        bundle_name: str,
+        tokens: int,
+        sections: Iterable[str],
+        attributes: Attributes = {},
+    ) -> str:
+        buffer = io.StringIO()
+        self.write_documents(buffer, bundle_name, tokens, sections, attributes)
+        return buffer.getvalue()
+
+
+_XML_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_XML_ATTRIBUTE_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+)
+# section bodies put the content between a newline and this indentation
+_XML_CONTENT_SUFFIX = "\n        "
+# characters XML 1.0 can't hold, not even as character references or in CDATA
+_XML_ILLEGAL_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def escape_xml(text: str) -> str:
+    return text.translate(_XML_TEXT_ESCAPES)
+
+
+def escape_xml_attribute(value: Union[str, int]) -> str:
+    return str(value).translate(_XML_ATTRIBUTE_ESCAPES)
+
+
+def wrap_cdata(text: str) -> str:
+    # "]]>" can't appear in a CDATA section, so it is split over two sections
+    return "<![CDATA[" + text.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def _xml_attributes(attributes: Attributes) -> str:
+    return "".join(
+        f' {key}="{escape_xml_attribute(value)}"' for key, value in attributes.items()
+    )
+
+
+class XmlExportFormat(ExportFormat):
+    """
+    The XML structure recommended for long documents by Anthropic's prompting guides.
+
+    Contents are wrapped in CDATA sections (readable, only "]]>" needs care) or
+    escaped as XML entities. Contents holding characters XML can't represent
+    (e.g. the ESC of ANSI colors or a form feed) are base64 encoded instead,
+    marked by an encoding="base64" attribute. XML parsers turn every line ending
+    into "\n", so contents with only "\r\n" line endings are written with "\n"
+    and a line-endings="crlf" attribute, other carriage returns are base64 encoded.
+
+    REFERENCES
+    https://docs.anthropic.com/en/docs/build-with-claude/prompt-engineering/use-xml-tags
+    https://docs.anthropic.com/en/docs/build-with-claude/prompt-engineering/long-context-tips#example-multi-document-structure
+    """
+
+    language = "xml"
+
+    def __init__(self, name: str, cdata: bool):
+        self.name = name
+        self.cdata = cdata
+        self.escapes_content = not cdata
+
+    def section_body(self, source: str, content: str) -> str:
+        content_attributes = ""
+        crlf_lines = content.count("\r\n")
+        if crlf_lines and content.count("\r") == crlf_lines == content.count("\n"):
+            content = content.replace("\r\n", "\n")
+            content_attributes = ' line-endings="crlf"'
+        if _XML_ILLEGAL_CHARACTERS.search(content) or "\r" in content:
+            payload = base64.encodebytes(content.encode("utf-8", "surrogatepass")).decode("ascii")
+            payload = payload.removesuffix("\n")
+            content_attributes += ' encoding="base64"'
+        elif self.cdata:
+            payload = wrap_cdata(content)
+        else:
+            payload = escape_xml(content)
+        return f"""        <source>
+            {escape_xml(source)}
+        </source>
+        <document_content{content_attributes}>
+{payload}
+        </document_content>
+    </document>"""
+
+    def file_section(self, body: str, index: int, attributes: Attributes = {}) -> str:
+        # the index changes with the position of the file, so only the body is cached
+        return f"""    <document index="{index}"{_xml_attributes(attributes)}>
+{body}"""
+
+    def duplicate_section(
+        self, source: str, index: int, original_index: int, original_source: str
+    ) -> str:
+        return f"""    <document index="{index}" duplicate-of="{original_index}">
+        <source>
+            {escape_xml(source)}
+        </source>
+        <duplicate_of>
+            {escape_xml(original_source)}
+        </duplicate_of>
+    </document>"""
+
+    def _listing(self, tag: str, item_tag: str, files: List[ListedFile], attributes: Attributes):
+        lines = "".join(
+            f"""        <{item_tag} source="{escape_xml_attribute(source)}" token-count="{tokens}" />\n"""
+            for source, tokens in files
+        )
+        return f"""    <{tag}{_xml_attributes(attributes)}>
+{lines}    </{tag}>"""
+
+    def omitted_section(self, files: List[ListedFile]) -> str:
+        return self._listing(
+            "omitted_documents", "omitted", files, {"reason": "token-budget"}
+        )
+
+    def unchanged_section(self, files: List[ListedFile], since: str) -> str:
+        return self._listing("unchanged_documents", "unchanged", files, {"since": since})
+
+    def manifest_section(self, files: List[ListedFile]) -> str:
+        return self._listing("manifest", "file", files, {})
+
+    def header(self, bundle_name: str, tokens: int, attributes: Attributes = {}) -> str:
+        attributes = {
+            "bundle-name": bundle_name,
+            "format": self.name,
+            **attributes,
+            "token-count": tokens,
+        }
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<documents{_xml_attributes(attributes)}>
+"""
+
+    def footer(self) -> str:
+        return "</documents>"
+
+    def iter_documents(self, lines: Iterable[str]) -> Iterator[BundleDocument]:
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root: Optional[ET.Element] = None
+        for line in lines:
+            parser.feed(line)
+            for event, element in parser.read_events():
+                if root is None:
+                    root = element  # type: ignore[assignment]
+                    if root.tag != "documents":  # type: ignore[union-attr]
+                        raise ValueError("Root tag is not <documents>.")
+                elif event == "end" and element is root:
+                    # anything after </documents>, e.g. a closing code fence, is ignored
+                    return
+                elif event == "end" and element.tag == "document":  # type: ignore[union-attr]
+                    document = parse_xml_document(element)  # type: ignore[arg-type]
+                    # parsed documents are dropped so memory doesn't grow with the bundle
+                    root.remove(element)  # type: ignore[arg-type]
+                    if document is not None:
+                        yield document
+        # raises for a bundle that ends before </documents>
+        parser.close()
+        if root is None:
+            raise ValueError("The bundle is empty.")
+
+
+def parse_xml_document(element: ET.Element) -> Optional[BundleDocument]:
+    """A <document> element as a BundleDocument, None if it has no source"""
+    source_element = element.find("source")
+    source = (source_element.text or "").strip() if source_element is not None else ""
+    if not source:
+        return None
+
+    duplicate_element = element.find("duplicate_of")
+    if duplicate_element is not None:
+        return BundleDocument(
+            source, None, duplicate_of=(duplicate_element.text or "").strip()
+        )
+
+    content_element = element.find("document_content")
+    if content_element is None:
+        return None
+    # the parser already decoded entities and CDATA, only the layout is removed
+    content = content_element.text or ""
+    content = content.removeprefix("\n").removesuffix(_XML_CONTENT_SUFFIX)
+    if content_element.get("encoding") == "base64":
+        content = base64.b64decode(content).decode("utf-8", "surrogatepass")
+    if content_element.get("line-endings") == "crlf":
+        content = content.replace("\n", "\r\n")
+    return BundleDocument(
+        source,
+        content,
+        chunk=int(element.get("chunk", 1)),
+        chunks=int(element.get("chunks", 1)),
+    )
+
+
+_MARKDOWN_LANGUAGES = {
+    "py": "python", "pyi": "python", "js": "javascript", "mjs": "javascript",
+    "ts": "typescript", "tsx": "tsx", "jsx": "jsx", "rs": "rust", "rb": "ruby",
+    "sh": "bash", "yml": "yaml", "md": "markdown", "kt": "kotlin",
+}
+_BACKTICK_RUN = re.compile(r"`{3,}")
+_MARKDOWN_SECTION = re.compile(r"^## Document (\d+)(?: \((.*)\))?$")
+_MARKDOWN_FENCE = re.compile(r"^(`{3,})[^`\n]*$")
+
+
+def _markdown_attributes(attributes: Attributes) -> str:
+    if not attributes:
+        return ""
+    return " (" + ", ".join(f"{key}: {value}" for key, value in attributes.items()) + ")"
+
+
+class MarkdownExportFormat(ExportFormat):
+    """
+    One "## Document N" heading per file with its content in a code fence.
+
+    Fences are longer than any run of backticks in the content, so nothing has
+    to be escaped. Contents without a final newline get one.
+    """
+
+    name = "markdown"
+    language = "markdown"
+
+    def section_body(self, source: str, content: str) -> str:
+        longest_run = max((len(run) for run in _BACKTICK_RUN.findall(content)), default=2)
+        fence = "`" * (longest_run + 1)
+        suffix = source.rsplit(".", 1)[-1].lower() if "." in source else ""
+        language = _MARKDOWN_LANGUAGES.get(suffix, suffix)
+        newline = "" if content.endswith("\n") or not content else "\n"
+        return f"source: {source}\n\n{fence}{language}\n{content}{newline}{fence}\n"
+
+    def file_section(self, body: str, index: int, attributes: Attributes = {}) -> str:
+        return f"## Document {index}{_markdown_attributes(attributes)}\n\n{body}"
+
+    def duplicate_section(
+        self, source: str, index: int, original_index: int, original_source: str
+    ) -> str:
+        return (
+            f"## Document {index} (duplicate-of: {original_index})\n\n"
+            f"source: {source}\nduplicate_of: {original_source}\n"
+        )
+
+    def _listing(self, title: str, files: List[ListedFile]) -> str:
+        lines = "".join(f"- `{source}` ({tokens} tokens)\n" for source, tokens in files)
+        return f"## {title}\n\n{lines}"
+
+    def omitted_section(self, files: List[ListedFile]) -> str:
+        return self._listing("Omitted documents (reason: token-budget)", files)
+
+    def unchanged_section(self, files: List[ListedFile], since: str) -> str:
+        return self._listing(f"Unchanged documents (since: {since})", files)
+
+    def manifest_section(self, files: List[ListedFile]) -> str:
+        return self._listing("Manifest", files)
+
+    def header(self, bundle_name: str, tokens: int, attributes: Attributes = {}) -> str:
+        lines = "".join(
+            f"- {key}: {value}\n"
+            for key, value in {**attributes, "token-count": tokens}.items()
+        )
+        return f"# Bundle {bundle_name}\n\n{lines}\n"
+
+    def footer(self) -> str:
+        return ""
+
+    def iter_documents(self, lines: Iterable[str]) -> Iterator[BundleDocument]:
+        # a heading only starts a section outside of fences, so contents can contain headings
+        attributes: Optional[Dict[str, str]] = None
+        fields: Dict[str, str] = {}
+        fence: Optional[str] = None
+        content: List[str] = []
+        for line in lines:
+            stripped = line.rstrip("\r\n")
+            if fence is not None:
+                if stripped != fence:
+                    content.append(line)
+                    continue
+                yield self._document(fields["source"], content, attributes or {})
+                attributes, fence, content = None, None, []
+            elif heading := _MARKDOWN_SECTION.match(stripped):
+                attributes = dict(
+                    pair.split(": ", 1)
+                    for pair in (heading.group(2) or "").split(", ")
+                    if ": " in pair
+                )
+                fields = {}
+            elif attributes is None:
+                continue
+            elif stripped.startswith(("source: ", "duplicate_of: ")):
+                key, value = stripped.split(": ", 1)
+                fields[key] = value.strip()
+                if key == "duplicate_of" and fields.get("source"):
+                    yield BundleDocument(fields["source"], None, fields["duplicate_of"])
+                    attributes = None
+            elif fence_match := _MARKDOWN_FENCE.match(stripped):
+                if fields.get("source"):
+                    fence = fence_match.group(1)
+                else:
+                    attributes = None
+        if fence is not None:
+            # the bundle ended inside a fence, keep what was there
+            yield self._document(fields["source"], content, attributes or {})
+
+    @staticmethod
+    def _document(source: str, content: List[str], attributes: Dict[str, str]):
+        return BundleDocument(
+            source,
+            "".join(content),
+            chunk=int(attributes.get("chunk", 1)),
+            chunks=int(attributes.get("chunks", 1)),
+        )
+
+
+def _json(value: object) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class JsonLinesExportFormat(ExportFormat):
+    """
+    One JSON object per line: a "documents" header, then one object per
+    document, duplicate or listed file, so tools can consume bundles line by line.
+    """
+
+    name = "jsonl"
+    language = "json"
+    escapes_content = True
+
+    def section_body(self, source: str, content: str) -> str:
+        # the object's remaining fields, completed with the index by file_section
+        return f'"source": {_json(source)}, "content": {_json(content)}}}'
+
+    def file_section(self, body: str, index: int, attributes: Attributes = {}) -> str:
+        fields = _json({"type": "document", "index": index, **attributes})[:-1]
+        return f"{fields}, {body}"
+
+    def duplicate_section(
+        self, source: str, index: int, original_index: int, original_source: str
+    ) -> str:
+        return _json(
+            {
+                "type": "duplicate",
+                "index": index,
+                "source": source,
+                "duplicate_of": original_source,
+                "duplicate_of_index": original_index,
+            }
+        )
+
+    def _listing(self, kind: str, files: List[ListedFile], attributes: Attributes):
+        return "\n".join(
+            _json({"type": kind, "source": source, "token-count": tokens, **attributes})
+            for source, tokens in files
+        )
+
+    def omitted_section(self, files: List[ListedFile]) -> str:
+        return self._listing("omitted", files, {"reason": "token-budget"})
+
+    def unchanged_section(self, files: List[ListedFile], since: str) -> str:
+        return self._listing("unchanged", files, {"since": since})
+
+    def manifest_section(self, files: List[ListedFile]) -> str:
+        return self._listing("manifest", files, {})
+
+    def header(self, bundle_name: str, tokens: int, attributes: Attributes = {}) -> str:
+        header = {"type": "documents", "bundle-name": bundle_name, **attributes}
+        return _json({**header, "token-count": tokens}) + "\n"
+
+    def footer(self) -> str:
+        return ""
+
+    def iter_documents(self, lines: Iterable[str]) -> Iterator[BundleDocument]:
+        for line in lines:
+            # blank lines and code fences around a pasted bundle aren't records
+            if not line.strip() or line.lstrip().startswith("```"):
+                continue
+            record = json.loads(line)
+            if record.get("type") == "document":
+                yield BundleDocument(
+                    record["source"],
+                    record["content"],
+                    chunk=int(record.get("chunk", 1)),
+                    chunks=int(record.get("chunks", 1)),
+                )
+            elif record.get("type") == "duplicate":
+                yield BundleDocument(record["source"], None, record["duplicate_of"])
+
+
+FORMAT_REGISTRY: Dict[str, ExportFormat] = {
+    "xml": XmlExportFormat("xml", cdata=True),
+    "xml-escaped": XmlExportFormat("xml-escaped", cdata=False),
+    "markdown": MarkdownExportFormat(),
+    "jsonl": JsonLinesExportFormat(),
+}
+
+
+def register_format(export_format: ExportFormat):
+    FORMAT_REGISTRY[export_format.name] = export_format
+
+
+def get_format(name: str) -> ExportFormat:
+    export_format = FORMAT_REGISTRY.get(name)
+    if not export_format:
+        raise ValueError(
+            f"Unknown export format '{name}', choose one of {list(FORMAT_REGISTRY)}"
+        )
+    return export_format
+
+
+def detect_format(text: str) -> Optional[ExportFormat]:
+    """Guess the format of a bundle from its first character"""
+    start = text.lstrip()[:1]
+    if start == "<":
+        return FORMAT_REGISTRY["xml"]
+    if start == "{":
+        return FORMAT_REGISTRY["jsonl"]
+    if start == "#":
+        return FORMAT_REGISTRY["markdown"]
+    return None
+
+
+def iter_resolved_documents(
+    documents: Iterable[BundleDocument],
+    read_original: Optional[Callable[[str], Optional[str]]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    (file path, content) for every file of a bundle, as soon as it is complete.
+
+    References to identical documents get the content of the document they
+    point to, chunks of a split file are joined in chunk order.
+
+    Args:
+        documents: Documents of one or more bundles (e.g. all parts of an export), in order
+        read_original: Returns the content of a file that was already resolved,
+            e.g. by reading it back from disk; without it every content is kept in memory
+    """
+    contents: Dict[str, str] = {}
+    resolved: Set[str] = set()
+    keep_contents = read_original is None
+    if read_original is None:
+        read_original = contents.get
+    chunks: Dict[str, Dict[int, str]] = {}
+    for document in documents:
+        if document.content is None:
+            original = (
+                read_original(document.duplicate_of)  # type: ignore[arg-type]
+                if document.duplicate_of in resolved
+                else None
+            )
+            if original is None:
+                logger.warning(
+                    f"Skipping {document.source}, its original {document.duplicate_of} is missing"
+                )
+                continue
+            content = original
+        elif document.chunks > 1:
+            file_chunks = chunks.setdefault(document.source, {})
+            file_chunks[document.chunk] = document.content
+            if len(file_chunks) < document.chunks:
+                continue
+            content = "".join(file_chunks[number] for number in sorted(file_chunks))
+            del chunks[document.source]
+        else:
+            content = document.content
+        if keep_contents:
+            contents[document.source] = content
+        resolved.add(document.source)
+        yield document.source, content
+
+    for source, file_chunks in chunks.items():
+        logger.warning(f"Only {len(file_chunks)} chunks of {source} found, restoring them anyway")
+        yield source, "".join(file_chunks[number] for number in sorted(file_chunks))
+
+
+def resolve_documents(documents: Iterable[BundleDocument]) -> List[Tuple[str, str]]:
+    """(file path, content) for every file of a bundle, see iter_resolved_documents"""
+    return list(iter_resolved_documents(documents))
@@ -0,0 +1,72 @@
+# filebundler/features/export/ordering.py
+"""
+Deterministic document order for exports.
+
+Providers cache prompts by prefix, so an export only reuses the cache of the
+previous one if its documents come in the same order every time. Every
+ordering here depends only on the paths (and mtimes) of the files, never on
+hashing or insertion into a set.
+"""
+
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+
+FileOrdering = Callable[[List[FileItem], ExportOptions], List[FileItem]]
+
+
+def tree_key(file_item: FileItem) -> Tuple[Tuple[int, str, str], ...]:
+    """Sort key matching the project tree: directories before files, then alphabetically"""
+    parts = file_item.relative.parts
+    return tuple(
+        # the case-sensitive name breaks ties between names that only differ in case
+        (int(index == len(parts) - 1), part.lower(), part)
+        for index, part in enumerate(parts)
+    )
+
+
+def tree_order(file_items: List[FileItem], options: ExportOptions):
+    """Files in the order they appear in the project tree"""
+    return sorted(file_items, key=tree_key)
+
+
+def explicit_order(file_items: List[FileItem], options: ExportOptions):
+    """Files in the order they were added to the bundle"""
+    return list(file_items)
+
+
+def stable_first_order(file_items: List[FileItem], options: ExportOptions):
+    """
+    Files that haven't changed lately in tree order, then the recently changed
+    ones from oldest to newest change, so edits only invalidate the end of the prompt.
+    """
+    recent_since = time.time() - options.recent_window_seconds
+    mtimes = {fi: fi.path.stat().st_mtime for fi in file_items}
+    stable = [fi for fi in file_items if mtimes[fi] < recent_since]
+    recent = [fi for fi in file_items if mtimes[fi] >= recent_since]
+    return sorted(stable, key=tree_key) + sorted(
+        recent, key=lambda fi: (mtimes[fi], tree_key(fi))
+    )
+
+
+ORDERING_REGISTRY: Dict[str, FileOrdering] = {
+    "tree": tree_order,
+    "explicit": explicit_order,
+    "stable_first": stable_first_order,
+}
+
+
+def register_ordering(name: str, ordering: FileOrdering):
+    ORDERING_REGISTRY[name] = ordering
+
+
+def order_file_items(file_items: List[FileItem], options: ExportOptions):
+    ordering = ORDERING_REGISTRY.get(options.order)
+    if not ordering:
+        raise ValueError(
+            f"Unknown order '{options.order}', choose one of {list(ORDERING_REGISTRY)}"
+        )
+    return ordering(file_items, options)
@@ -0,0 +1,226 @@
+# filebundler/features/export/outline.py
+"""
+Outline (signature-only) rendering of source files.
+
+An outline keeps the API surface of a file: imports, class and function
+signatures, docstrings and module-level declarations, with every function
+body replaced by `...`. Python files are outlined through `ast`; C-like
+languages (JS/TS, Java, Go, Rust...) through a brace-depth scan of their lines.
+"""
+
+import re
+import ast
+import hashlib
+import logging
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PYTHON_SUFFIXES = {".py", ".pyi"}
+BRACE_SUFFIXES = {
+    ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".java", ".kt", ".kts",
+    ".scala", ".swift", ".go", ".rs", ".c", ".h", ".cc", ".cpp", ".hpp",
+    ".cs", ".php", ".dart",
+}
+# values longer than this are replaced by ... in the outline
+MAX_VALUE_LENGTH = 80
+MAX_CACHED_OUTLINES = 2000
+
+# declarations whose body is part of the API surface (members are listed, not collapsed)
+CONTAINER_DECLARATION = re.compile(
+    r"\b(class|interface|enum|namespace|module|struct|trait|impl|object|record)\b"
+)
+IMPORT_STATEMENT = re.compile(r"^\s*(import|export\s*\{|export\s+type\s*\{)")
+STRING_OR_LINE_COMMENT = re.compile(
+    r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`|//.*$"
+)
+
+
+def _body_placeholder(node: ast.AST) -> List[ast.stmt]:
+    docstring = ast.get_docstring(node, clean=False)  # type: ignore[arg-type]
+    body: List[ast.stmt] = [ast.Expr(ast.Constant(...))]
+    if docstring is not None:
+        body.insert(0, ast.Expr(ast.Constant(docstring)))
+    return body
+
+
+def _shorten_value(value: Optional[ast.expr]) -> Optional[ast.expr]:
+    if value is not None and len(ast.unparse(value)) > MAX_VALUE_LENGTH:
+        return ast.Constant(...)
+    return value
+
+
+def _outline_statements(body: List[ast.stmt]) -> List[ast.stmt]:
+    kept: List[ast.stmt] = []
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            kept.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = _body_placeholder(node)
+            kept.append(node)
+        elif isinstance(node, ast.ClassDef):
+            members = _outline_statements(node.body)
+            docstring = ast.get_docstring(node, clean=False)
+            if docstring is not None:
+                members.insert(0, ast.Expr(ast.Constant(docstring)))
+            node.body = members or [ast.Expr(ast.Constant(...))]
+            kept.append(node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            node.value = _shorten_value(node.value)  # type: ignore[assignment]
+            kept.append(node)
+        elif isinstance(node, ast.TypeAlias):
+            kept.append(node)
+    return kept
+
+
+def outline_python(content: str) -> Optional[str]:
+    """Outline of a Python module, None if it doesn't parse"""
+    try:
+        module = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    body = _outline_statements(module.body)
+    docstring = ast.get_docstring(module, clean=False)
+    if docstring is not None:
+        body.insert(0, ast.Expr(ast.Constant(docstring)))
+    return ast.unparse(ast.Module(body=body, type_ignores=[])) + "\n"
+
+
+PYTHON_DECLARATION = re.compile(r"^\s*(import |from |class |def |async def |@)")
+
+
+def outline_python_lines(content: str) -> str:
+    """Line-based outline for Python files that don't parse: declarations only"""
+    return "".join(
+        line
+        for line in content.splitlines(keepends=True)
+        if PYTHON_DECLARATION.match(line)
+    )
+
+
+def _mask_line(line: str) -> str:
+    """Blank out strings and line comments (keeping their length) so braces can be counted"""
+    return STRING_OR_LINE_COMMENT.sub(lambda m: " " * len(m.group(0)), line)
+
+
+def _scan_braces(content: str) -> List[Tuple[str, str, int, int]]:
+    """(line, masked line, depth before, depth after) for every line"""
+    scanned: List[Tuple[str, str, int, int]] = []
+    depth = 0
+    in_block_comment = False
+    for line in content.splitlines():
+        masked = ""
+        rest = line
+        while rest:
+            if in_block_comment:
+                end = rest.find("*/")
+                if end == -1:
+                    masked += " " * len(rest)
+                    rest = ""
+                else:
+                    masked += " " * (end + 2)
+                    rest = rest[end + 2 :]
+                    in_block_comment = False
+            else:
+                start = _mask_line(rest).find("/*")
+                if start == -1:
+                    masked += _mask_line(rest)
+                    rest = ""
+                else:
+                    masked += _mask_line(rest[:start]) + "  "
+                    rest = rest[start + 2 :]
+                    in_block_comment = True
+        before = depth
+        depth = max(0, depth + masked.count("{") - masked.count("}"))
+        scanned.append((line, masked, before, depth))
+    return scanned
+
+
+def _first_unclosed_brace(masked: str) -> int:
+    open_positions: List[int] = []
+    for position, char in enumerate(masked):
+        if char == "{":
+            open_positions.append(position)
+        elif char == "}" and open_positions:
+            open_positions.pop()
+    return open_positions[0] if open_positions else masked.rfind("{")
+
+
+def outline_braces(content: str) -> str:
+    """Outline of a C-like source file: declarations are kept, block bodies collapsed to { ... }"""
+    lines = _scan_braces(content)
+    kept: List[str] = []
+    # depth whose lines are listed, 1 while inside a class-like declaration
+    listed_depth = 0
+    index = 0
+    while index < len(lines):
+        line, masked, before, after = lines[index]
+        if before < listed_depth:
+            listed_depth = before
+        if before > listed_depth:
+            index += 1
+            continue
+
+        opens_block = after > before
+        end = index
+        while opens_block and end + 1 < len(lines) and lines[end][3] > before:
+            end += 1
+
+        if not opens_block:
+            kept.append(line)
+        elif IMPORT_STATEMENT.match(line):
+            # multi-line imports are kept whole
+            kept.extend(scanned[0] for scanned in lines[index : end + 1])
+            index = end
+        elif before == 0 and CONTAINER_DECLARATION.search(masked.split("{")[0]):
+            # class-like declarations list their members
+            kept.append(line)
+            listed_depth = after
+        else:
+            closing_line, closing_masked = lines[end][0], lines[end][1]
+            tail = closing_line[closing_masked.rfind("}") + 1 :] if end > index else ""
+            kept.append(line[: _first_unclosed_brace(masked)] + "{ ... }" + tail)
+            index = end
+        index += 1
+    return "\n".join(kept) + ("\n" if content.endswith("\n") else "")
+
+
+_outline_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_outline_cache_lock = threading.Lock()
+
+
+def outline(content: str, path: Path) -> str:
+    """
+    Outline of a source file, or its content unchanged for languages without an outliner.
+
+    Outlines are cached by content hash, so copies of a file and files that were
+    touched without changing are only outlined once.
+    """
+    suffix = path.suffix.lower()
+    if suffix not in PYTHON_SUFFIXES and suffix not in BRACE_SUFFIXES:
+        return content
+
+    key = (hashlib.sha256(content.encode("utf-8")).hexdigest(), suffix)
+    with _outline_cache_lock:
+        if key in _outline_cache:
+            _outline_cache.move_to_end(key)
+            return _outline_cache[key]
+
+    if suffix in PYTHON_SUFFIXES:
+        outlined = outline_python(content)
+        if outlined is None:
+            logger.debug(f"Could not parse {path}, outlining it line by line")
+            outlined = outline_python_lines(content)
+    else:
+        outlined = outline_braces(content)
+
+    with _outline_cache_lock:
+        _outline_cache[key] = outlined
+        while len(_outline_cache) > MAX_CACHED_OUTLINES:
+            _outline_cache.popitem(last=False)
+    return outlined
@@ -0,0 +1,68 @@
+# filebundler/features/export/priority.py
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.models.llm.AutoBundleResponse import AutoBundleResponse
+
+# A priority ranks files from most to least important, the token budget keeps
+# files in that order until it runs out
+FilePriority = Callable[[List[FileItem], ExportOptions], List[FileItem]]
+
+
+def explicit_priority(file_items: List[FileItem], options: ExportOptions):
+    """Keep the order in which the files were added to the bundle"""
+    return list(file_items)
+
+
+def recency_priority(file_items: List[FileItem], options: ExportOptions):
+    """Most recently modified files first"""
+    return sorted(file_items, key=lambda fi: fi.path.stat().st_mtime, reverse=True)
+
+
+def size_priority(file_items: List[FileItem], options: ExportOptions):
+    """Smallest files first, so that as many files as possible fit the budget"""
+    return sorted(file_items, key=lambda fi: fi.tokens)
+
+
+def relevance_priority(file_items: List[FileItem], options: ExportOptions):
+    """Files ranked by the LLM first (see relevance_ranks_from_response), then the rest in bundle order"""
+    unranked = len(options.relevance_ranks)
+    return sorted(
+        file_items,
+        key=lambda fi: options.relevance_ranks.get(fi.relative.as_posix(), unranked),
+    )
+
+
+PRIORITY_REGISTRY: Dict[str, FilePriority] = {
+    "explicit": explicit_priority,
+    "recency": recency_priority,
+    "size": size_priority,
+    "relevance": relevance_priority,
+}
+
+
+def register_priority(name: str, priority: FilePriority):
+    PRIORITY_REGISTRY[name] = priority
+
+
+def rank_file_items(file_items: List[FileItem], options: ExportOptions):
+    priority = PRIORITY_REGISTRY.get(options.priority)
+    if not priority:
+        raise ValueError(
+            f"Unknown priority '{options.priority}', choose one of {list(PRIORITY_REGISTRY)}"
+        )
+    return priority(file_items, options)
+
+
+def relevance_ranks_from_response(response: AutoBundleResponse) -> Dict[str, int]:
+    """Rank 'very likely useful' files before 'probably useful' ones, each in the LLM's order"""
+    ranked_paths: List[Path] = [
+        *response.files.very_likely_useful,
+        *response.files.probably_useful,
+    ]
+    ranks: Dict[str, int] = {}
+    for path in ranked_paths:
+        ranks.setdefault(path.as_posix(), len(ranks))
+    return ranks
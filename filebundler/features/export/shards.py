@@ -0,0 +1,104 @@
+# filebundler/features/export/shards.py
+"""
+Packing of export documents into token-limited parts.
+
+Documents are packed first-fit decreasing, which keeps the number of parts
+close to the minimum; documents too large for a part are split at line
+boundaries first.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from filebundler.models.FileItem import FileItem
+
+
+@dataclass
+class ShardPiece:
+    """A document (or a chunk of one) placed in a part"""
+
+    # None for pieces that aren't files, e.g. the manifest of a delta export
+    file_item: Optional[FileItem]
+    # position of the file in export order, parts list their pieces in this order
+    position: int
+    # tokens of the piece including its markup
+    tokens: int
+    # the chunk's content for split files, None when the whole file fits a part
+    content: Optional[str] = None
+    chunk: int = 1
+    chunks: int = 1
+
+
+def _split_long_line(line: str, max_tokens: int, count_tokens: Callable[[str], int]):
+    if count_tokens(line) <= max_tokens or len(line) < 2:
+        return [line]
+    middle = len(line) // 2
+    return _split_long_line(line[:middle], max_tokens, count_tokens) + _split_long_line(
+        line[middle:], max_tokens, count_tokens
+    )
+
+
+def split_lines_to_tokens(
+    content: str, max_tokens: int, count_tokens: Callable[[str], int]
+) -> List[str]:
+    """
+    Split content into chunks of whole lines of at most max_tokens tokens each.
+
+    Only a single line longer than max_tokens (e.g. minified code) is cut mid-line.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in content.splitlines(keepends=True):
+        line_tokens = count_tokens(line)
+        if current and current_tokens + line_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        if line_tokens > max_tokens:
+            chunks.extend(_split_long_line(line, max_tokens, count_tokens))
+            continue
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append("".join(current))
+
+    # tokens can merge across lines, so re-check the joined chunks
+    checked: List[str] = []
+    for chunk in chunks:
+        lines = chunk.splitlines(keepends=True)
+        if count_tokens(chunk) > max_tokens and len(lines) > 1:
+            middle = len(lines) // 2
+            checked.extend(
+                split_lines_to_tokens("".join(lines[:middle]), max_tokens, count_tokens)
+            )
+            checked.extend(
+                split_lines_to_tokens("".join(lines[middle:]), max_tokens, count_tokens)
+            )
+        else:
+            checked.append(chunk)
+    return checked
+
+
+def pack_shards(pieces: List[ShardPiece], capacity: int) -> List[List[ShardPiece]]:
+    """
+    Pack pieces into as few parts of `capacity` tokens as first-fit decreasing manages.
+
+    Returns:
+        The parts, each listing its pieces in export order, ordered by their first piece
+    """
+    parts: List[List[ShardPiece]] = []
+    remaining: List[int] = []
+    for piece in sorted(pieces, key=lambda p: p.tokens, reverse=True):
+        for part_index, room in enumerate(remaining):
+            if piece.tokens <= room:
+                parts[part_index].append(piece)
+                remaining[part_index] -= piece.tokens
+                break
+        else:
+            # a piece larger than capacity still gets a part of its own
+            parts.append([piece])
+            remaining.append(capacity - piece.tokens)
+
+    for part in parts:
+        part.sort(key=lambda p: (p.position, p.chunk))
+    return sorted(parts, key=lambda part: (part[0].position, part[0].chunk))
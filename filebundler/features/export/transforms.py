@@ -0,0 +1,277 @@
+# filebundler/features/export/transforms.py
+"""
+Token-reducing transforms applied to file contents before they are exported.
+
+Every transform takes the content and the path of a file and returns the new
+content; transforms that don't apply to a file type return it unchanged.
+"""
+
+import io
+import re
+import json
+import logging
+import tokenize
+
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from filebundler.features.export.outline import outline
+
+logger = logging.getLogger(__name__)
+
+ContentTransform = Callable[[str, Path], str]
+
+C_STYLE_COMMENT_SUFFIXES = {
+    ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".java", ".kt", ".kts",
+    ".scala", ".swift", ".go", ".rs", ".c", ".h", ".cc", ".cpp", ".hpp",
+    ".cs", ".php", ".dart", ".scss", ".less", ".css",
+}
+HASH_COMMENT_SUFFIXES = {
+    ".sh", ".bash", ".zsh", ".yml", ".yaml", ".toml", ".rb", ".r", ".pl",
+    ".ini", ".cfg", ".conf", ".mk",
+}
+HASH_COMMENT_FILENAMES = {"Dockerfile", "Makefile", ".gitignore", ".dockerignore"}
+DASH_COMMENT_SUFFIXES = {".sql", ".lua", ".hs"}
+MARKUP_COMMENT_SUFFIXES = {".html", ".htm", ".xml", ".svg", ".vue", ".md"}
+# CSS has no line comments, a // inside it is usually part of a URL
+BLOCK_ONLY_SUFFIXES = {".css"}
+
+JSON_SUFFIXES = {".json", ".jsonl", ".geojson"}
+TEXT_LOCKFILES = {
+    "uv.lock", "poetry.lock", "Cargo.lock", "yarn.lock", "pnpm-lock.yaml",
+    "Gemfile.lock", "Podfile.lock", "pubspec.lock", "flake.lock", "go.sum",
+}
+# lines of a lockfile that only carry hashes nobody reads
+LOCKFILE_NOISE = re.compile(
+    r"sha\d{3}[:-]|\bhash\s*=|\bintegrity\b|\bchecksum\b|\bh1:", re.IGNORECASE
+)
+
+# marks a removed comment so lines that only held a comment can be dropped
+_REMOVED = "\x00"
+
+
+def _source_lines(content: str) -> List[str]:
+    # split on \n only, like tokenize: str.splitlines() also splits on \x0c, \x1c-\x1e,
+    # \x85, \u2028 and \u2029, which can appear inside string literals
+    return io.StringIO(content).readlines()
+
+
+def _drop_removed_comment_lines(content: str) -> str:
+    kept: List[str] = []
+    for line in _source_lines(content):
+        if _REMOVED in line:
+            line = line.replace(_REMOVED, "")
+            if not line.strip():
+                continue
+            line = line.rstrip(" \t\r\n") + ("\n" if line.endswith("\n") else "")
+        kept.append(line)
+    return "".join(kept)
+
+
+def _strip_python_comments(content: str) -> str:
+    lines = _source_lines(content)
+    try:
+        comments = [
+            token
+            for token in tokenize.generate_tokens(io.StringIO(content).readline)
+            if token.type == tokenize.COMMENT
+        ]
+    except (tokenize.TokenError, SyntaxError, IndentationError):
+        return content
+
+    # comments never span lines, so cut them from the end of the file backwards
+    for token in reversed(comments):
+        row, col = token.start
+        line = lines[row - 1]
+        if row == 1 and line.startswith("#!"):
+            continue
+        lines[row - 1] = line[:col] + _REMOVED + line[token.end[1] :]
+    return _drop_removed_comment_lines("".join(lines))
+
+
+def _strip_c_style_comments(content: str, line_comments: bool = True) -> str:
+    result: List[str] = []
+    i, length = 0, len(content)
+    quote = ""
+    while i < length:
+        char = content[i]
+        if quote:
+            result.append(char)
+            if char == "\\" and i + 1 < length:
+                result.append(content[i + 1])
+                i += 2
+                continue
+            # ' and " literals can't span lines, so a newline ends a misdetected one (e.g. a Rust lifetime)
+            if char == quote or (char == "\n" and quote != "`"):
+                quote = ""
+            i += 1
+        elif char in "\"'`":
+            quote = char
+            result.append(char)
+            i += 1
+        elif content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            if end == -1:
+                # not a comment after all (e.g. the regex /\/*foo/), keep the rest as is
+                result.append(content[i:])
+                break
+            i = end + 2
+            result.append(_REMOVED)
+        elif line_comments and content.startswith("//", i):
+            end = content.find("\n", i)
+            i = length if end == -1 else end
+            result.append(_REMOVED)
+        else:
+            result.append(char)
+            i += 1
+    return _drop_removed_comment_lines("".join(result))
+
+
+def _strip_full_line_comments(content: str, marker: str) -> str:
+    lines = _source_lines(content)
+    return "".join(
+        line
+        for index, line in enumerate(lines)
+        if not line.lstrip().startswith(marker)
+        or (index == 0 and line.startswith("#!"))
+    )
+
+
+def strip_comments(content: str, path: Path) -> str:
+    """Remove comments (including license headers) in the syntax of the file's language"""
+    suffix = path.suffix.lower()
+    if suffix in {".py", ".pyi"}:
+        return _strip_python_comments(content)
+    if suffix in C_STYLE_COMMENT_SUFFIXES:
+        return _strip_c_style_comments(
+            content, line_comments=suffix not in BLOCK_ONLY_SUFFIXES
+        )
+    if suffix in HASH_COMMENT_SUFFIXES or path.name in HASH_COMMENT_FILENAMES:
+        return _strip_full_line_comments(content, "#")
+    if suffix in DASH_COMMENT_SUFFIXES:
+        return _strip_full_line_comments(content, "--")
+    if suffix in MARKUP_COMMENT_SUFFIXES:
+        return _drop_removed_comment_lines(
+            re.sub(r"<!--.*?-->", _REMOVED, content, flags=re.DOTALL)
+        )
+    return content
+
+
+def collapse_whitespace(content: str, path: Path) -> str:
+    """Strip trailing whitespace and collapse runs of blank lines into one"""
+    lines = [line.rstrip() for line in content.splitlines()]
+    collapsed: List[str] = []
+    for line in lines:
+        if not line and (not collapsed or not collapsed[-1]):
+            continue
+        collapsed.append(line)
+    while collapsed and not collapsed[-1]:
+        collapsed.pop()
+    return "\n".join(collapsed) + ("\n" if content.endswith("\n") and collapsed else "")
+
+
+def compact_indentation(content: str, path: Path) -> str:
+    """Indent space-indented files with one space per level instead of the file's indent width"""
+    if path.suffix.lower() in MARKUP_COMMENT_SUFFIXES:
+        return content
+
+    lines = content.splitlines(keepends=True)
+    indents = [
+        len(line) - len(line.lstrip(" "))
+        for line in lines
+        if line.strip() and line.startswith(" ")
+    ]
+    unit = min(indents, default=0)
+    if unit < 2:
+        return content
+
+    compacted: List[str] = []
+    for line in lines:
+        stripped = line.lstrip(" ")
+        width = len(line) - len(stripped)
+        # levels shrink to one space, odd alignment beyond the last level is kept
+        compacted.append(" " * (width // unit + width % unit) + stripped)
+    return "".join(compacted)
+
+
+def minify_data(content: str, path: Path) -> str:
+    """Minify JSON files (including JSON lockfiles) and drop hash lines from text lockfiles"""
+    if path.suffix.lower() in JSON_SUFFIXES or path.name in {
+        "package-lock.json",
+        "composer.lock",
+        "Pipfile.lock",
+    }:
+        try:
+            if path.suffix.lower() == ".jsonl":
+                return "".join(
+                    json.dumps(json.loads(line), separators=(",", ":")) + "\n"
+                    for line in content.splitlines()
+                    if line.strip()
+                )
+            return json.dumps(json.loads(content), separators=(",", ":"))
+        except json.JSONDecodeError:
+            return content
+    if path.name in TEXT_LOCKFILES:
+        return "".join(
+            line
+            for line in content.splitlines(keepends=True)
+            if not LOCKFILE_NOISE.search(line)
+        )
+    return content
+
+
+# replaces a source file by its signatures and docstrings, see features.export.outline
+OUTLINE = "outline"
+
+TRANSFORM_REGISTRY: Dict[str, ContentTransform] = {
+    OUTLINE: outline,
+    "strip_comments": strip_comments,
+    "collapse_whitespace": collapse_whitespace,
+    "compact_indentation": compact_indentation,
+    "minify_data": minify_data,
+}
+
+
+def register_transform(name: str, transform: ContentTransform):
+    TRANSFORM_REGISTRY[name] = transform
+
+
+def validate_transforms(names: List[str]):
+    unknown = [name for name in names if name not in TRANSFORM_REGISTRY]
+    if unknown:
+        raise ValueError(
+            f"Unknown transforms {unknown}, choose from {list(TRANSFORM_REGISTRY)}"
+        )
+
+
+def apply_transforms(
+    content: str,
+    path: Path,
+    names: List[str],
+    raw_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> Tuple[str, int, Dict[str, int]]:
+    """
+    Apply transforms in order, measuring what each one saves.
+
+    Args:
+        content: Raw file content
+        path: Path of the file, used to pick the language-specific behaviour
+        names: Names of transforms in TRANSFORM_REGISTRY, applied in order
+        raw_tokens: Token count of the raw content
+        count_tokens: Tokenizer used to measure the savings
+
+    Returns:
+        The transformed content, its token count and the tokens saved by each transform
+    """
+    tokens = raw_tokens
+    saved_tokens: Dict[str, int] = {}
+    for name in names:
+        transformed = TRANSFORM_REGISTRY[name](content, path)
+        if transformed == content:
+            saved_tokens[name] = 0
+            continue
+        transformed_tokens = count_tokens(transformed)
+        saved_tokens[name] = tokens - transformed_tokens
+        content, tokens = transformed, transformed_tokens
+    return content, tokens, saved_tokens
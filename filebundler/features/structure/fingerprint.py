@@ -0,0 +1,60 @@
+# filebundler/features/structure/fingerprint.py
+"""
+Fingerprints of project structures, so an unchanged tree isn't rendered and
+written again.
+"""
+
+import hashlib
+
+from typing import List, Optional, Set, Tuple
+
+from filebundler.models.ProjectSettings import StructureSettings
+from filebundler.features.structure.tree import StructureNode
+from filebundler.features.structure.limits import is_limited
+
+# bump when the rendered markdown changes, so existing files are rewritten once
+STRUCTURE_FORMAT_VERSION = 1
+
+
+def structure_fingerprint(
+    root: StructureNode,
+    project_name: str,
+    settings: Optional[StructureSettings] = None,
+    exclude: Optional[Set[str]] = None,
+) -> str:
+    """
+    Hash of everything the rendered structure depends on: the relative path
+    and token count of every node, the project name and the limits. A limited
+    structure focused on recent changes also depends on the files' mtimes
+    (a directory's mtime is the latest of its files', and its own only changes
+    with its entries, whose paths are hashed anyway).
+
+    Args:
+        root: The full structure, with totals computed
+        project_name: Name written into the structure's header
+        settings: Limits the structure is rendered with
+        exclude: Relative posix paths left out, e.g. the structure file itself,
+            whose token count changes whenever it is written
+    """
+    exclude = exclude or set()
+    with_mtimes = bool(settings) and settings.focus == "recent" and is_limited(settings)
+    digest = hashlib.sha256()
+    settings_json = settings.model_dump_json() if settings else ""
+    digest.update(f"{STRUCTURE_FORMAT_VERSION}\0{project_name}\0{settings_json}\n".encode())
+    # children are sorted, so a pre-order walk visits the nodes in a stable order
+    stack: List[Tuple[StructureNode, str]] = [
+        (child, child.name) for child in reversed(root.children)
+    ]
+    while stack:
+        node, path = stack.pop()
+        if path in exclude:
+            continue
+        entry = f"{path}\0{int(node.is_dir)}\0{node.tokens}"
+        # directory mtimes include the excluded files', which change with every write
+        if with_mtimes and not node.is_dir:
+            entry += f"\0{node.mtime!r}"
+        digest.update(f"{entry}\n".encode())
+        stack.extend(
+            (child, f"{path}/{child.name}") for child in reversed(node.children)
+        )
+    return digest.hexdigest()
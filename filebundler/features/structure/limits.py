@@ -0,0 +1,153 @@
+# filebundler/features/structure/limits.py
+"""
+Depth-, width- and budget-limited project structures.
+
+Directories are expanded best-first: the directory with the most tokens (or
+the most recent change) is expanded before any other, as long as its lines
+fit the token budget. What isn't expanded is shown collapsed, and directories
+with too many entries show only the most important ones followed by a
+summary line, so detail stays where it matters most.
+"""
+
+import heapq
+import itertools
+
+from dataclasses import replace
+from typing import Callable, List, Optional, Tuple
+
+from filebundler.models.ProjectSettings import StructureSettings
+from filebundler.features.structure.tree import (
+    StructureNode,
+    format_entry,
+    format_hidden_summary,
+    sort_key,
+)
+
+
+def is_limited(settings: StructureSettings) -> bool:
+    return bool(settings.max_depth or settings.max_children or settings.token_budget)
+
+
+def score(node: StructureNode, settings: StructureSettings) -> float:
+    """How much detail a node deserves, higher first"""
+    return node.mtime if settings.focus == "recent" else node.tokens
+
+
+def _visible_children(
+    node: StructureNode, settings: StructureSettings
+) -> Tuple[List[StructureNode], List[StructureNode]]:
+    """(shown, hidden) children of a directory, both in display order"""
+    if not settings.max_children or len(node.children) <= settings.max_children:
+        return node.children, []
+    ranked = sorted(node.children, key=lambda child: score(child, settings), reverse=True)
+    shown = ranked[: settings.max_children]
+    return sorted(shown, key=sort_key), sorted(ranked[settings.max_children :], key=sort_key)
+
+
+def _hidden(node: StructureNode, hidden: List[StructureNode]) -> StructureNode:
+    """A copy of a directory without children that notes which entries are hidden"""
+    return replace(
+        node,
+        children=[],
+        hidden_entries=len(hidden),
+        hidden_files=sum(child.files for child in hidden),
+        hidden_tokens=sum(child.tokens for child in hidden),
+    )
+
+
+def _line_cost(
+    node: StructureNode, depth: int, count_tokens: Callable[[str], int]
+) -> int:
+    # every level of the tree prefix is four characters wide
+    return count_tokens("│   " * (depth - 1) + "├── " + format_entry(node) + "\n")
+
+
+def limit_structure(
+    root: StructureNode,
+    settings: StructureSettings,
+    count_tokens: Callable[[str], int],
+    fixed_tokens: int = 0,
+) -> StructureNode:
+    """
+    A copy of a structure (with totals computed) limited to the settings.
+
+    Args:
+        root: The full structure, it is left unchanged
+        settings: Depth, width and budget limits and which subtrees to focus on
+        count_tokens: Token count of a line, only the lines considered for the budget are counted
+        fixed_tokens: Tokens of the markdown around the tree, paid for by the budget
+
+    Returns:
+        The limited structure; collapsed directories have no children and their
+        hidden_* fields set, partially shown ones keep their most important children
+    """
+    used_tokens = fixed_tokens
+    limited_root = _hidden(root, root.children)
+    counter = itertools.count()
+    # (negated score, tie breaker, depth, full node, its limited copy, tokens of its collapsed line)
+    heap: List[Tuple[float, int, int, StructureNode, StructureNode, int]] = [
+        (-score(root, settings), next(counter), 0, root, limited_root, 0)
+    ]
+    while heap:
+        _, _, depth, node, limited, collapsed_tokens = heapq.heappop(heap)
+        shown, hidden = _visible_children(node, settings)
+        expanded = _hidden(node, hidden)
+
+        if settings.token_budget:
+            # directories are charged collapsed, once expanded their line gets shorter
+            cost = sum(
+                _line_cost(
+                    _hidden(child, child.children) if child.children else child,
+                    depth + 1,
+                    count_tokens,
+                )
+                for child in shown
+            )
+            if depth > 0:
+                cost += _line_cost(node, depth, count_tokens) - collapsed_tokens
+            if hidden:
+                summary_line = "│   " * depth + "└── " + format_hidden_summary(expanded)
+                cost += count_tokens(summary_line + "\n")
+            if used_tokens + cost > settings.token_budget:
+                # stays collapsed, smaller directories may still fit
+                continue
+            used_tokens += cost
+
+        limited.hidden_entries = expanded.hidden_entries
+        limited.hidden_files = expanded.hidden_files
+        limited.hidden_tokens = expanded.hidden_tokens
+        for child in shown:
+            if not child.is_dir:
+                limited.children.append(child)
+                continue
+            limited_child = _hidden(child, child.children)
+            limited.children.append(limited_child)
+            if child.children and (not settings.max_depth or depth + 1 < settings.max_depth):
+                collapsed_child_tokens = (
+                    _line_cost(limited_child, depth + 1, count_tokens)
+                    if settings.token_budget
+                    else 0
+                )
+                heapq.heappush(
+                    heap,
+                    (
+                        -score(child, settings),
+                        next(counter),
+                        depth + 1,
+                        child,
+                        limited_child,
+                        collapsed_child_tokens,
+                    ),
+                )
+    return limited_root
+
+
+def limit_if_needed(
+    root: StructureNode,
+    settings: Optional[StructureSettings],
+    count_tokens: Callable[[str], int],
+    fixed_tokens: int = 0,
+) -> StructureNode:
+    if not settings or not is_limited(settings):
+        return root
+    return limit_structure(root, settings, count_tokens, fixed_tokens)
@@ -0,0 +1,166 @@
+# filebundler/features/structure/tree.py
+"""
+Single-pass rendering of the project structure.
+
+The FileItem tree is walked once post-order into StructureNodes, which stats
+every file once, sorts every directory once and sums directory totals from
+their children. A pre-order walk then writes the lines into one buffer. Both
+walks use explicit stacks, so deep trees don't hit the recursion limit.
+"""
+
+import io
+import os
+import stat
+import time
+
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from filebundler.models.FileItem import FileItem
+from filebundler.services.cached_operations import get_file_tokens
+from filebundler.utils import profiler
+
+
+@dataclass(slots=True)
+class StructureNode:
+    """A file or directory of the project structure with its aggregates"""
+
+    name: str
+    is_dir: bool
+    # the file's tokens, or the sum over the directory's subtree
+    tokens: int = 0
+    # the file's mtime, or the latest mtime in the directory's subtree
+    mtime: float = 0.0
+    # sorted directories first, then files, case-insensitively
+    children: List["StructureNode"] = field(default_factory=list)
+    # number of files in the directory's subtree, 1 for files
+    files: int = 1
+    # entries of a directory left out of the rendered structure (see structure.limits),
+    # with the files and tokens of their subtrees
+    hidden_entries: int = 0
+    hidden_files: int = 0
+    hidden_tokens: int = 0
+
+
+def sort_key(node: StructureNode) -> Tuple[bool, str]:
+    return (not node.is_dir, node.name.lower())
+
+
+def compute_totals(root: StructureNode) -> StructureNode:
+    """Sort every directory and sum its tokens and latest mtime in one post-order walk"""
+    directories: List[StructureNode] = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        directories.append(node)
+        stack.extend(child for child in node.children if child.is_dir)
+
+    # reversed pre-order visits every directory after all of its subdirectories
+    for node in reversed(directories):
+        node.children.sort(key=sort_key)
+        tokens, mtime, files = 0, node.mtime, 0
+        for child in node.children:
+            tokens += child.tokens
+            files += child.files
+            if child.mtime > mtime:
+                mtime = child.mtime
+        node.tokens, node.mtime, node.files = tokens, mtime, files
+    return root
+
+
+def _file_node(file_item: FileItem) -> Optional[StructureNode]:
+    start = time.perf_counter_ns()
+    try:
+        file_stat = os.stat(file_item.path)
+    except OSError:
+        # deleted since the project was loaded
+        return None
+    finally:
+        profiler.record("stat", time.perf_counter_ns() - start)
+    if stat.S_ISDIR(file_stat.st_mode):
+        return StructureNode(file_item.name, True, mtime=file_stat.st_mtime, files=0)
+    tokens = get_file_tokens(str(file_item.path), file_stat.st_mtime) or 0
+    return StructureNode(file_item.name, False, tokens, file_stat.st_mtime)
+
+
+def build_structure(
+    root_item: FileItem,
+    file_node: Callable[[FileItem], Optional[StructureNode]] = _file_node,
+) -> StructureNode:
+    """
+    The StructureNode tree of a FileItem tree, with every file stat'd exactly once.
+
+    Args:
+        root_item: Root of the tree
+        file_node: Node of a file or directory, None to leave it out; by default
+            it stats the file and counts its tokens
+    """
+    root = StructureNode(root_item.name, True, files=0)
+    stack: List[Tuple[FileItem, StructureNode]] = [(root_item, root)]
+    while stack:
+        item, node = stack.pop()
+        for child_item in item.children:
+            child = file_node(child_item)
+            if child is None:
+                continue
+            node.children.append(child)
+            if child.is_dir:
+                stack.append((child_item, child))
+    return compute_totals(root)
+
+
+def format_entry(node: StructureNode) -> str:
+    """The line of a file or directory, without its tree prefix"""
+    if not node.is_dir:
+        return f"📄 {node.name} ({node.tokens} tokens)"
+    if node.hidden_entries and not node.children:
+        return f"📁 {node.name}/ ({node.tokens} tokens, {node.files} files not shown)"
+    return f"📁 {node.name}/ ({node.tokens} tokens)"
+
+
+def format_hidden_summary(node: StructureNode) -> str:
+    """The last line of a directory that shows only some of its entries"""
+    return (
+        f"… {node.hidden_entries} more entries "
+        f"({node.hidden_files} files, {node.hidden_tokens} tokens)"
+    )
+
+
+def render_tree_lines(root: StructureNode, buffer: io.StringIO):
+    """Write the lines below root in one pre-order walk"""
+    # (directory, prefix of its children's lines, position of the next child to write)
+    stack: List[Tuple[StructureNode, str, int]] = [(root, "", 0)]
+    write = buffer.write
+    while stack:
+        directory, prefix, position = stack.pop()
+        children = directory.children
+        summary = bool(directory.hidden_entries and children)
+        last = len(children) - 1 + summary
+        branch, last_branch = prefix + "├── ", prefix + "└── "
+        while position < len(children):
+            child = children[position]
+            line_prefix = last_branch if position == last else branch
+            position += 1
+            if child.is_dir:
+                write(f"{line_prefix}{format_entry(child)}\n")
+                # resume this directory after the subdirectory's lines
+                stack.append((directory, prefix, position))
+                child_prefix = prefix + ("    " if position > last else "│   ")
+                stack.append((child, child_prefix, 0))
+                break
+            # the common case, inlined
+            write(f"{line_prefix}📄 {child.name} ({child.tokens} tokens)\n")
+        else:
+            if summary:
+                write(f"{last_branch}{format_hidden_summary(directory)}\n")
+
+
+def render_structure(root: StructureNode, project_name: str) -> str:
+    """Markdown representation of the project structure"""
+    buffer = io.StringIO()
+    buffer.write(f"# Project Structure: {project_name}\n")
+    buffer.write("## Directory Structure\n```\n")
+    buffer.write(f"{project_name}/ ({root.tokens})\n")
+    render_tree_lines(root, buffer)
+    buffer.write("```\n")
+    return buffer.getvalue()
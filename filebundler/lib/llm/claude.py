@@ -8,7 +8,7 @@ from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.models.anthropic import AnthropicModelName
 from pydantic_ai.providers.anthropic import AnthropicProvider
 
-from filebundler.utils import BaseModel
+from filebundler.utils import BaseModel, tracing
 from filebundler.constants import get_env_settings
 
 
@@ -42,7 +42,7 @@ def anthropic_synchronous_prompt(
         Structured response from the LLM
     """
     env_settings = get_env_settings()
-    with logfire.span("prompting LLM for auto-bundle", model=model_type, _level="info"):
+    with tracing.span("prompting LLM for auto-bundle", model=model_type, _level="info"):
         model = AnthropicModel(
             # ModelType(model_type).value #  we don't validate here bc the options come from the selectbox
             model_type,
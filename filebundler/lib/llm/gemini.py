@@ -7,7 +7,7 @@ from pydantic_ai import Agent
 from pydantic_ai.models.gemini import GeminiModel, GeminiModelName
 from pydantic_ai.providers.google_gla import GoogleGLAProvider
 
-from filebundler.utils import BaseModel
+from filebundler.utils import BaseModel, tracing
 from filebundler.constants import get_env_settings
 
 # NOTE: Maintain this list manually, similar to ANTHROPIC_MODEL_NAMES
@@ -55,7 +55,7 @@ def gemini_synchronous_prompt(
     if not api_key:
         logfire.error("No Gemini API key found in environment or settings.")
         raise ValueError("Gemini API key is required.")
-    with logfire.span(
+    with tracing.span(
         "prompting Gemini LLM for auto-bundle", model=model_type, _level="info"
     ):
         model = GeminiModel(
@@ -5,16 +5,34 @@ import atexit
 import logging
 import argparse
 
-from filebundler import app
+from pathlib import Path
+
 from filebundler._version import VERSION
 
 
+def prepare_headless():
+    """
+    Keep the cli and the MCP server from importing logfire.
+
+    logfire registers a pydantic plugin, which pydantic imports (with logfire
+    and OpenTelemetry) when the first model is defined. Headless commands don't
+    trace model validation, so they skip it unless PYDANTIC_DISABLE_PLUGINS is set.
+    """
+    os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "logfire-plugin")
+
+
+def write_profile(path: str):
+    from filebundler.utils import profiler
+
+    if path == "-":
+        print(profiler.dump_json(), file=sys.stderr)
+    else:
+        Path(path).write_text(profiler.dump_json(), encoding="utf-8")
+
+
 def main():
     """Entry point function for the package."""
 
-    # Register app.cleanup to be called on normal exit
-    atexit.register(app.cleanup)
-
     # priniting anything to stdout will break the MCP server
     # print(f"Running FileBundler version {VERSION}")
 
@@ -56,7 +74,7 @@ def main():
         "cli", help="Run CLI actions without starting the web server"
     )
     parser_cli.add_argument(
-        "action", choices=["tree", "chat_instruction", "unbundle"], help="CLI action to perform ('tree', 'chat_instruction', 'unbundle')"
+        "action", choices=["tree", "chat_instruction", "unbundle", "export"], help="CLI action to perform ('tree', 'chat_instruction', 'unbundle', 'export')"
     )
     parser_cli.add_argument(
         "project_path",
@@ -64,6 +82,135 @@ def main():
         default=os.getcwd(),
         help="Path to the project root (default: current directory)",
     )
+    parser_cli.add_argument(
+        "--bundle",
+        default=None,
+        help="export: name of the saved bundle to export (default: the current selections)",
+    )
+    parser_cli.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="export: file to write the export to, '-' for stdout (default: clipboard)",
+    )
+    parser_cli.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="export: fit the export into this many tokens; tree: fit project-structure.md into this many tokens",
+    )
+    parser_cli.add_argument(
+        "--priority",
+        default="explicit",
+        choices=["explicit", "recency", "size"],
+        help="export: which files to keep first when fitting --max-tokens (default: explicit); "
+        "the web app's 'relevance' priority isn't offered, it ranks by an auto-bundle "
+        "suggestion that only the web app session holds",
+    )
+    parser_cli.add_argument(
+        "--overflow",
+        default="truncate",
+        choices=["truncate", "omit"],
+        help="export: truncate the first file that doesn't fit --max-tokens, or omit all that don't (default: truncate)",
+    )
+    parser_cli.add_argument(
+        "--max-part-tokens",
+        type=int,
+        default=None,
+        help="export: split the export into numbered parts of at most this many tokens (needs -o)",
+    )
+    parser_cli.add_argument(
+        "--order",
+        default="tree",
+        choices=["tree", "explicit", "stable_first"],
+        help="export: document order, stable_first puts files changed in the last hour last (default: tree)",
+    )
+    parser_cli.add_argument(
+        "--since-last-export",
+        action="store_true",
+        help="export: only export the files of --bundle changed since its last export",
+    )
+    parser_cli.add_argument(
+        "--since",
+        default=None,
+        metavar="REVISION",
+        help="export: only export the files changed since a git revision (e.g. HEAD~3, main)",
+    )
+    parser_cli.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="export: don't list the unchanged files of a --since/--since-last-export export",
+    )
+    parser_cli.add_argument(
+        "--outline",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="export: export this file (relative path) as an outline of its signatures and docstrings, can be repeated; use '--transform outline' for every file",
+    )
+    parser_cli.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="export: export every copy of identical files in full instead of referencing the first one",
+    )
+    parser_cli.add_argument(
+        "--transform",
+        action="append",
+        default=[],
+        choices=["outline", "strip_comments", "collapse_whitespace", "compact_indentation", "minify_data"],
+        help="export: shrink file contents before exporting, can be repeated (applied in the given order)",
+    )
+    parser_cli.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        metavar="N",
+        help="tree: show directories deeper than N collapsed",
+    )
+    parser_cli.add_argument(
+        "--max-children",
+        type=int,
+        default=None,
+        metavar="N",
+        help="tree: show at most N entries per directory, followed by a summary of the rest",
+    )
+    parser_cli.add_argument(
+        "--focus",
+        default=None,
+        choices=["tokens", "recent"],
+        help="tree: keep detail in the subtrees with the most tokens or the most recent changes (default: tokens)",
+    )
+    parser_cli.add_argument(
+        "-i",
+        "--input",
+        default=None,
+        metavar="FILE",
+        help="unbundle: read the bundle from this file ('-' for stdin) instead of the clipboard, files are written under project_path; a piped stdin is read without asking",
+    )
+    parser_cli.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="unbundle: print a unified diff of the files that would change instead of writing them",
+    )
+    parser_cli.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="unbundle: write up to N changed files in parallel (default: 1)",
+    )
+    parser_cli.add_argument(
+        "--format",
+        default="xml",
+        choices=["xml", "xml-escaped", "markdown", "jsonl"],
+        help="export: format of the bundle; 'xml' wraps contents in CDATA, 'xml-escaped' escapes them as entities (default: xml)",
+    )
+    parser_cli.add_argument(
+        "--profile",
+        default=None,
+        metavar="FILE",
+        help="write the time spent per phase (scan, tokenize, export...) as JSON to FILE, '-' for stderr",
+    )
     parser_cli.add_argument(
         "--log-level",
         default="info",
@@ -73,6 +220,34 @@ def main():
 
     # MCP Server subcommand
     parser_mcp = subparsers.add_parser("mcp", help="Start the FileBundler MCP server")
+    parser_mcp.add_argument(
+        "--max-projects",
+        type=int,
+        default=None,
+        metavar="N",
+        help="keep the indexes of at most N projects in memory, the least recently used is dropped (default: 4)",
+    )
+    parser_mcp.add_argument(
+        "--check-interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="check an indexed project for changed files at most every SECONDS (default: 2)",
+    )
+    parser_mcp.add_argument(
+        "--max-response-tokens",
+        type=int,
+        default=None,
+        metavar="N",
+        help="return exports larger than N tokens in pages, the caller fetches the rest with the next-cursor",
+    )
+    parser_mcp.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        metavar="N",
+        help="handle at most N tool calls at once, the others wait (default: 4)",
+    )
     parser_mcp.add_argument(
         "--log-level",
         default="info",
@@ -93,11 +268,27 @@ def main():
     if hasattr(args, "log_level") and args.log_level:
         os.environ["LOG_LEVEL"] = args.log_level
 
+    if args.command in ("cli", "mcp"):
+        prepare_headless()
+
+    if args.command == "cli" and args.profile:
+        # also written when an action exits early
+        atexit.register(write_profile, args.profile)
+
     if args.command == "cli":
         # CLI mode
         if args.action == "tree":
             from filebundler.services.project_structure import cli_entrypoint
-            cli_entrypoint([sys.argv[0], args.project_path])
+            overrides = {
+                "max_depth": args.max_depth,
+                "max_children": args.max_children,
+                "token_budget": args.max_tokens,
+                "focus": args.focus,
+            }
+            cli_entrypoint(
+                [sys.argv[0], args.project_path],
+                {key: value for key, value in overrides.items() if value is not None},
+            )
             return
         elif args.action == "chat_instruction":
             from filebundler.services.cli_chat_instruction import cli_chat_instruction
@@ -105,7 +296,35 @@ def main():
             return
         elif args.action == "unbundle":
             from filebundler.services.cli_unbundle import cli_unbundle
-            cli_unbundle()
+            cli_unbundle(Path(args.project_path), args.input, args.dry_run, args.jobs)
+            return
+        elif args.action == "export":
+            from pydantic import ValidationError
+            from filebundler.services.cli_export import cli_export
+            from filebundler.models.ExportOptions import ExportOptions
+            try:
+                options = ExportOptions(
+                    format=args.format,
+                    token_budget=args.max_tokens,
+                    priority=args.priority,
+                    overflow=args.overflow,
+                    transforms=args.transform,
+                    order=args.order,
+                    dedup=not args.no_dedup,
+                    outline_files=args.outline,
+                    since_last_export=args.since_last_export,
+                    changed_since_revision=args.since,
+                    unchanged_manifest=not args.no_manifest,
+                )
+            except ValidationError as e:
+                details = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                )
+                print(f"[FileBundler] Error: invalid export options, {details}")
+                sys.exit(1)
+            cli_export(
+                Path(args.project_path), args.bundle, args.output, options, args.max_part_tokens
+            )
             return
         else:
             logger = logging.getLogger("filebundler.cli")
@@ -118,10 +337,21 @@ def main():
         # import asyncio
         # asyncio.run(mcp_main())
 
-        mcp_main()
+        mcp_main(
+            max_projects=args.max_projects,
+            check_interval=args.check_interval,
+            max_response_tokens=args.max_response_tokens,
+            max_concurrency=args.max_concurrency,
+        )
         return
 
     # Web mode (default)
+    # cli and mcp return above without importing the Streamlit app, which takes seconds
+    from filebundler import app
+
+    # Register app.cleanup to be called on normal exit
+    atexit.register(app.cleanup)
+
     if "ANTHROPIC_API_KEY" not in os.environ and "GEMINI_API_KEY" not in os.environ:
         logging.warning(
             "\033[93mAnthropic or Gemini API key not found in environment variables. "
@@ -155,6 +385,8 @@ def main():
 
 
 if __name__ == "__main__":
+    from filebundler import app
+
     atexit.register(app.cleanup)
 
     try:
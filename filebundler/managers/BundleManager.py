@@ -1,6 +1,5 @@
 # filebundler/managers/BundleManager.py
 import logging
-import logfire
 
 from pathlib import Path
 from typing import Dict, Optional
@@ -12,7 +11,8 @@ from filebundler.utils import (
     dump_model_to_file,
     load_model_from_file,
 )
-from filebundler.ui.notification import show_temp_notification
+from filebundler.utils.notifications import show_temp_notification
+from filebundler.utils import profiler, tracing
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +32,18 @@ class BundleManager:
 
     def load_bundles(self):
         try:
-            with logfire.span(
+            with tracing.span(
                 "loading bundles for project {project}",
                 project=self.app.project_path.name,
             ):
                 # Load each bundle file
                 for bundle_file in self.bundles_dir.glob("*.json"):
                     try:
-                        with logfire.span(
-                            "loading bundle from {file}", file=bundle_file.name
-                        ):
+                        with tracing.span(
+                            "loading bundle from {file}",
+                            detail=True,
+                            file=bundle_file.name,
+                        ), profiler.phase("bundle_load"):
                             bundle = load_model_from_file(Bundle, bundle_file)
                             bundle.prune()
                             self.bundles_dict[bundle.name] = bundle
@@ -125,7 +127,7 @@ class BundleManager:
         assert self._find_bundle_by_name(bundle.name), (
             f"Bundle '{bundle.name}' not found in bundles"
         )
-        with logfire.span("activating bundle {name}", name=bundle.name):
+        with tracing.span("activating bundle {name}", name=bundle.name):
             self.current_bundle = bundle
             logger.info(f"Activated bundle '{bundle.name}'")
 
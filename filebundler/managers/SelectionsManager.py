@@ -1,6 +1,6 @@
 # filebundler/managers/SelectionsManager.py
+import time
 import logging
-import logfire
 
 from pathlib import Path
 from typing import Any, List, Optional
@@ -9,7 +9,8 @@ from filebundler.models.AppProtocol import AppProtocol
 from filebundler.services.cached_operations import get_total_tokens
 
 from filebundler.utils import json_dump, json_load, read_file
-from filebundler.ui.notification import show_temp_notification
+from filebundler.utils.notifications import show_temp_notification
+from filebundler.utils import profiler, tracing
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class SelectionsManager:
         self.load_selections()
 
     def load_selections(self):
-        with logfire.span(
+        with tracing.span(
             "loading selections for project {project}",
             project=self.app.project_path.name,
         ):
@@ -60,7 +61,9 @@ class SelectionsManager:
             return 0
 
         file_paths = tuple(str(fi.path) for fi in selected)
+        start = time.perf_counter_ns()
         mtimes = tuple(fi.path.stat().st_mtime for fi in selected)
+        profiler.record("stat", time.perf_counter_ns() - start)
 
         return get_total_tokens(file_paths, mtimes)
 
@@ -89,7 +92,7 @@ class SelectionsManager:
 
     def save_selections(self):
         """Save selected files to JSON file"""
-        with logfire.span(
+        with tracing.span(
             "saving selections for project {project}",
             project=self.app.project_path.name,
         ):
@@ -98,7 +101,7 @@ class SelectionsManager:
 
     def select_all_files(self):
         """Select all files in the project"""
-        with logfire.span(
+        with tracing.span(
             "selecting all files for project {project}",
             project=self.app.project_path.name,
         ):
@@ -117,7 +120,7 @@ class SelectionsManager:
     def clear_all_selections(self):
         """Clear all selected files"""
         try:
-            with logfire.span(
+            with tracing.span(
                 "clearing all selections for project {project}",
                 project=self.app.project_path.name,
             ):
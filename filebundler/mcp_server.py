@@ -1,26 +1,130 @@
-from typing import List
+import anyio
+import functools
+
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, TypeVar
 from pathlib import Path
 
 from filebundler.models.FileItem import FileItem
 from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.models.ProjectSettings import StructureSettings
+from filebundler.services.bundle_export import export_manifest, render_section
+from filebundler.services.section_cache import section_cache
+from filebundler.services.project_index import ProjectIndex, ProjectIndexCache
+from filebundler.services.project_structure import _generate_project_structure
+from filebundler.features.export.formats import get_format
+from filebundler.features.export.ordering import order_file_items
 
 from mcp.server.fastmcp import FastMCP
 
 
 mcp = FastMCP("filebundler")
+# shared by every tool call, so projects are scanned and tokenized once
+project_indexes = ProjectIndexCache()
+# caps every export_file_bundle response, None for no server-wide limit (see main)
+response_token_limit: Optional[int] = None
+
+DEFAULT_MAX_CONCURRENCY = 4
+# files of an export read and tokenized at once ahead of the export, as free request slots allow
+EXPORT_IO_WORKERS = 8
+# tool calls doing blocking work at once, the others wait for a slot (see main)
+request_limiter = anyio.CapacityLimiter(DEFAULT_MAX_CONCURRENCY)
+
+T = TypeVar("T")
+
+
+async def run_blocking(function: Callable[..., T], *args: Any) -> T:
+    """
+    Run blocking work in a worker thread, so the server keeps handling other requests.
+
+    A cancelled request waits for the step its thread is running and skips the
+    steps after it. Threads are never abandoned, so a request keeps its slot of
+    request_limiter until its thread is done and cancelled retries can't pile
+    up threads beyond max_concurrency.
+    """
+    return await anyio.to_thread.run_sync(function, *args)
+
+
+def blocking_tool(function: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Make a blocking tool async: it runs in a worker thread once a request slot is free"""
+
+    @functools.wraps(function)
+    async def tool(*args: Any, **kwargs: Any) -> T:
+        async with request_limiter:
+            return await run_blocking(functools.partial(function, *args, **kwargs))
+
+    return tool
+
+
+async def prerender_sections(file_items: List[FileItem], options: ExportOptions):
+    """
+    Read, tokenize and cache the sections of an export up to EXPORT_IO_WORKERS files at a time.
+
+    Called holding a slot of request_limiter: one worker renders in that slot,
+    the others only start if they get a free slot right away, so an export never
+    runs more threads than max_concurrency allows. Each file is a step of its
+    own, so a cancelled request stops after the files being rendered. The export
+    that follows is then assembled from the section cache; exports larger than
+    the cache are rendered by the export itself, in a single step.
+    """
+    if len(file_items) > section_cache.max_entries:
+        # the last sections would evict the first ones before the export reads them
+        return
+    export_format = get_format(options.format)
+    pending = iter(file_items)
+
+    async def worker():
+        for file_item in pending:
+            try:
+                await run_blocking(render_section, file_item, options, export_format)
+            except Exception:
+                # the export renders the file again and reports the error
+                pass
+
+    async def helper():
+        try:
+            request_limiter.acquire_nowait()
+        except anyio.WouldBlock:
+            # a busy server doesn't lend slots, the request's own worker renders the files
+            return
+        try:
+            await worker()
+        finally:
+            request_limiter.release()
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(worker)
+        for _ in range(min(EXPORT_IO_WORKERS, len(file_items)) - 1):
+            task_group.start_soon(helper)
 
 
 @mcp.tool()
-def export_file_bundle(
-    file_paths: List[str], project_path: str, bundle_name: str = "mcp-bundle"
+async def export_file_bundle(
+    file_paths: List[str],
+    project_path: str,
+    bundle_name: str = "mcp-bundle",
+    max_tokens: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None,
+    manifest_only: bool = False,
 ) -> str:
     """
     Bundles the specified files from a project and returns their content in XML format.
 
+    With max_tokens or max_bytes the bundle is returned in pages: each page holds as many
+    whole files as fit (a file too large for a page is split into chunks across pages) and
+    its <documents> tag has a next-cursor attribute until the last page. Call again with
+    that cursor and the same file_paths to get the next page.
+
     Args:
         file_paths: A list of relative file paths (strings) to include in the bundle.
         project_path: The absolute path to the root of the project.
         bundle_name: An optional name for the bundle (string).
+        max_tokens: Maximum number of tokens of the response.
+        max_bytes: Maximum size of the response in bytes.
+        cursor: The next-cursor of the previous page, omit it for the first page.
+        manifest_only: Only list the files with their token counts, without their contents,
+            to plan what to fetch.
 
     Returns:
         An XML string containing the bundled file contents.
@@ -30,43 +134,227 @@ def export_file_bundle(
         if not proj_path.is_dir():
             return f"<error>Project path '{project_path}' does not exist or is not a directory.</error>"
 
-        file_items: List[FileItem] = []
-        for rel_path_str in file_paths:
-            # FileItem expects path relative to project_path for initialization,
-            # but its internal path becomes absolute after validation.
-            # Here, we are creating FileItem with the relative path string.
-            # The project_path argument to FileItem constructor helps it resolve the full path.
-            file_item = FileItem(
-                path=Path(rel_path_str),
-                project_path=proj_path,
-                parent=None,
-                children=[],
-                selected=False,
+        async with request_limiter:
+            index = await run_blocking(project_indexes.get, proj_path)
+            file_items = await run_blocking(_resolve_file_items, index, proj_path, file_paths)
+            if not file_items:
+                return "<error>No valid files found to bundle. All specified paths might be directories, non-existent, or the list was empty.</error>"
+
+            if manifest_only:
+                return await run_blocking(_export_manifest, index, bundle_name, file_items)
+
+            if response_token_limit and (not max_tokens or max_tokens > response_token_limit):
+                max_tokens = response_token_limit
+            if cursor and not (max_tokens or max_bytes):
+                return "<error>Pass the max_tokens or max_bytes of the first page together with its cursor.</error>"
+
+            await prerender_sections(file_items, ExportOptions())
+            return await run_blocking(
+                _export_bundle, bundle_name, file_items, max_tokens, max_bytes, cursor
             )
-            if file_item.path.exists() and not file_item.is_dir:
-                file_items.append(file_item)
-            elif not file_item.path.exists():
-                # Consider how to report missing files; for now, they are silently skipped by Bundle
-                # Or we can return an error/warning message part
-                pass  # Silently skip missing files for now, Bundle will also filter them
-
-        if not file_items:
-            return "<error>No valid files found to bundle. All specified paths might be directories, non-existent, or the list was empty.</error>"
-
-        bundle = Bundle(name=bundle_name, file_items=file_items)
-        return bundle.export_code()
     except Exception as e:
         # Log the exception e for server-side diagnostics
         return f"<error>An unexpected error occurred: {str(e)}</error>"
 
 
+def _resolve_file_items(
+    index: ProjectIndex, proj_path: Path, file_paths: List[str]
+) -> List[FileItem]:
+    with index.lock:
+        indexed_items = {
+            rel_path_str: index.files.get(Path(rel_path_str).as_posix())
+            for rel_path_str in file_paths
+        }
+    file_items: List[FileItem] = []
+    for rel_path_str in file_paths:
+        indexed = indexed_items[rel_path_str]
+        if indexed:
+            file_items.append(indexed.item)
+            continue
+        # files outside the project's include patterns aren't indexed, export them anyway
+        # FileItem expects path relative to project_path for initialization,
+        # but its internal path becomes absolute after validation.
+        # Here, we are creating FileItem with the relative path string.
+        # The project_path argument to FileItem constructor helps it resolve the full path.
+        file_item = FileItem(
+            path=Path(rel_path_str),
+            project_path=proj_path,
+            parent=None,
+            children=[],
+            selected=False,
+        )
+        if file_item.path.exists() and not file_item.is_dir:
+            file_items.append(file_item)
+        elif not file_item.path.exists():
+            # Consider how to report missing files; for now, they are silently skipped by Bundle
+            # Or we can return an error/warning message part
+            pass  # Silently skip missing files for now, Bundle will also filter them
+    return file_items
+
+
+def _export_manifest(index: ProjectIndex, bundle_name: str, file_items: List[FileItem]) -> str:
+    with index.lock:
+        indexed_tokens = {relative: entry.tokens for relative, entry in index.files.items()}
+    listed = []
+    for file_item in order_file_items(file_items, ExportOptions()):
+        tokens = indexed_tokens.get(file_item.relative.as_posix())
+        listed.append((str(file_item), tokens if tokens is not None else file_item.tokens))
+    return export_manifest(bundle_name, listed)
+
+
+def _export_bundle(
+    bundle_name: str,
+    file_items: List[FileItem],
+    max_tokens: Optional[int],
+    max_bytes: Optional[int],
+    cursor: Optional[str],
+) -> str:
+    bundle = Bundle(name=bundle_name, file_items=file_items)
+    if max_tokens or max_bytes:
+        return bundle.export_page(max_tokens, max_bytes, cursor).content
+    return bundle.export_code()
+
+
+def _get_index(project_path: str) -> ProjectIndex:
+    proj_path = Path(project_path)
+    if not proj_path.is_dir():
+        raise ValueError(f"Project path '{project_path}' does not exist or is not a directory.")
+    return project_indexes.get(proj_path)
+
+
+@mcp.tool()
+@blocking_tool
+def project_structure(
+    project_path: str,
+    max_depth: Optional[int] = None,
+    max_children: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    focus: Literal["tokens", "recent"] = "tokens",
+) -> str:
+    """
+    Returns the project's directory tree in markdown, with the token count of every file and directory.
+
+    Args:
+        project_path: The absolute path to the root of the project.
+        max_depth: Show directories deeper than this collapsed, 1 shows only the top-level entries.
+        max_children: Show at most this many entries per directory, followed by a summary of the rest.
+        token_budget: Maximum number of tokens of the returned structure.
+        focus: Which subtrees keep their detail within the limits: the most tokens or the most recent changes.
+
+    Returns:
+        The project structure in markdown, like .filebundler/project-structure.md.
+    """
+    index = _get_index(project_path)
+    settings = index.app.psm.project_settings.structure_settings
+    overrides = {
+        "max_depth": max_depth,
+        "max_children": max_children,
+        "token_budget": token_budget,
+        "focus": focus,
+    }
+    settings = StructureSettings.model_validate(
+        {
+            **settings.model_dump(),
+            **{key: value for key, value in overrides.items() if value is not None},
+        }
+    )
+    return _generate_project_structure(index.app, settings, index.structure())
+
+
+@mcp.tool()
+@blocking_tool
+def token_counts(project_path: str, paths: List[str]) -> Dict[str, Optional[int]]:
+    """
+    Returns the token count of files and directories (the sum over their files).
+
+    Args:
+        project_path: The absolute path to the root of the project.
+        paths: Relative paths of files or directories, "." for the whole project.
+
+    Returns:
+        The token count of every path, null for paths that aren't part of the project.
+    """
+    return _get_index(project_path).token_counts(paths)
+
+
+@mcp.tool()
+@blocking_tool
+def largest_files(project_path: str, top_k: int = 20) -> dict:
+    """
+    Returns the files and the directories with the most tokens.
+
+    Args:
+        project_path: The absolute path to the root of the project.
+        top_k: Number of files and of directories returned.
+
+    Returns:
+        "files" with the path, tokens and bytes of each file, and "directories"
+        with the path, tokens and number of files of each directory, largest first.
+    """
+    index = _get_index(project_path)
+    return {
+        "files": [
+            {"path": entry.relative, "tokens": entry.tokens, "bytes": entry.identity.size}
+            for entry in index.largest_files(top_k)
+        ],
+        "directories": [
+            {"path": path, "tokens": totals.tokens, "files": totals.files}
+            for path, totals in index.largest_directories(top_k)
+        ],
+    }
+
+
+@mcp.tool()
+@blocking_tool
+def search_files(project_path: str, query: str, limit: int = 100) -> dict:
+    """
+    Finds project files by glob or by a substring of their path.
+
+    Args:
+        project_path: The absolute path to the root of the project.
+        query: A glob like "*.py" or "tests/test_*.py", matched against the path or the file name,
+            or else a case-insensitive substring of the path.
+        limit: Maximum number of files returned.
+
+    Returns:
+        "matches" with the path and tokens of each file sorted by path, and "total", the number of all matching files.
+    """
+    found, total = _get_index(project_path).search(query, limit)
+    return {
+        "matches": [{"path": entry.relative, "tokens": entry.tokens} for entry in found],
+        "total": total,
+    }
+
+
 # async def main():
 # """Runs the MCP server."""
 # from mcp.server.stdio import stdio_server
 # async with stdio_server():
 #     # async with stdio_server() as (read_stream, write_stream):
 #     mcp.run()
-def main():
+def main(
+    max_projects: Optional[int] = None,
+    check_interval: Optional[float] = None,
+    max_response_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+):
+    """
+    Run the MCP server over stdio.
+
+    Args:
+        max_projects: Number of project indexes kept in memory
+        check_interval: Seconds between checks of an index for changed files
+        max_response_tokens: Page exports larger than this many tokens, whatever the caller asks for
+        max_concurrency: Number of tool calls doing blocking work at once
+    """
+    global response_token_limit
+    response_token_limit = max_response_tokens
+    if max_concurrency is not None:
+        request_limiter.total_tokens = max_concurrency
+    if max_projects is not None:
+        project_indexes.max_projects = max_projects
+    if check_interval is not None:
+        project_indexes.check_interval = check_interval
     mcp.run()
 
 
@@ -1,7 +1,6 @@
 # filebundler/models/Bundle.py
 import re
 import logging
-import logfire
 
 from datetime import datetime
 from typing import List, Optional
@@ -9,12 +8,20 @@ from typing import List, Optional
 from pydantic import field_validator, Field, computed_field
 
 from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportResult import ExportResult
+from filebundler.models.ExportOptions import ExportOptions
 from filebundler.models.BundleMetadata import BundleMetadata
 from filebundler.models.BundleMetadata import format_datetime, format_file_size
 
-from filebundler.utils import BaseModel, read_file
+from filebundler.utils import BaseModel
+from filebundler.services.bundle_export import (
+    export_file_items,
+    export_file_items_in_parts,
+    export_file_items_page,
+)
 
-from filebundler.ui.notification import show_temp_notification
+from filebundler.utils.notifications import show_temp_notification
+from filebundler.utils import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +89,7 @@ class Bundle(BaseModel):
 
     def prune(self):
         """Remove files that no longer exist from a bundle"""
-        with logfire.span("pruning bundle {name}", name=self.name):
+        with tracing.span("pruning bundle {name}", name=self.name):
             original_count = len(self.file_items)
             self.file_items = [fi for fi in self.file_items if fi.path.exists()]
 
@@ -94,31 +101,75 @@ class Bundle(BaseModel):
                 logger.warning(warning_msg)
                 show_temp_notification(warning_msg, type="warning")
 
-    def export_code(self, further_documents: List[FileItem] = []) -> str:
-        with logfire.span(
+    def _export_items(self, further_documents: List[FileItem]) -> List[FileItem]:
+        # dict.fromkeys drops duplicates but keeps the bundle order, unlike a set
+        all_items = dict.fromkeys(self.file_items + further_documents)
+        return [fi for fi in all_items if not fi.is_dir]
+
+    def _resolve_options(self, options: Optional[ExportOptions]):
+        if options and options.since_last_export:
+            # a bundle that was never exported is exported in full
+            return options.model_copy(
+                update={"changed_since": self.metadata.export_stats.last_exported}
+            )
+        return options
+
+    def export(
+        self,
+        further_documents: List[FileItem] = [],
+        options: Optional[ExportOptions] = None,
+    ) -> ExportResult:
+        """Export the bundle once, returning the payload together with its stats"""
+        with tracing.span(
             "generating code_export for bundle {name}", name=self.name, _level="debug"
         ):
-            all_items = set(self.file_items + further_documents)
-            filtered_items = [fi for fi in all_items if not fi.is_dir]
-            filtered_items_str = "\n".join(
-                make_file_section(file_item, i)
-                for i, file_item in enumerate(filtered_items)
+            return export_file_items(
+                self.name,
+                self._export_items(further_documents),
+                self._resolve_options(options),
+            )
+
+    def export_parts(
+        self,
+        max_part_tokens: int,
+        further_documents: List[FileItem] = [],
+        options: Optional[ExportOptions] = None,
+    ) -> List[ExportResult]:
+        """Export the bundle as numbered parts of at most max_part_tokens tokens each"""
+        with tracing.span(
+            "generating code_export parts for bundle {name}", name=self.name, _level="debug"
+        ):
+            return export_file_items_in_parts(
+                self.name,
+                self._export_items(further_documents),
+                max_part_tokens,
+                self._resolve_options(options),
             )
-            return f"""<?xml version="1.0" encoding="UTF-8"?>
-<documents bundle-name="{self.name}" token-count="{self.tokens}">
-{filtered_items_str}
-</documents>"""
-
-
-# REFERENCES
-# https://docs.anthropic.com/en/docs/build-with-claude/prompt-engineering/use-xml-tags
-# https://docs.anthropic.com/en/docs/build-with-claude/prompt-engineering/long-context-tips#example-multi-document-structure
-def make_file_section(file_item: FileItem, index: int):
-    return f"""    <document index="{index}">
-        <source>
-            {file_item}
-        </source>
-        <document_content>
-{read_file(file_item.path)}
-        </document_content>
-    </document>"""
+
+    def export_page(
+        self,
+        max_tokens: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        cursor: Optional[str] = None,
+        further_documents: List[FileItem] = [],
+        options: Optional[ExportOptions] = None,
+    ) -> ExportResult:
+        """Export the page of the bundle starting at cursor, of at most max_tokens tokens and max_bytes bytes"""
+        with tracing.span(
+            "generating code_export page for bundle {name}", name=self.name, _level="debug"
+        ):
+            return export_file_items_page(
+                self.name,
+                self._export_items(further_documents),
+                max_tokens,
+                max_bytes,
+                cursor,
+                self._resolve_options(options),
+            )
+
+    def export_code(
+        self,
+        further_documents: List[FileItem] = [],
+        options: Optional[ExportOptions] = None,
+    ) -> str:
+        return self.export(further_documents, options).content
@@ -0,0 +1,48 @@
+# filebundler/models/ExportOptions.py
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+from pydantic import Field
+
+from filebundler.utils import BaseModel
+
+OverflowStrategy = Literal["truncate", "omit"]
+
+
+class ExportOptions(BaseModel):
+    """Options controlling how a bundle is exported"""
+
+    # name of a format in features.export.formats.FORMAT_REGISTRY
+    format: str = "xml"
+
+    # name of an ordering in features.export.ordering.ORDERING_REGISTRY
+    order: str = "tree"
+    # files changed within this many seconds go last with the "stable_first" order
+    recent_window_seconds: int = Field(default=3600, ge=0)
+
+    # maximum number of tokens of the whole export, None means no limit
+    token_budget: Optional[int] = Field(default=None, gt=0)
+    # name of a priority in features.export.priority.PRIORITY_REGISTRY
+    priority: str = "explicit"
+    # truncate the first file that doesn't fit, or omit every file that doesn't fit
+    overflow: OverflowStrategy = "truncate"
+    # relative path -> rank (lower is more relevant), used by the "relevance" priority
+    relevance_ranks: Dict[str, int] = Field(default_factory=dict)
+    # names of transforms in features.export.transforms.TRANSFORM_REGISTRY, applied in order
+    transforms: List[str] = Field(default_factory=list)
+    # relative paths of files exported as an outline (signatures and docstrings only),
+    # add "outline" to transforms to outline every file
+    outline_files: List[str] = Field(default_factory=list)
+    # export byte-identical files once and reference the first copy from the others
+    dedup: bool = True
+    # only export files modified after this time (Bundle.export fills it in for since_last_export)
+    changed_since: Optional[datetime] = None
+    # only export files that differ from this git revision (or are untracked)
+    changed_since_revision: Optional[str] = None
+    # only export files modified since the bundle's last recorded export
+    since_last_export: bool = False
+    # list the files a delta export left out because they didn't change
+    unchanged_manifest: bool = True
+
+
+__all__ = ["ExportOptions"]
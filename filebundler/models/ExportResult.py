@@ -0,0 +1,96 @@
+# filebundler/models/ExportResult.py
+from typing import Dict, List, Optional
+
+from pydantic import Field
+
+from filebundler.utils import BaseModel
+from filebundler.models.BundleMetadata import format_file_size
+from filebundler.services.section_cache import SectionCacheStats
+
+
+class ExportResult(BaseModel):
+    """The rendered payload of a bundle export plus the stats gathered while rendering it"""
+
+    bundle_name: str
+    content: str
+    # name of the export format and the language of the content, e.g. for syntax highlighting
+    format: str = "xml"
+    language: str = "xml"
+    tokens: int = 0
+    size_bytes: int = 0
+    file_count: int = 0
+    # seconds spent in each export phase
+    timings: Dict[str, float] = Field(default_factory=dict)
+    cache_stats: SectionCacheStats = Field(default_factory=SectionCacheStats)
+    token_budget: Optional[int] = None
+    # estimated tokens of the whole export when it was fitted into token_budget
+    budget_used_tokens: Optional[int] = None
+    # relative paths of the files that were cut or left out to fit the budget
+    truncated: List[str] = Field(default_factory=list)
+    dropped: List[str] = Field(default_factory=list)
+    # tokens saved by each export transform, measured against the raw file contents
+    saved_tokens: Dict[str, int] = Field(default_factory=dict)
+    # relative paths of the files exported as a reference to an identical file
+    duplicates: List[str] = Field(default_factory=list)
+    dedup_saved_tokens: int = 0
+    # what a delta export is relative to (a time or a git revision), None for full exports
+    changed_since: Optional[str] = None
+    # relative paths of the files a delta export skipped because they didn't change
+    unchanged: List[str] = Field(default_factory=list)
+    # number of this part and the total number of parts, for exports split into parts
+    part: Optional[int] = None
+    parts: Optional[int] = None
+    # where a paged export started and where the next page starts, None after the last page
+    cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+    @property
+    def size_str(self) -> str:
+        return format_file_size(self.size_bytes)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.timings.get("total", 0.0) * 1000
+
+    @property
+    def budget_str(self) -> str:
+        if not self.token_budget:
+            return ""
+        return (
+            f"~{self.budget_used_tokens}/{self.token_budget} budget tokens used, "
+            f"{len(self.truncated)} truncated, {len(self.dropped)} dropped"
+        )
+
+    @property
+    def saved_tokens_str(self) -> str:
+        if not self.saved_tokens:
+            return ""
+        per_transform = ", ".join(
+            f"{name}: {saved}" for name, saved in self.saved_tokens.items()
+        )
+        return f"{sum(self.saved_tokens.values())} tokens saved by transforms ({per_transform})"
+
+    @property
+    def summary(self) -> str:
+        summary = f"part {self.part}/{self.parts}: " if self.part else ""
+        summary += (
+            f"{self.file_count} files, {self.size_bytes} bytes, {self.tokens} tokens, "
+            f"{self.cache_stats.hit_rate_str}, exported in {self.duration_ms:.0f} ms"
+        )
+        if self.token_budget:
+            summary += f" ({self.budget_str})"
+        if self.saved_tokens:
+            summary += f", {self.saved_tokens_str}"
+        if self.changed_since:
+            summary += f", {len(self.unchanged)} unchanged files skipped since {self.changed_since}"
+        if self.duplicates:
+            summary += (
+                f", {len(self.duplicates)} duplicate files referenced "
+                f"({self.dedup_saved_tokens} tokens saved)"
+            )
+        if self.next_cursor:
+            summary += f", next page at cursor {self.next_cursor}"
+        return summary
+
+
+__all__ = ["ExportResult"]
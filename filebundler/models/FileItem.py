@@ -1,10 +1,12 @@
 # filebundler/models/FileItem.py
+import time
+
 from pathlib import Path
 from typing_extensions import List, Optional, Self
 from pydantic import Field, field_serializer, model_validator
 
 from filebundler.services.cached_operations import get_file_content, get_file_tokens
-from filebundler.utils import BaseModel
+from filebundler.utils import BaseModel, profiler
 
 
 class FileItem(BaseModel):
@@ -49,16 +51,23 @@ class FileItem(BaseModel):
     def is_dir(self):
         return self.path.is_dir()
 
+    def _file_mtime(self) -> Optional[float]:
+        """The file's mtime, None for directories and missing files"""
+        start = time.perf_counter_ns()
+        mtime = self.path.stat().st_mtime if self.path.is_file() else None
+        profiler.record("stat", time.perf_counter_ns() - start)
+        return mtime
+
     @property
     def content(self):
-        if self.path.is_file():
-            mtime = self.path.stat().st_mtime
+        mtime = self._file_mtime()
+        if mtime is not None:
             return get_file_content(str(self.path), mtime)
 
     @property
     def tokens(self):
-        if self.path.is_file():
-            mtime = self.path.stat().st_mtime
+        mtime = self._file_mtime()
+        if mtime is not None:
             return get_file_tokens(str(self.path), mtime)
         else:
             return sum(fi.tokens for fi in self.children)  # type: ignore
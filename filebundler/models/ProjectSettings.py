@@ -1,8 +1,8 @@
 # filebundler/models/ProjectSettings.py
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 from pathlib import Path
 
-from pydantic import field_serializer, field_validator
+from pydantic import Field, field_serializer, field_validator
 
 from filebundler.utils import BaseModel
 from filebundler.constants import DEFAULT_MAX_RENDER_FILES
@@ -16,12 +16,26 @@ class AutoBundleSettings(BaseModel):
     user_prompt: str = "Given the TODOs in the project, select the files that are relevant to the tasks."
 
 
+class StructureSettings(BaseModel):
+    """Limits of the generated project-structure.md, None means no limit."""
+
+    # directories deeper than this are shown collapsed, 1 shows only the top-level entries
+    max_depth: Optional[int] = Field(default=None, ge=1)
+    # directories with more entries show only this many, followed by a summary line
+    max_children: Optional[int] = Field(default=None, ge=1)
+    # maximum number of tokens of the whole structure
+    token_budget: Optional[int] = Field(default=None, gt=0)
+    # which subtrees keep their detail first: the most tokens or the most recent changes
+    focus: Literal["tokens", "recent"] = "tokens"
+
+
 class ProjectSettings(BaseModel):
     include_patterns: List[str] = []
     max_files: int = DEFAULT_MAX_RENDER_FILES
     sort_files_first: bool = True
     # alphabetical_sort: Literal["asc", "desc"] = "asc"
     auto_bundle_settings: AutoBundleSettings = AutoBundleSettings()
+    structure_settings: StructureSettings = StructureSettings()
     # NOTE the Optional is for backweard compatibility. From now on it will be always set.
     absolute_project_path: Optional[Path] = None
 
@@ -39,4 +53,4 @@ class ProjectSettings(BaseModel):
         return Path(value)
 
 
-__all__ = ["ProjectSettings"]
+__all__ = ["ProjectSettings", "StructureSettings"]
@@ -0,0 +1,858 @@
+# filebundler/services/bundle_export.py
+import time
+import hashlib
+import logging
+
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportResult import ExportResult
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.services.cached_operations import get_file_tokens
+from filebundler.services.token_count import count_tokens, truncate_to_tokens
+from filebundler.services.section_cache import (
+    RenderedSection,
+    SectionCacheStats,
+    section_cache,
+)
+
+from filebundler.features.export.delta import describe_delta, select_delta
+from filebundler.features.export.formats import (
+    Attributes,
+    ExportFormat,
+    ListedFile,
+    get_format,
+)
+from filebundler.features.export.ordering import order_file_items
+from filebundler.features.export.priority import rank_file_items
+from filebundler.features.export.budget import (
+    BudgetCostModel,
+    BudgetPlan,
+    plan_token_budget,
+)
+from filebundler.features.export.shards import (
+    ShardPiece,
+    pack_shards,
+    split_lines_to_tokens,
+)
+from filebundler.features.export.transforms import (
+    OUTLINE,
+    TRANSFORM_REGISTRY,
+    apply_transforms,
+    validate_transforms,
+)
+
+from filebundler.utils import profiler, read_file, tracing
+
+logger = logging.getLogger(__name__)
+
+# split_lines_to_tokens takes a single limit, page chunks are measured against
+# the token and byte limits as shares of a page in these units
+PAGE_SHARE_UNITS = 1_000_000
+
+
+def export_file_items(
+    bundle_name: str,
+    file_items: List[FileItem],
+    options: Optional[ExportOptions] = None,
+) -> ExportResult:
+    """
+    Render file items into a code bundle (XML by default) in a single pass.
+
+    Every file is stat'd once; its content is only read, transformed and
+    token-counted when the section cache doesn't hold a rendering for its
+    current mtime and size.
+
+    Args:
+        bundle_name: Name written into the bundle's header
+        file_items: Files to export, they are put in the order chosen by options.order
+        options: Export options, e.g. the format or a token budget the export must fit in
+
+    Returns:
+        ExportResult with the payload, its token count, byte size, file count and timings
+    """
+    options = options or ExportOptions()
+    validate_transforms(options.transforms)
+    export_format = get_format(options.format)
+    with tracing.span(
+        "exporting {file_count} files for bundle {name}",
+        name=bundle_name,
+        file_count=len(file_items),
+        _level="debug",
+    ), profiler.phase("export"):
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        bundle_items = file_items
+        prepared = prepare_export(file_items, options, export_format, timings)
+        file_items, rendered = prepared.file_items, prepared.rendered
+        manifest = prepared.manifest
+        rendered_at = time.perf_counter()
+
+        plan: Optional[BudgetPlan] = None
+        if options.token_budget:
+            # priorities rank the files in the order they were added to the bundle, not in export order
+            exported = set(file_items)
+            bundle_order = [fi for fi in dict.fromkeys(bundle_items) if fi in exported]
+            plan = plan_export_budget(
+                bundle_name, bundle_order, options, export_format, rendered, manifest
+            )
+            kept = set(plan.included) | set(plan.truncated)
+            # the budget decides which files are kept, not the order they are exported in
+            file_items = [fi for fi in file_items if fi in kept]
+            timings["budget"] = time.perf_counter() - rendered_at
+
+        assemble_start = time.perf_counter()
+        tokens = 0
+        size_bytes = 0
+        saved_tokens: Dict[str, int] = {}
+        # content hash -> (index, source) of the first document exported with that content
+        first_copies: Dict[str, Tuple[int, str]] = {}
+        duplicates: List[str] = []
+        dedup_saved_tokens = 0
+        sections: List[str] = []
+
+        for index, file_item in enumerate(file_items):
+            section = rendered[file_item]
+            for name, saved in (section.saved_tokens or {}).items():
+                saved_tokens[name] = saved_tokens.get(name, 0) + saved
+
+            if plan and file_item in plan.truncated:
+                truncated_content = plan.truncated[file_item]
+                truncated_tokens = count_tokens(truncated_content)
+                body = export_format.section_body(str(file_item), truncated_content)
+                attributes: Attributes = {
+                    "truncated": "true",
+                    "kept-tokens": truncated_tokens,
+                    "total-tokens": section.tokens,
+                }
+                sections.append(export_format.file_section(body, index, attributes))
+                tokens += truncated_tokens
+                size_bytes += len(truncated_content.encode("utf-8"))
+                continue
+
+            first_copy = first_copies.get(section.content_hash)
+            if options.dedup and first_copy:
+                reference = export_format.duplicate_section(
+                    str(file_item), index, *first_copy
+                )
+                reference_tokens = count_tokens(reference)
+                # tiny files are cheaper to repeat than to reference
+                if reference_tokens < section.tokens:
+                    sections.append(reference)
+                    tokens += reference_tokens
+                    duplicates.append(str(file_item))
+                    dedup_saved_tokens += section.tokens - reference_tokens
+                    continue
+
+            if section.content_hash:
+                first_copies.setdefault(section.content_hash, (index, str(file_item)))
+            tokens += section.tokens
+            size_bytes += section.size_bytes
+            sections.append(export_format.file_section(section.body, index))
+
+        if plan and plan.dropped:
+            sections.append(export_format.omitted_section(listed_files(plan.dropped)))
+        if manifest:
+            sections.append(manifest)
+
+        content = export_format.render_documents(bundle_name, tokens, sections)
+        end = time.perf_counter()
+
+        timings.update({"assemble": end - assemble_start, "total": end - start})
+        return ExportResult(
+            bundle_name=bundle_name,
+            content=content,
+            format=export_format.name,
+            language=export_format.language,
+            tokens=tokens,
+            size_bytes=size_bytes,
+            file_count=len(file_items),
+            timings=timings,
+            cache_stats=prepared.cache_stats,
+            token_budget=options.token_budget,
+            budget_used_tokens=plan.used_tokens if plan else None,
+            truncated=[str(fi) for fi in plan.truncated] if plan else [],
+            dropped=[str(fi) for fi in plan.dropped] if plan else [],
+            saved_tokens=saved_tokens,
+            duplicates=duplicates,
+            dedup_saved_tokens=dedup_saved_tokens,
+            changed_since=prepared.changed_since,
+            unchanged=[str(fi) for fi in prepared.unchanged],
+        )
+
+
+def export_file_items_in_parts(
+    bundle_name: str,
+    file_items: List[FileItem],
+    max_part_tokens: int,
+    options: Optional[ExportOptions] = None,
+) -> List[ExportResult]:
+    """
+    Render file items into numbered code bundles of at most max_part_tokens tokens each.
+
+    Documents are bin-packed over their rendered token counts, files too large
+    for a part are split at line boundaries into chunks spread over several
+    parts. Every part is a complete bundle stating its number, the number of
+    parts, and for chunks which chunk of the file it holds. Token
+    budgets and deduplication don't apply to parts.
+
+    Args:
+        bundle_name: Name written into every part's header
+        file_items: Files to export, they are put in the order chosen by options.order
+        max_part_tokens: Maximum number of tokens of a part
+        options: Export options, e.g. transforms or a delta export
+
+    Returns:
+        One ExportResult per part, in part order
+    """
+    options = options or ExportOptions()
+    validate_transforms(options.transforms)
+    export_format = get_format(options.format)
+    with tracing.span(
+        "exporting {file_count} files for bundle {name} in parts of {max_part_tokens} tokens",
+        name=bundle_name,
+        file_count=len(file_items),
+        max_part_tokens=max_part_tokens,
+        _level="debug",
+    ), profiler.phase("export"):
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        prepared = prepare_export(file_items, options, export_format, timings)
+        shard_start = time.perf_counter()
+
+        # the widest possible part and chunk markup, so no part ends up over the limit
+        part_overhead = count_tokens(
+            export_format.render_documents(
+                bundle_name, max_part_tokens, [], make_part_attributes(999, 999)
+            )
+        )
+        capacity = max_part_tokens - part_overhead
+        pieces: List[ShardPiece] = []
+        for position, file_item in enumerate(prepared.file_items):
+            section = prepared.rendered[file_item]
+            # the cached count of the unescaped content rules out documents that can't
+            # fit before counting the section exactly, as the format writes it
+            if section.tokens <= capacity:
+                text = export_format.file_section(section.body, position)
+                section_tokens = count_tokens(text + export_format.separator)
+                if section_tokens <= capacity:
+                    pieces.append(ShardPiece(file_item, position, section_tokens))
+                    continue
+
+            try:
+                chunks = split_document_for_page(
+                    file_item, position, options, export_format, capacity, None
+                )
+            except ValueError:
+                raise ValueError(
+                    f"{max_part_tokens} tokens per part can't fit the markup of {file_item}"
+                )
+            for chunk_number, chunk in enumerate(chunks, start=1):
+                body = export_format.section_body(str(file_item), chunk)
+                text = export_format.file_section(
+                    body, position, make_chunk_attributes(chunk_number, len(chunks))
+                )
+                pieces.append(
+                    ShardPiece(
+                        file_item,
+                        position,
+                        count_tokens(text + export_format.separator),
+                        chunk,
+                        chunk_number,
+                        len(chunks),
+                    )
+                )
+        if prepared.manifest:
+            pieces.append(
+                ShardPiece(
+                    None,
+                    len(prepared.file_items),
+                    count_tokens(prepared.manifest + export_format.separator),
+                )
+            )
+
+        parts = pack_shards(pieces, capacity)
+        timings["shard"] = time.perf_counter() - shard_start
+
+        results: List[ExportResult] = []
+        for part_number, part in enumerate(parts, start=1):
+            tokens = 0
+            size_bytes = 0
+            sections: List[str] = []
+            for piece in part:
+                if piece.file_item is None:
+                    sections.append(prepared.manifest)
+                elif piece.content is None:
+                    section = prepared.rendered[piece.file_item]
+                    sections.append(
+                        export_format.file_section(section.body, piece.position)
+                    )
+                    tokens += section.tokens
+                    size_bytes += section.size_bytes
+                else:
+                    body = export_format.section_body(str(piece.file_item), piece.content)
+                    attributes = make_chunk_attributes(piece.chunk, piece.chunks)
+                    sections.append(
+                        export_format.file_section(body, piece.position, attributes)
+                    )
+                    tokens += count_tokens(piece.content)
+                    size_bytes += len(piece.content.encode("utf-8"))
+
+            content = export_format.render_documents(
+                bundle_name,
+                tokens,
+                sections,
+                make_part_attributes(part_number, len(parts)),
+            )
+            results.append(
+                ExportResult(
+                    bundle_name=bundle_name,
+                    content=content,
+                    format=export_format.name,
+                    language=export_format.language,
+                    tokens=tokens,
+                    size_bytes=size_bytes,
+                    file_count=len({p.file_item for p in part if p.file_item}),
+                    cache_stats=prepared.cache_stats,
+                    changed_since=prepared.changed_since,
+                    unchanged=[str(fi) for fi in prepared.unchanged],
+                    part=part_number,
+                    parts=len(parts),
+                )
+            )
+
+        timings["total"] = time.perf_counter() - start
+        for result in results:
+            result.timings = timings
+        return results
+
+
+def export_file_items_page(
+    bundle_name: str,
+    file_items: List[FileItem],
+    max_tokens: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None,
+    options: Optional[ExportOptions] = None,
+) -> ExportResult:
+    """
+    Export the documents from cursor on that fit in max_tokens and max_bytes.
+
+    Pages hold whole documents in export order. A document too large for a
+    page on its own is split at line boundaries and exported one chunk per
+    page. Each page's header and ExportResult.next_cursor say where the next
+    page starts. Token budgets and deduplication don't apply to pages.
+
+    Args:
+        bundle_name: Name written into every page's header
+        file_items: Files to export, they are put in the order chosen by options.order
+        max_tokens: Maximum number of tokens of the page
+        max_bytes: Maximum size of the page in bytes
+        cursor: next_cursor of the previous page, None for the first page
+        options: Export options, e.g. transforms or the format
+
+    Returns:
+        ExportResult of the page
+    """
+    assert max_tokens or max_bytes, "A page needs a token or byte limit"
+    options = options or ExportOptions()
+    validate_transforms(options.transforms)
+    export_format = get_format(options.format)
+    with tracing.span(
+        "exporting a page of {file_count} files for bundle {name}",
+        name=bundle_name,
+        file_count=len(file_items),
+        cursor=cursor,
+        _level="debug",
+    ), profiler.phase("export"):
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        prepared = prepare_export(file_items, options, export_format, timings)
+        documents = prepared.file_items
+        position, chunk = parse_cursor(cursor)
+        if position > len(documents):
+            raise ValueError(f"Cursor {cursor} is past the last of {len(documents)} documents")
+
+        page_start = time.perf_counter()
+        # the widest possible header, so no page ends up over the limits
+        widest_header = export_format.render_documents(
+            bundle_name,
+            max_tokens or max_bytes or 0,
+            [],
+            make_page_attributes(len(documents), f"{len(documents)}:999999", f"{len(documents)}:999999"),
+        )
+        token_capacity = max_tokens - count_tokens(widest_header) if max_tokens else None
+        byte_capacity = max_bytes - len(widest_header.encode("utf-8")) if max_bytes else None
+        separator_bytes = len(export_format.separator)
+
+        def fits(page_tokens: int, page_bytes: int) -> bool:
+            return (token_capacity is None or page_tokens <= token_capacity) and (
+                byte_capacity is None or page_bytes <= byte_capacity
+            )
+
+        used_tokens = used_bytes = tokens = size_bytes = 0
+        sections: List[str] = []
+        first_position = position
+        next_cursor: Optional[str] = None
+        while position < len(documents):
+            file_item = documents[position]
+            section = prepared.rendered[file_item]
+            if not chunk:
+                text = export_format.file_section(section.body, position)
+                section_bytes = len(text.encode("utf-8")) + separator_bytes
+                # the cached count of the unescaped content rules out documents that
+                # can't fit before counting the escaped section exactly
+                section_tokens = section.tokens if token_capacity is not None else 0
+                if fits(used_tokens + section_tokens, used_bytes + section_bytes):
+                    if token_capacity is not None:
+                        section_tokens = count_tokens(text + export_format.separator)
+                if fits(used_tokens + section_tokens, used_bytes + section_bytes):
+                    sections.append(text)
+                    used_tokens += section_tokens
+                    used_bytes += section_bytes
+                    tokens += section.tokens
+                    size_bytes += section.size_bytes
+                    position += 1
+                    continue
+                if sections:
+                    next_cursor = f"{position}:0"
+                    break
+                chunk = 1
+
+            # a document too large for a page, exported one chunk per page
+            chunks = split_document_for_page(
+                file_item, position, options, export_format, token_capacity, byte_capacity
+            )
+            if chunk > len(chunks):
+                raise ValueError(f"Cursor {cursor} is past the last chunk of {file_item}")
+            content = chunks[chunk - 1]
+            body = export_format.section_body(str(file_item), content)
+            sections.append(
+                export_format.file_section(
+                    body, position, make_chunk_attributes(chunk, len(chunks))
+                )
+            )
+            tokens += count_tokens(content)
+            size_bytes += len(content.encode("utf-8"))
+            if chunk < len(chunks):
+                next_cursor = f"{position}:{chunk + 1}"
+            elif position + 1 < len(documents):
+                next_cursor = f"{position + 1}:0"
+            position += 1
+            break
+
+        if next_cursor is None and prepared.manifest:
+            manifest_tokens = (
+                count_tokens(prepared.manifest + export_format.separator)
+                if token_capacity is not None
+                else 0
+            )
+            manifest_bytes = len(prepared.manifest.encode("utf-8")) + separator_bytes
+            if not chunk and fits(used_tokens + manifest_tokens, used_bytes + manifest_bytes):
+                sections.append(prepared.manifest)
+            elif sections:
+                # the manifest gets a page of its own
+                next_cursor = f"{len(documents)}:0"
+            else:
+                # too long for any page, its files are listed over several pages
+                manifests = split_manifest_for_page(
+                    prepared, export_format, token_capacity, byte_capacity
+                )
+                chunk = max(chunk, 1)
+                if chunk > len(manifests):
+                    raise ValueError(f"Cursor {cursor} is past the last page of the manifest")
+                sections.append(manifests[chunk - 1])
+                if chunk < len(manifests):
+                    next_cursor = f"{len(documents)}:{chunk + 1}"
+        content = export_format.render_documents(
+            bundle_name,
+            tokens,
+            sections,
+            make_page_attributes(len(documents), cursor or "0:0", next_cursor),
+        )
+        end = time.perf_counter()
+        timings.update({"page": end - page_start, "total": end - start})
+        return ExportResult(
+            bundle_name=bundle_name,
+            content=content,
+            format=export_format.name,
+            language=export_format.language,
+            tokens=tokens,
+            size_bytes=size_bytes,
+            file_count=position - first_position,
+            timings=timings,
+            cache_stats=prepared.cache_stats,
+            changed_since=prepared.changed_since,
+            unchanged=[str(fi) for fi in prepared.unchanged],
+            cursor=cursor,
+            next_cursor=next_cursor,
+        )
+
+
+def split_document_for_page(
+    file_item: FileItem,
+    position: int,
+    options: ExportOptions,
+    export_format: ExportFormat,
+    token_capacity: Optional[int],
+    byte_capacity: Optional[int],
+) -> List[str]:
+    """Chunks of a document that each fit a page (or part) on their own, split at line boundaries"""
+    empty_body = export_format.section_body(str(file_item), "")
+    markup = export_format.file_section(empty_body, position, make_chunk_attributes(999, 999))
+    token_limit = (
+        token_capacity - count_tokens(markup + export_format.separator)
+        if token_capacity is not None
+        else None
+    )
+    byte_limit = (
+        byte_capacity - len(markup.encode("utf-8")) - len(export_format.separator)
+        if byte_capacity is not None
+        else None
+    )
+    if (token_limit is not None and token_limit <= 0) or (byte_limit is not None and byte_limit <= 0):
+        raise ValueError(f"The page limits can't fit the markup of {file_item}")
+
+    empty_body_bytes = len(empty_body.encode("utf-8"))
+    empty_body_tokens = count_tokens(empty_body)
+
+    def page_share(text: str) -> int:
+        """Share of the page a chunk takes, in millionths of the tighter limit"""
+        # measured escaped, escaping can make the content longer
+        body = export_format.section_body(str(file_item), text)
+        share = 0
+        if token_limit is not None:
+            share = -(-(count_tokens(body) - empty_body_tokens) * PAGE_SHARE_UNITS // token_limit)
+        if byte_limit is not None:
+            body_bytes = len(body.encode("utf-8")) - empty_body_bytes
+            share = max(share, -(-body_bytes * PAGE_SHARE_UNITS // byte_limit))
+        return share
+
+    return split_lines_to_tokens(
+        read_transformed_content(file_item, file_transforms(file_item, options)),
+        PAGE_SHARE_UNITS,
+        page_share,
+    )
+
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """(document position, chunk) of a page cursor, chunk 0 starts with the whole document"""
+    if not cursor:
+        return 0, 0
+    try:
+        position, chunk = (int(value) for value in cursor.split(":"))
+    except ValueError:
+        raise ValueError(
+            f"Invalid cursor {cursor!r}, pass the next-cursor of the previous page"
+        ) from None
+    if position < 0 or chunk < 0:
+        raise ValueError(f"Invalid cursor {cursor!r}, pass the next-cursor of the previous page")
+    return position, chunk
+
+
+def export_manifest(
+    bundle_name: str,
+    files: List[ListedFile],
+    options: Optional[ExportOptions] = None,
+) -> str:
+    """
+    A bundle listing files and their token counts without their contents.
+
+    Args:
+        bundle_name: Name written into the bundle's header
+        files: (relative path, tokens) of every file, in export order
+        options: Export options, only the format is used
+    """
+    export_format = get_format((options or ExportOptions()).format)
+    return export_format.render_documents(
+        bundle_name,
+        sum(tokens for _, tokens in files),
+        [export_format.manifest_section(files)],
+        {"documents": len(files), "manifest-only": "true"},
+    )
+
+
+class PreparedExport(NamedTuple):
+    """The files of an export in their final order, rendered"""
+
+    file_items: List[FileItem]
+    rendered: Dict[FileItem, RenderedSection]
+    cache_stats: SectionCacheStats
+    # what a delta export is relative to, None for full exports
+    changed_since: Optional[str]
+    unchanged: List[FileItem]
+    # listing of the unchanged files, empty if there is none
+    manifest: str
+
+
+def prepare_export(
+    file_items: List[FileItem],
+    options: ExportOptions,
+    export_format: ExportFormat,
+    timings: Dict[str, float],
+) -> PreparedExport:
+    """Order the files, keep the changed ones for delta exports and render them through the section cache"""
+    start = time.perf_counter()
+    # a deterministic order keeps the prefix of the export byte-identical across runs
+    file_items = order_file_items(file_items, options)
+
+    changed_since = describe_delta(options)
+    unchanged: List[FileItem] = []
+    manifest = ""
+    if changed_since:
+        file_items, unchanged = select_delta(file_items, options)
+        if unchanged and options.unchanged_manifest:
+            manifest = export_format.unchanged_section(
+                listed_files(unchanged), changed_since
+            )
+        timings["delta"] = time.perf_counter() - start
+
+    render_start = time.perf_counter()
+    # every file is rendered before budgeting, so the budget sees the transformed token counts
+    cache_stats = SectionCacheStats()
+    rendered: Dict[FileItem, RenderedSection] = {}
+    for file_item in file_items:
+        rendered[file_item] = render_section(file_item, options, export_format, cache_stats)
+    timings["render"] = time.perf_counter() - render_start
+    return PreparedExport(
+        file_items, rendered, cache_stats, changed_since, unchanged, manifest
+    )
+
+
+def render_section(
+    file_item: FileItem,
+    options: ExportOptions,
+    export_format: ExportFormat,
+    cache_stats: Optional[SectionCacheStats] = None,
+) -> RenderedSection:
+    """
+    A file's section, from the section cache or rendered into it.
+
+    Rendering the files of an export ahead of it (e.g. concurrently, or one at a
+    time between cancellation checks) leaves the export itself only cache hits.
+    """
+    transforms = file_transforms(file_item, options)
+    return section_cache.get_or_render(
+        file_item,
+        section_cache_format(export_format, transforms),
+        partial(render_file_section_body, file_item, transforms, export_format),
+        cache_stats or SectionCacheStats(),
+    )
+
+
+def section_cache_format(export_format: ExportFormat, transforms: List[str]) -> str:
+    """Name under which sections are cached, transformed sections are cached apart from raw ones"""
+    return "+".join([export_format.name, *transforms])
+
+
+def file_transforms(file_item: FileItem, options: ExportOptions) -> List[str]:
+    """The transforms of a file: the bundle's, after the outline if the file is exported as one"""
+    if str(file_item) in options.outline_files and OUTLINE not in options.transforms:
+        return [OUTLINE, *options.transforms]
+    return options.transforms
+
+
+def split_manifest_for_page(
+    prepared: PreparedExport,
+    export_format: ExportFormat,
+    token_capacity: Optional[int],
+    byte_capacity: Optional[int],
+) -> List[str]:
+    """Listings of the unchanged files of a delta export that each fit a page on their own"""
+    assert prepared.changed_since, "Only delta exports list unchanged files"
+
+    def render(files: List[ListedFile]) -> str:
+        return export_format.unchanged_section(files, prepared.changed_since)
+
+    def fits(files: List[ListedFile]) -> bool:
+        text = render(files) + export_format.separator
+        return (token_capacity is None or count_tokens(text) <= token_capacity) and (
+            byte_capacity is None or len(text.encode("utf-8")) <= byte_capacity
+        )
+
+    if not fits([]):
+        raise ValueError("The page limits can't fit the markup of the unchanged files' listing")
+
+    # greedy over the cost of each listed file, then checked exactly as tokens can merge
+    empty = render([])
+    empty_tokens, empty_bytes = count_tokens(empty), len(empty.encode("utf-8"))
+    groups: List[List[ListedFile]] = []
+    current: List[ListedFile] = []
+    used_tokens = used_bytes = 0
+    for listed in listed_files(prepared.unchanged):
+        single = render([listed])
+        file_tokens = count_tokens(single) - empty_tokens if token_capacity is not None else 0
+        file_bytes = len(single.encode("utf-8")) - empty_bytes
+        if current and (
+            (token_capacity is not None and used_tokens + file_tokens + empty_tokens > token_capacity)
+            or (byte_capacity is not None and used_bytes + file_bytes + empty_bytes > byte_capacity)
+        ):
+            groups.append(current)
+            current, used_tokens, used_bytes = [], 0, 0
+        current.append(listed)
+        used_tokens += file_tokens
+        used_bytes += file_bytes
+    if current:
+        groups.append(current)
+
+    checked: List[List[ListedFile]] = []
+    while groups:
+        group = groups.pop(0)
+        if len(group) > 1 and not fits(group):
+            middle = len(group) // 2
+            groups[:0] = [group[:middle], group[middle:]]
+            continue
+        checked.append(group)
+    return [render(group) for group in checked]
+
+
+def plan_export_budget(
+    bundle_name: str,
+    file_items: List[FileItem],
+    options: ExportOptions,
+    export_format: ExportFormat,
+    rendered: Dict[FileItem, RenderedSection],
+    manifest: str = "",
+) -> BudgetPlan:
+    """Rank the files by the chosen priority and fit their rendered sections into the token budget"""
+    assert options.token_budget, "A token budget is required to plan an export"
+    with tracing.span(
+        "fitting bundle {name} into {token_budget} tokens",
+        name=bundle_name,
+        token_budget=options.token_budget,
+        _level="debug",
+    ):
+        empty_omitted_tokens = count_tokens(export_format.omitted_section([]))
+        # costed as if truncated, at the widest index: a truncated section carries more attributes
+        widest_attributes: Attributes = {
+            "truncated": "true",
+            "kept-tokens": options.token_budget,
+            "total-tokens": max((section.tokens for section in rendered.values()), default=0),
+        }
+        if export_format.escapes_content:
+            # escaping adds tokens, so contents are costed as the format writes them
+            empty_body_tokens = count_tokens(export_format.section_body("", ""))
+
+            def content_cost(content: str) -> int:
+                return count_tokens(export_format.section_body("", content)) - empty_body_tokens
+
+            def content_tokens(fi: FileItem) -> int:
+                return count_tokens(rendered[fi].body) - empty_body_tokens
+
+        else:
+            content_cost = count_tokens
+
+            def content_tokens(fi: FileItem) -> int:
+                return rendered[fi].tokens
+
+        def truncate(fi: FileItem, max_tokens: int) -> str:
+            content = read_transformed_content(fi, file_transforms(fi, options))
+            kept = truncate_to_tokens(content, max_tokens)
+            # raw tokens are cut first, then trimmed by whatever escaping added
+            while kept and (excess := content_cost(kept) - max_tokens) > 0:
+                kept = truncate_to_tokens(kept, count_tokens(kept) - excess)
+            return kept
+
+        costs = BudgetCostModel(
+            content_tokens=content_tokens,
+            section_overhead=lambda fi: count_tokens(
+                export_format.file_section(
+                    export_format.section_body(str(fi), ""), len(file_items), widest_attributes
+                )
+                + export_format.separator
+            ),
+            omitted_listing=lambda fi: count_tokens(
+                export_format.omitted_section(listed_files([fi]))
+            )
+            - empty_omitted_tokens,
+            truncate=truncate,
+            count_tokens=content_cost,
+        )
+        # the bundle's header and footer, the omitted listing's wrapper and the manifest are always paid for
+        fixed_overhead = count_tokens(
+            export_format.render_documents(
+                bundle_name,
+                options.token_budget,
+                [export_format.omitted_section([]), manifest],
+            )
+        )
+        plan = plan_token_budget(
+            rank_file_items(file_items, options),
+            options.token_budget - fixed_overhead,
+            options.overflow,
+            costs,
+        )
+        plan.used_tokens += fixed_overhead
+        return plan
+
+
+def make_part_attributes(part: int, parts: int) -> Attributes:
+    return {"part": part, "parts": parts}
+
+
+def make_chunk_attributes(chunk: int, chunks: int) -> Attributes:
+    return {"chunk": chunk, "chunks": chunks}
+
+
+def make_page_attributes(documents: int, cursor: str, next_cursor: Optional[str]) -> Attributes:
+    attributes: Attributes = {"documents": documents, "cursor": cursor}
+    if next_cursor:
+        attributes["next-cursor"] = next_cursor
+    return attributes
+
+
+def listed_files(file_items: List[FileItem]) -> List[ListedFile]:
+    return [(str(fi), fi.tokens) for fi in file_items]
+
+
+def read_export_content(file_item: FileItem, transforms: Optional[List[str]]) -> str:
+    # untransformed contents keep their line endings, so unbundling restores the file as it
+    # was; transforms rewrite contents anyway and work on "\n" lines
+    return read_file(file_item.path, newline=None if transforms else "")
+
+
+def read_transformed_content(file_item: FileItem, transforms: List[str]) -> str:
+    content = read_export_content(file_item, transforms)
+    for name in transforms:
+        content = TRANSFORM_REGISTRY[name](content, file_item.path)
+    return content
+
+
+def render_file_section_body(
+    file_item: FileItem,
+    transforms: Optional[List[str]] = None,
+    export_format: Optional[ExportFormat] = None,
+) -> RenderedSection:
+    export_format = export_format or get_format("xml")
+    content = read_export_content(file_item, transforms)
+    stat_start = time.perf_counter_ns()
+    stat = file_item.path.stat()
+    profiler.record("stat", time.perf_counter_ns() - stat_start)
+    tokens = get_file_tokens(str(file_item.path), stat.st_mtime)
+    if "\r" in content:
+        # the cached count is of the content with "\n" line endings
+        tokens = count_tokens(content)
+    if not transforms:
+        return RenderedSection(
+            export_format.section_body(str(file_item), content),
+            tokens,
+            stat.st_size,
+            content_hash=hash_content(content),
+        )
+
+    content, transformed_tokens, saved_tokens = apply_transforms(
+        content, file_item.path, transforms, tokens, count_tokens
+    )
+    return RenderedSection(
+        export_format.section_body(str(file_item), content),
+        transformed_tokens,
+        len(content.encode("utf-8")),
+        saved_tokens,
+        hash_content(content),
+    )
+
+
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
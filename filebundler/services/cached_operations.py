@@ -1,15 +1,21 @@
 """
 Cached operations for file I/O and token counting.
-Uses Streamlit's caching for optimal performance in Streamlit apps.
+Uses in-process LRU caches keyed by mtime, so the web app, the cli and the
+MCP server share them without importing Streamlit.
 """
 
-from typing import TypedDict
-import streamlit as st
-import tiktoken
+import time
+import threading
+
 from pathlib import Path
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, TypedDict
+
+from filebundler.utils import profiler
 
 
-@st.cache_resource
+@lru_cache(maxsize=None)
 def get_tiktoken_encoder(model: str = "o200k_base"):
     """
     Get cached tiktoken encoder instance.
@@ -23,10 +29,77 @@ def get_tiktoken_encoder(model: str = "o200k_base"):
     Returns:
         Tiktoken encoder instance
     """
+    # tiktoken takes a while to import, only pay for it when counting tokens
+    import tiktoken
+
     return tiktoken.get_encoding(model)
 
 
-@st.cache_data(ttl=600, max_entries=2000, show_spinner=False)
+# characters of file contents kept in memory; exports keep their rendered sections
+# in the section cache, so this mostly serves token counts and previews
+DEFAULT_MAX_CONTENT_CHARS = 32 * 1024 * 1024
+
+
+class FileContentCache:
+    """
+    LRU cache of file contents bounded by their total length, one entry per file.
+
+    A file read at another mtime replaces its previous entry, so stale contents
+    never accumulate. Contents larger than an eighth of the bound aren't kept.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CONTENT_CHARS):
+        self.max_chars = max_chars
+        self.chars = 0
+        self._entries: OrderedDict[str, Tuple[float, Optional[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, file_path: str, mtime: float, read: Callable[[str], Optional[str]]
+    ) -> Optional[str]:
+        """The content of file_path at mtime, read (and cached) on a miss"""
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry and entry[0] == mtime:
+                self._entries.move_to_end(file_path)
+                return entry[1]
+
+        content = read(file_path)
+        length = len(content) if content else 0
+
+        with self._lock:
+            previous = self._entries.pop(file_path, None)
+            if previous:
+                self.chars -= len(previous[1] or "")
+            if length <= self.max_chars // 8:
+                self._entries[file_path] = (mtime, content)
+                self.chars += length
+            while self.chars > self.max_chars:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.chars -= len(evicted or "")
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.chars = 0
+
+    def info(self) -> str:
+        return f"entries={len(self._entries)}, chars={self.chars}, max_chars={self.max_chars}"
+
+
+file_content_cache = FileContentCache()
+
+
+def _read_file_content(file_path: str) -> Optional[str]:
+    from filebundler.utils import read_file
+
+    try:
+        return read_file(Path(file_path))
+    except (FileNotFoundError, OSError, UnicodeDecodeError):
+        return None
+
+
 def get_file_content(file_path: str, mtime: float):
     """
     Get cached file contents with automatic mtime-based invalidation.
@@ -41,20 +114,16 @@ def get_file_content(file_path: str, mtime: float):
     Returns:
         File contents as string, or None if file cannot be read
     """
-    from filebundler.utils import read_file
-
-    try:
-        return read_file(Path(file_path))
-    except (FileNotFoundError, OSError, UnicodeDecodeError):
-        return None
+    return file_content_cache.get(file_path, mtime, _read_file_content)
 
 
-@st.cache_data(ttl=3600, max_entries=1000, show_spinner=False)
+# token counts are small, keep enough for large projects (the MCP index re-reads them)
+@lru_cache(maxsize=50_000)
 def get_file_tokens(file_path: str, mtime: float, model: str = "o200k_base") -> int:
     """
     Get cached token count for file with mtime-based invalidation.
 
-    Token counting is expensive, so we cache results for up to 1 hour.
+    Token counting is expensive, so we cache results.
     Cache is automatically invalidated when file is modified.
 
     Args:
@@ -71,10 +140,13 @@ def get_file_tokens(file_path: str, mtime: float, model: str = "o200k_base") ->
         return 0
 
     encoder = get_tiktoken_encoder(model)
-    return len(encoder.encode(content))
+    start = time.perf_counter_ns()
+    tokens = len(encoder.encode(content))
+    profiler.record("tokenize", time.perf_counter_ns() - start)
+    return tokens
 
 
-@st.cache_data(ttl=60, max_entries=100, show_spinner=False)
+@lru_cache(maxsize=100)
 def get_total_tokens(
     file_paths: tuple[str, ...],
     mtimes: tuple[float, ...],
@@ -103,9 +175,9 @@ def get_total_tokens(
 # NOTE: this is a utility for debugging, it's never called by the code
 def clear_file_caches():
     """Clear all file-related caches. Useful for debugging or manual refresh."""
-    get_file_content.clear()  #  pyright: ignore[reportFunctionMemberAccess]
-    get_file_tokens.clear()  #  pyright: ignore[reportFunctionMemberAccess]
-    get_total_tokens.clear()  #  pyright: ignore[reportFunctionMemberAccess]
+    file_content_cache.clear()
+    get_file_tokens.cache_clear()
+    get_total_tokens.cache_clear()
 
 class TokenCacheStats(TypedDict):
     file_content_cache: str
@@ -121,8 +193,8 @@ def get_cache_stats() -> TokenCacheStats:
         Dictionary with cache information
     """
     return {
-        "file_content_cache": "active",
-        "file_tokens_cache": "active",
-        "total_tokens_cache": "active",
-        "encoder_cache": "active (singleton)",
+        "file_content_cache": file_content_cache.info(),
+        "file_tokens_cache": str(get_file_tokens.cache_info()),
+        "total_tokens_cache": str(get_total_tokens.cache_info()),
+        "encoder_cache": str(get_tiktoken_encoder.cache_info()),
     }
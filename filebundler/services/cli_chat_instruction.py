@@ -10,7 +10,7 @@ To provide multiple code files as a single bundle, output your answer in the fol
 
 Wrap all files in a single `<documents bundle-name="your-bundle-name">` ... `</documents>` block. For each file, use a `<document>` tag with:
 - `<source>`: the file path (relative to project root)
-- `<document_content>`: the full file content
+- `<document_content>`: the full file content, wrapped in `<![CDATA[` ... `]]>` so it needs no escaping
 
 ## Example (for two files)
 
@@ -22,7 +22,10 @@ Wrap all files in a single `<documents bundle-name="your-bundle-name">` ... `</d
             src/main.py
         </source>
         <document_content>
-print('Hello, world!')
+<![CDATA[print('Hello, world!')
+if 1 < 2:
+    print("<tags> & ampersands need no escaping")
+]]>
         </document_content>
     </document>
     <document index="1">
@@ -30,13 +33,15 @@ print('Hello, world!')
             requirements.txt
         </source>
         <document_content>
-requests==2.31.0
+<![CDATA[requests==2.31.0
+]]>
         </document_content>
     </document>
 </documents>
 ```
 
 - Indent and format as shown for readability.
+- If a file contains `]]>`, write it as `]]]]><![CDATA[>`.
 - Do not include any text outside the XML block.
 - The user will copy the entire XML and run `filebundler cli unbundle` to create all files at once.
 
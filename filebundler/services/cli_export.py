@@ -0,0 +1,165 @@
+# filebundler/services/cli_export.py
+import sys
+import json
+import logging
+
+from pathlib import Path
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from filebundler.constants import SELECTIONS_BUNDLE_NAME
+from filebundler.models.Bundle import Bundle
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportResult import ExportResult
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.services.code_export_service import (
+    ExecutionEnvironment,
+    copy_code_from_bundle,
+)
+
+from filebundler.utils import dump_model_to_file, read_file
+
+logger = logging.getLogger(__name__)
+
+
+def _file_items_from_paths(project_path: Path, paths: List[str]) -> List[FileItem]:
+    return [FileItem(path=Path(p), project_path=project_path) for p in paths]
+
+
+def find_bundle_file(project_path: Path, bundle_name: str) -> Path:
+    bundles_dir = project_path / ".filebundler" / "bundles"
+    candidates = [bundles_dir / f"{bundle_name}.json", bundles_dir / bundle_name]
+    bundle_file = next((c for c in candidates if c.is_file()), None)
+    if not bundle_file:
+        raise FileNotFoundError(f"Bundle '{bundle_name}' not found in {bundles_dir}")
+    return bundle_file
+
+
+def load_bundle_from_project(project_path: Path, bundle_name: str) -> Bundle:
+    """
+    Load a saved bundle without scanning the whole project.
+
+    File paths are re-anchored on project_path, so bundles keep working when the
+    project was moved after they were saved.
+    """
+    data = json.loads(read_file(find_bundle_file(project_path, bundle_name)))
+    data["file_items"] = _file_items_from_paths(
+        project_path, [fi["path"] for fi in data.get("file_items", [])]
+    )
+    return Bundle.model_validate(data)
+
+
+def load_selections_bundle(project_path: Path) -> Bundle:
+    """Build a bundle from the selections persisted by the web app"""
+    selections_file = project_path / ".filebundler" / "selections.json"
+    if not selections_file.is_file():
+        raise FileNotFoundError(f"No selections saved in {selections_file}")
+
+    selections: List[str] = json.loads(read_file(selections_file)) or []
+    return Bundle(
+        name=SELECTIONS_BUNDLE_NAME,
+        file_items=_file_items_from_paths(project_path, selections),
+    )
+
+
+def cli_export(
+    project_path: Path,
+    bundle_name: Optional[str],
+    output: Optional[str],
+    options: Optional[ExportOptions] = None,
+    max_part_tokens: Optional[int] = None,
+):
+    """
+    Export a saved bundle (or the current selections) from the command line.
+
+    Args:
+        project_path: Root of the project
+        bundle_name: Name of a saved bundle; the persisted selections are used if None
+        output: File to write the export to, "-" for stdout, or None for the clipboard
+        options: Export options, e.g. a token budget
+        max_part_tokens: Split the export into numbered parts of at most this many tokens
+    """
+    try:
+        if max_part_tokens is not None and max_part_tokens <= 0:
+            print("[FileBundler] --max-part-tokens must be greater than 0.")
+            sys.exit(1)
+        project_path = project_path.resolve()
+        bundle = (
+            load_bundle_from_project(project_path, bundle_name)
+            if bundle_name
+            else load_selections_bundle(project_path)
+        )
+        if not bundle.file_items:
+            print(f"[FileBundler] Bundle '{bundle.name}' has no files to export.")
+            sys.exit(1)
+        if options and options.since_last_export and not bundle_name:
+            print("[FileBundler] --since-last-export needs a saved bundle (--bundle).")
+            sys.exit(1)
+
+        if max_part_tokens:
+            if output is None:
+                print("[FileBundler] --max-part-tokens needs -o (a file name or '-' for stdout).")
+                sys.exit(1)
+            write_export_parts(bundle, output, max_part_tokens, options)
+        elif output is None:
+            if not copy_code_from_bundle(bundle, ExecutionEnvironment.CLI, options):
+                sys.exit(1)
+        else:
+            write_export(bundle, output, options)
+
+        if bundle_name and options and options.since_last_export:
+            # the next --since-last-export starts from this one; plain exports leave the
+            # bundle file alone, rewriting it on every export would churn it for nothing
+            dump_model_to_file(bundle, find_bundle_file(project_path, bundle_name))
+    except Exception as e:
+        print(f"[FileBundler] Error: {e}")
+        logger.error(f"Error in export CLI: {e}", exc_info=True)
+        sys.exit(1)
+
+
+def write_export(bundle: Bundle, output: str, options: Optional[ExportOptions]):
+    """Write an export to a file, or to stdout if output is "-"."""
+    export_result = bundle.export(options=options)
+    bundle.metadata.export_stats.record_export()
+    if output == "-":
+        sys.stdout.write(export_result.content)
+        sys.stdout.flush()
+        # stdout carries the payload, so the summary goes to stderr
+        print(f"[FileBundler] {export_result.summary}", file=sys.stderr)
+    else:
+        Path(output).write_text(export_result.content, encoding="utf-8")
+        print(f"[FileBundler] Exported '{bundle.name}' to {output}: {export_result.summary}")
+
+
+def part_path(output: Path, part: int, parts: int) -> Path:
+    """bundle.xml -> bundle.part01of12.xml"""
+    width = len(str(parts))
+    return output.with_name(f"{output.stem}.part{part:0{width}d}of{parts}{output.suffix}")
+
+
+def write_export_parts(
+    bundle: Bundle,
+    output: str,
+    max_part_tokens: int,
+    options: Optional[ExportOptions],
+):
+    """Write the parts of an export to numbered files in parallel, or one after the other to stdout"""
+    results = bundle.export_parts(max_part_tokens, options=options)
+    bundle.metadata.export_stats.record_export()
+    if output == "-":
+        for result in results:
+            sys.stdout.write(result.content + "\n")
+            sys.stdout.flush()
+            print(f"[FileBundler] {result.summary}", file=sys.stderr)
+        return
+
+    def write_part(result: ExportResult) -> Path:
+        assert result.part and result.parts
+        path = part_path(Path(output), result.part, result.parts)
+        path.write_text(result.content, encoding="utf-8")
+        return path
+
+    with ThreadPoolExecutor(max_workers=min(8, len(results) or 1)) as executor:
+        paths = list(executor.map(write_part, results))
+    for path, result in zip(paths, results):
+        print(f"[FileBundler] Exported '{bundle.name}' to {path}: {result.summary}")
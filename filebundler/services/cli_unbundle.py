@@ -1,65 +1,253 @@
+import io
+import os
 import sys
-import html
+import shutil
+import difflib
+import hashlib
+import tempfile
 import pyperclip
-import xml.etree.ElementTree as ET
 
 from pathlib import Path
+from itertools import chain
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
-def cli_unbundle():
+from filebundler.features.export.formats import (
+    BundleDocument,
+    detect_format,
+    iter_resolved_documents,
+)
+
+
+def iter_bundle_documents(lines: Iterable[str]) -> Iterator[BundleDocument]:
+    """
+    Parse the documents of a code bundle in any export format while it is read.
+
+    Blank lines and the opening fence of a bundle pasted in a markdown code
+    block are skipped, the format is detected from the first line after them.
+
+    Raises:
+        ValueError: if the format of the bundle isn't recognized or it doesn't parse
+    """
+    lines = iter(lines)
+    first_line = ""
+    for line in lines:
+        if line.strip() and not line.lstrip().startswith("```"):
+            first_line = line.lstrip()
+            break
+
+    export_format = detect_format(first_line)
+    if export_format is None:
+        raise ValueError("Not a FileBundler code bundle (expected XML, Markdown or JSON Lines).")
+    return export_format.iter_documents(chain([first_line], lines))
+
+
+@dataclass
+class UnbundleResult:
+    """Relative paths of the files of a bundle, by what unbundling did (or would do) to them"""
+
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # paths that lead out of the output directory, nothing is written for them
+    rejected: List[str] = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        summary = (
+            f"{len(self.created)} created, {len(self.updated)} updated, "
+            f"{len(self.unchanged)} unchanged"
+        )
+        if self.rejected:
+            summary += f", {len(self.rejected)} rejected"
+        return summary
+
+
+def file_status(path: Path, data: bytes) -> str:
+    """Whether writing data to path creates, updates or leaves the file unchanged"""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return "created"
+    # the size decides most changes without reading the file
+    if size != len(data):
+        return "updated"
+    existing = hashlib.sha256(path.read_bytes()).digest()
+    return "unchanged" if existing == hashlib.sha256(data).digest() else "updated"
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Replace path with data through a temporary file in the same directory, so
+    readers (editors, watchers, build tools) never see a half-written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+        if path.exists():
+            shutil.copymode(path, temporary)
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def diff_summary(path: Path, file_path: str, content: str, status: str) -> str:
+    """What a dry run prints for a file: a unified diff for updates, a line count for new files"""
+    new_lines = content.splitlines(keepends=True)
+    if status == "created":
+        return f"A {file_path} (+{len(new_lines)} lines)\n"
+    if status == "unchanged":
+        return ""
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        old_lines = f.read().splitlines(keepends=True)
+    diff = list(
+        difflib.unified_diff(old_lines, new_lines, f"a/{file_path}", f"b/{file_path}")
+    )
+    added = sum(1 for line in diff if line.startswith("+") and not line.startswith("+++"))
+    removed = sum(1 for line in diff if line.startswith("-") and not line.startswith("---"))
+    body = "".join(line if line.endswith("\n") else line + "\n" for line in diff)
+    return f"M {file_path} (+{added} -{removed})\n{body}"
+
+
+def unbundle(
+    lines: Iterable[str],
+    output_dir: Path,
+    dry_run: bool = False,
+    max_workers: int = 1,
+) -> UnbundleResult:
+    """
+    Write the files of a code bundle under output_dir, each as soon as it is parsed.
+
+    Files whose content didn't change aren't written, so they keep their
+    modification time and don't trigger rebuilds or file watchers. Changed files
+    are replaced atomically. References to identical documents are restored from
+    the copy already written, so no file content is kept in memory. Documents
+    whose path leads out of output_dir (absolute or through "..") are reported
+    and skipped, the bundle may come from anywhere.
+
+    Args:
+        lines: The bundle's lines, e.g. an open file or stdin
+        output_dir: Directory the bundle's relative paths are resolved against
+        dry_run: Don't write anything, print a unified diff of every change instead
+        max_workers: Number of files written in parallel
+
+    Returns:
+        The files created, updated and left unchanged
+    """
+    result = UnbundleResult()
+    pending: Dict[str, Future] = {}
+    root = output_dir.resolve()
+
+    def target(file_path: str) -> Optional[Path]:
+        """Where a document is written, None if its path leads out of output_dir"""
+        path = (root / file_path).resolve()
+        return path if root in path.parents else None
+
+    def rejected(file_path: str) -> bool:
+        if target(file_path):
+            return False
+        print(f"  ! {file_path} is outside {output_dir}, skipped")
+        result.rejected.append(file_path)
+        return True
+
+    def read_written(source: str) -> Optional[str]:
+        if source in pending:
+            pending[source].result()
+        written = target(source)
+        if not written or not written.is_file():
+            return None
+        with open(written, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def write_file(file_path: str, content: str) -> str:
+        out_path = target(file_path)
+        assert out_path, f"{file_path} is outside {output_dir}"
+        data = content.encode("utf-8")
+        status = file_status(out_path, data)
+        if dry_run:
+            sys.stdout.write(diff_summary(out_path, file_path, content, status))
+        elif status != "unchanged":
+            write_atomic(out_path, data)
+            print(f"  {'A' if status == 'created' else 'M'} {file_path}")
+        return status
+
+    documents = iter_bundle_documents(lines)
+    # a dry run writes nothing to read references back from, so it keeps contents in memory
+    resolved = iter_resolved_documents(documents, None if dry_run else read_written)
+    if max_workers <= 1 or dry_run:
+        for file_path, file_content in resolved:
+            if not rejected(file_path):
+                getattr(result, write_file(file_path, file_content)).append(file_path)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_path, file_content in resolved:
+            if not rejected(file_path):
+                pending[file_path] = executor.submit(write_file, file_path, file_content)
+        for file_path, future in pending.items():
+            # re-raises the first error of a worker
+            getattr(result, future.result()).append(file_path)
+    return result
+
+
+def read_bundle_interactively() -> TextIO:
     print("After copying your FileBundler code bundle to the clipboard, simply press Enter.\n(Do NOT paste the bundle into the terminal; we'll fetch it directly from your clipboard.)\nIf you prefer to paste manually (visible), type any character and press Enter.")
+    choice = input()
+    if choice.strip() == "":
+        return io.StringIO(pyperclip.paste())
+    print("Paste your bundle below. Press Ctrl+D (Unix/macOS) or Ctrl+Z then Enter (Windows) when done:")
+    return sys.stdin
+
+
+def cli_unbundle(
+    output_dir: Optional[Path] = None,
+    input_path: Optional[str] = None,
+    dry_run: bool = False,
+    max_workers: int = 1,
+):
+    """
+    Write the files of a code bundle into output_dir (default: current directory).
+
+    Args:
+        output_dir: Directory the bundle's relative paths are resolved against
+        input_path: Bundle file to read, "-" for stdin; without it the bundle is read
+            from stdin when it's a pipe, otherwise from the clipboard or a paste
+        dry_run: Print a unified diff of the changes instead of writing them
+        max_workers: Number of files written in parallel
+    """
+    output_dir = output_dir or Path.cwd()
     try:
-        choice = input()
-        if choice.strip() == "":
-            pasted = pyperclip.paste()
+        if input_path and input_path != "-":
+            bundle_file = open(input_path, encoding="utf-8", newline="")
+        elif input_path == "-" or not sys.stdin.isatty():
+            bundle_file = sys.stdin
+            if isinstance(bundle_file, io.TextIOWrapper):
+                # contents keep their "\r\n" line endings, as when reading a bundle file
+                bundle_file.reconfigure(newline="")
         else:
-            print("Paste your bundle below. Press Ctrl+D (Unix/macOS) or Ctrl+Z then Enter (Windows) when done:")
-            pasted = sys.stdin.read()
+            bundle_file = read_bundle_interactively()
     except Exception as e:
         print(f"Error reading input: {e}")
         sys.exit(1)
-    # Remove markdown code block markers if present
-    lines = pasted.splitlines()
-    if lines and lines[0].strip().startswith('```'):
-        lines = lines[1:]
-    if lines and lines[-1].strip().startswith('```'):
-        lines = lines[:-1]
-    pasted_clean = '\n'.join(lines)
-    if len(pasted_clean) < 20 or '<documents' not in pasted_clean:
-        print("Error: Pasted input is too short or missing <documents> tag. Please ensure you have copied the entire code bundle.")
-        sys.exit(1)
+
     try:
-        root = ET.fromstring(pasted_clean)
-        if root.tag != "documents":
-            raise ValueError("Root tag is not <documents>.")
-        created_files = []
-        for doc in root.findall("document"):
-            source_elem = doc.find("source")
-            content_elem = doc.find("document_content")
-            if source_elem is None or content_elem is None:
-                print("Warning: Skipping a <document> missing <source> or <document_content>.")
-                continue
-            file_path = source_elem.text.strip() if source_elem.text else None
-            file_content = content_elem.text or ""
-            # Unescape XML entities in file content
-            file_content = html.unescape(file_content)
-            if not file_path:
-                print("Warning: Skipping a <document> with empty <source>.")
-                continue
-            # Create parent directories if needed
-            out_path = Path(file_path)
-            if not out_path.parent.exists():
-                out_path.parent.mkdir(parents=True, exist_ok=True)
-            # Write file
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(file_content)
-            created_files.append(str(out_path))
-        if created_files:
-            print(f"[FileBundler] Created {len(created_files)} files:")
-            for f in created_files:
-                print(f"  - {f}")
-        else:
-            print("[FileBundler] No files were created. Please check your bundle.")
+        print(f"[FileBundler] {'Dry run of unbundling' if dry_run else 'Unbundling'}:")
+        result = unbundle(bundle_file, output_dir, dry_run, max_workers)
     except Exception as e:
         print("Error: Failed to parse the code bundle. Please ensure you have pasted a valid bundle.")
         print(f"Details: {e}")
         sys.exit(1)
+    finally:
+        if bundle_file is not sys.stdin:
+            bundle_file.close()
+
+    if not (result.created or result.updated or result.unchanged or result.rejected):
+        print("[FileBundler] No files were found. Please check your bundle.")
+    elif dry_run:
+        print(f"[FileBundler] Dry run: {result.summary}, nothing was written.")
+    else:
+        print(f"[FileBundler] Unbundled: {result.summary}.")
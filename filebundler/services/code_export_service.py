@@ -3,9 +3,12 @@ import logging
 import pyperclip
 
 from enum import Enum
+from typing import Optional
 
 from filebundler.models.Bundle import Bundle
-from filebundler.ui.notification import show_temp_notification
+from filebundler.models.ExportResult import ExportResult
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.utils.notifications import show_temp_notification
 
 logger = logging.getLogger(__name__)
 
@@ -18,19 +21,29 @@ class ExecutionEnvironment(str, Enum):
 def copy_code_from_bundle(
     bundle: Bundle,
     execution_environment: ExecutionEnvironment = ExecutionEnvironment.UI,
-):
+    options: Optional[ExportOptions] = None,
+) -> Optional[ExportResult]:
+    """
+    Export a bundle once and copy the payload to the clipboard.
+
+    Returns:
+        The ExportResult so callers can reuse the payload and its stats
+        (e.g. for a preview) instead of exporting again, or None on error
+    """
     try:
+        export_result = bundle.export(options=options)
+        pyperclip.copy(export_result.content)
+        message = f"Copied bundle '{bundle.name}' to clipboard: {export_result.summary}"
         if ExecutionEnvironment(execution_environment) == ExecutionEnvironment.UI:
-            pyperclip.copy(bundle.export_code())
-            show_temp_notification(
-                f"Copied bundle '{bundle.name}'({len(bundle.file_items)} files) to clipboard: {bundle.size_bytes} bytes, {bundle.tokens} tokens",
-                type="success",
-                duration=10,
-            )
-            bundle.metadata.export_stats.record_export()
+            show_temp_notification(message, type="success", duration=10)
+        else:
+            print(f"[FileBundler] {message}")
+        bundle.metadata.export_stats.record_export()
+        return export_result
     except Exception as e:
         logger.error(f"Error exporting contents: {e}", exc_info=True)
-        show_temp_notification(f"Error exporting contents: {str(e)}", type="error")
-
-
-# NOTE we can use this file in the future to export contents directly from the CLI
+        if ExecutionEnvironment(execution_environment) == ExecutionEnvironment.UI:
+            show_temp_notification(f"Error exporting contents: {str(e)}", type="error")
+        else:
+            print(f"[FileBundler] Error exporting contents: {e}")
+        return None
@@ -0,0 +1,342 @@
+# filebundler/services/project_index.py
+"""
+Long-lived in-memory index of projects, for the MCP server.
+
+An index holds a project's scanned FileBundlerApp together with the identity
+(mtime + size) and token count of every file, so tool calls are answered from
+memory instead of re-scanning and re-tokenizing the project. Indexes are
+built on first use and checked for changes at most every check_interval
+seconds:
+
+    a changed file           its entry is updated in place
+    an added/removed entry   (a directory's mtime changed) the project is re-scanned
+    changed settings         (settings.json or .include) the project is re-scanned
+
+Files added to a directory the scan left out because it had no included
+files don't change an indexed directory; they show up on the next re-scan.
+"""
+
+import time
+import heapq
+import logging
+import fnmatch
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from filebundler.FileBundlerApp import FileBundlerApp
+from filebundler.models.FileItem import FileItem
+from filebundler.features.structure.tree import StructureNode, build_structure
+from filebundler.services.cached_operations import get_file_tokens
+from filebundler.services.section_cache import FileIdentity
+from filebundler.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 2.0
+DEFAULT_MAX_PROJECTS = 4
+DEFAULT_IDLE_SECONDS = 30 * 60
+
+
+@dataclass(slots=True)
+class IndexedFile:
+    item: FileItem
+    identity: FileIdentity
+    tokens: int
+
+    @property
+    def relative(self) -> str:
+        return self.item.relative.as_posix()
+
+
+class DirectoryTotals(NamedTuple):
+    tokens: int
+    files: int
+
+
+class ProjectIndex:
+    """
+    A project's files and their token counts, kept fresh by mtime checks.
+
+    The project is scanned by the first refresh_if_stale(), call it before
+    reading; ProjectIndexCache.get() does. Queries hold the index's lock, so
+    they never see a refresh half done.
+    """
+
+    def __init__(self, project_path: Path, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.project_path = project_path.resolve()
+        self.check_interval = check_interval
+        self.lock = threading.RLock()
+        self.files: Dict[str, IndexedFile] = {}
+        self.builds = 0
+        self.last_used = time.monotonic()
+        self._directory_mtimes: Dict[Path, int] = {}
+        self._settings_mtimes: Dict[Path, Optional[int]] = {}
+        self._checked_at = 0.0
+        # derived from the files on first use, dropped whenever they change
+        self._structure: Optional[StructureNode] = None
+        self._directory_totals: Optional[Dict[str, DirectoryTotals]] = None
+
+    @property
+    def app(self) -> FileBundlerApp:
+        return self._app
+
+    def build(self):
+        """Scan the project and count the tokens of every file"""
+        with self.lock, tracing.span("indexing project {project}", project=self.project_path.name):
+            self._app = FileBundlerApp(self.project_path)
+            files: Dict[str, IndexedFile] = {}
+            directory_mtimes: Dict[Path, int] = {}
+            for path, item in self._app.file_items.items():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if item.children or path == self.project_path:
+                    directory_mtimes[path] = stat.st_mtime_ns
+                    continue
+                identity = FileIdentity(stat.st_mtime_ns, stat.st_size)
+                entry = IndexedFile(item, identity, self._count_tokens(path, stat.st_mtime))
+                files[entry.relative] = entry
+            self.files = files
+            self._directory_mtimes = directory_mtimes
+            self._settings_mtimes = self._read_settings_mtimes()
+            self._checked_at = time.monotonic()
+            self._invalidate()
+            self.builds += 1
+            logger.info(f"Indexed {len(files)} files of {self.project_path}")
+
+    def _count_tokens(self, path: Path, mtime: float) -> int:
+        # same cache key as FileItem.tokens, so files counted by the scan aren't counted again
+        return get_file_tokens(str(path), mtime)
+
+    def _read_settings_mtimes(self) -> Dict[Path, Optional[int]]:
+        psm = self._app.psm
+        mtimes: Dict[Path, Optional[int]] = {}
+        for settings_file in (psm.settings_file, psm.include_patterns_file):
+            try:
+                mtimes[settings_file] = settings_file.stat().st_mtime_ns
+            except OSError:
+                mtimes[settings_file] = None
+        return mtimes
+
+    def refresh_if_stale(self, force: bool = False) -> bool:
+        """
+        Bring the index up to date if check_interval passed since the last check.
+
+        Args:
+            force: Check now, whatever the interval
+
+        Returns:
+            True if anything changed
+        """
+        with self.lock:
+            self.last_used = time.monotonic()
+            if not self.builds:
+                self.build()
+                return True
+            if not force and self.last_used - self._checked_at < self.check_interval:
+                return False
+
+            if self._read_settings_mtimes() != self._settings_mtimes or self._directories_changed():
+                self.build()
+                return True
+
+            changed = self._update_changed_files()
+            self._checked_at = time.monotonic()
+            return changed
+
+    def _directories_changed(self) -> bool:
+        for directory, mtime_ns in self._directory_mtimes.items():
+            try:
+                if directory.stat().st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _update_changed_files(self) -> bool:
+        changed = False
+        for entry in self.files.values():
+            try:
+                stat = entry.item.path.stat()
+            except OSError:
+                # deleted between the directory check and now, the next check re-scans
+                continue
+            identity = FileIdentity(stat.st_mtime_ns, stat.st_size)
+            if identity != entry.identity:
+                entry.identity = identity
+                entry.tokens = self._count_tokens(entry.item.path, stat.st_mtime)
+                changed = True
+        if changed:
+            self._app.update_highest_token_item(
+                (entry.item, entry.tokens) for entry in self.files.values()
+            )
+            self._invalidate()
+        return changed
+
+    def _invalidate(self):
+        self._structure = None
+        self._directory_totals = None
+
+    def get_file_items(self, relative_paths: List[str]) -> List[FileItem]:
+        """The indexed items of the given paths, in order; paths that aren't indexed are left out"""
+        with self.lock:
+            file_items: List[FileItem] = []
+            for relative_path in relative_paths:
+                entry = self.files.get(Path(relative_path).as_posix())
+                if entry:
+                    file_items.append(entry.item)
+            return file_items
+
+    def structure(self) -> StructureNode:
+        """The project's full structure, built from the index without touching the filesystem"""
+        with self.lock:
+            if self._structure is None:
+                self._structure = build_structure(self._app.root_item, self._structure_node)
+            return self._structure
+
+    def _structure_node(self, item: FileItem) -> Optional[StructureNode]:
+        directory_mtime = self._directory_mtimes.get(item.path)
+        if directory_mtime is not None:
+            return StructureNode(item.name, True, mtime=directory_mtime / 1e9, files=0)
+        entry = self.files.get(item.relative.as_posix())
+        if entry is None:
+            return None
+        return StructureNode(item.name, False, entry.tokens, entry.identity.mtime_ns / 1e9)
+
+    def directory_totals(self) -> Dict[str, DirectoryTotals]:
+        """Tokens and files of every directory's subtree, by relative path ("." for the root)"""
+        with self.lock:
+            if self._directory_totals is None:
+                tokens: Dict[str, int] = {}
+                files: Dict[str, int] = {}
+                for relative, entry in self.files.items():
+                    directory = relative
+                    while "/" in directory:
+                        directory = directory.rsplit("/", 1)[0]
+                        tokens[directory] = tokens.get(directory, 0) + entry.tokens
+                        files[directory] = files.get(directory, 0) + 1
+                tokens["."] = sum(entry.tokens for entry in self.files.values())
+                files["."] = len(self.files)
+                self._directory_totals = {
+                    directory: DirectoryTotals(tokens[directory], files[directory])
+                    for directory in tokens
+                }
+            return self._directory_totals
+
+    def token_counts(self, relative_paths: List[str]) -> Dict[str, Optional[int]]:
+        """Tokens of each file or directory (summed over its subtree), None if it isn't indexed"""
+        with self.lock:
+            directory_totals = self.directory_totals()
+            counts: Dict[str, Optional[int]] = {}
+            for relative_path in relative_paths:
+                key = Path(relative_path).as_posix()
+                entry = self.files.get(key)
+                if entry:
+                    counts[relative_path] = entry.tokens
+                elif key in directory_totals:
+                    counts[relative_path] = directory_totals[key].tokens
+                else:
+                    counts[relative_path] = None
+            return counts
+
+    def largest_files(self, top_k: int) -> List[IndexedFile]:
+        with self.lock:
+            return heapq.nlargest(top_k, self.files.values(), key=lambda entry: entry.tokens)
+
+    def largest_directories(self, top_k: int) -> List[Tuple[str, DirectoryTotals]]:
+        with self.lock:
+            directories = ((path, totals) for path, totals in self.directory_totals().items() if path != ".")
+            return heapq.nlargest(top_k, directories, key=lambda item: item[1].tokens)
+
+    def search(self, query: str, limit: int) -> Tuple[List[IndexedFile], int]:
+        """
+        Files whose path matches the query, sorted by path.
+
+        Args:
+            query: A glob (if it contains *, ? or [) matched against the path or
+                the file name, else a case-insensitive substring of the path
+            limit: Maximum number of files returned
+
+        Returns:
+            The first matches and the number of all matches
+        """
+        if any(char in query for char in "*?["):
+
+            def matches(relative: str) -> bool:
+                return fnmatch.fnmatchcase(relative, query) or fnmatch.fnmatchcase(
+                    relative.rsplit("/", 1)[-1], query
+                )
+        else:
+            needle = query.lower()
+
+            def matches(relative: str) -> bool:
+                return needle in relative.lower()
+
+        with self.lock:
+            found = sorted(relative for relative in self.files if matches(relative))
+            return [self.files[relative] for relative in found[:limit]], len(found)
+
+
+class ProjectIndexCache:
+    """
+    Indexes of the projects in use, the least recently used one is evicted
+    once there are more than max_projects, and any unused for idle_seconds.
+    """
+
+    def __init__(
+        self,
+        max_projects: int = DEFAULT_MAX_PROJECTS,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+    ):
+        self.max_projects = max_projects
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval
+        self._indexes: OrderedDict[Path, ProjectIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __contains__(self, project_path: Path) -> bool:
+        return project_path.resolve() in self._indexes
+
+    def get(self, project_path: Path, refresh: bool = False) -> ProjectIndex:
+        """
+        The project's index, built on first use and refreshed if stale.
+
+        Args:
+            project_path: Root of the project
+            refresh: Check the project for changes now, whatever the check interval
+        """
+        key = project_path.resolve()
+        with self._lock:
+            self._evict_idle()
+            index = self._indexes.get(key)
+            if index is None:
+                index = ProjectIndex(key, self.check_interval)
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_projects:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    logger.info(f"Evicted the index of {evicted}")
+            else:
+                self._indexes.move_to_end(key)
+        # scanned under the index's lock, not the cache's: calls for the same project
+        # wait for one scan, calls for other projects don't wait at all
+        index.refresh_if_stale(force=refresh)
+        return index
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key in [key for key, index in self._indexes.items() if now - index.last_used > self.idle_seconds]:
+            del self._indexes[key]
+            logger.info(f"Evicted the idle index of {key}")
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
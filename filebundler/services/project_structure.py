@@ -1,89 +1,68 @@
 # filebundler/services/project_structure.py
 import sys
 import logging
-import logfire
 
 from pathlib import Path
+from typing import Optional
 
-from filebundler.models.FileItem import FileItem
 from filebundler.FileBundlerApp import FileBundlerApp
+from filebundler.models.ProjectSettings import StructureSettings
+from filebundler.services.token_count import count_tokens
+from filebundler.features.structure.limits import limit_if_needed
+from filebundler.features.structure.fingerprint import structure_fingerprint
+from filebundler.features.structure.tree import (
+    StructureNode,
+    build_structure,
+    render_structure,
+)
+from filebundler.utils import profiler, tracing
 
 logger = logging.getLogger(__name__)
 
+# next to project-structure.md, not matched by the default include patterns
+STRUCTURE_FINGERPRINT_FILE = "project-structure.fingerprint"
 
-def _generate_project_structure(app: FileBundlerApp):
+
+def _generate_project_structure(
+    app: FileBundlerApp,
+    settings: Optional[StructureSettings] = None,
+    root: Optional[StructureNode] = None,
+):
     """
     Generate a markdown representation of the project structure
 
     Args:
-        file_items: Dictionary of FileItem objects
-        project_path: Root path of the project
+        app: The app whose file tree is rendered
+        settings: Depth, width and token limits, the project's structure settings by default
+        root: The app's structure if it was already built
 
     Returns:
         str: Markdown representation of the project structure
     """
     try:
-        with logfire.span(
+        # one span for the whole tree, a span per directory cost more than rendering it
+        with tracing.span(
             "generating project structure for {project_name}",
             project_name=app.project_path.name,
-        ):
+        ), profiler.phase("structure"):
             project_name = app.project_path.name
             logger.info(
                 f"Generating project structure for {project_name} ({app.project_path = })"
             )
-            structure_markdown = [f"# Project Structure: {project_name}\n"]
-
-            structure_markdown.append("## Directory Structure\n```\n")
 
             # Get the root item
             if not app.root_item:
                 logger.error(f"Root item not found for {app.project_path}")
                 return "Error: Root directory not found in file items"
 
-            # Recursive function to build the directory tree
-            def build_tree(directory_item: FileItem, prefix: str = "") -> list[str]:
-                with logfire.span(
-                    "building tree for {directory}", directory=directory_item.name
-                ):
-                    result: list[str] = []
-
-                    # Sort children: directories first, then files, all alphabetically
-                    sorted_children = sorted(
-                        directory_item.children,
-                        key=lambda x: (not x.is_dir, x.name.lower()),
-                    )
-
-                    for i, child in enumerate(sorted_children):
-                        is_last = i == len(sorted_children) - 1
-
-                        # Choose the proper prefix for the current item
-                        curr_prefix = "└── " if is_last else "├── "
-
-                        # Choose the proper prefix for the next level
-                        next_prefix = "    " if is_last else "│   "
-
-                        if child.is_dir:
-                            result.append(
-                                f"{prefix}{curr_prefix}📁 {child.name}/ ({child.tokens} tokens)"
-                            )
-                            subtree = build_tree(child, prefix + next_prefix)
-                            result.extend(subtree)
-                        else:
-                            result.append(
-                                f"{prefix}{curr_prefix}📄 {child.name} ({child.tokens} tokens)"
-                            )
-
-                    return result
-
-            # Generate tree starting from root
-            tree_lines = build_tree(app.root_item)
-            structure_markdown.append(
-                f"{app.project_path.name}/ ({app.root_item.tokens})\n"
+            settings = settings or app.psm.project_settings.structure_settings
+            root = root or build_structure(app.root_item)
+            # the header and the root line are paid for by the token budget too
+            fixed_tokens = count_tokens(
+                render_structure(StructureNode(root.name, True, root.tokens), project_name)
             )
-            structure_markdown.extend([f"{line}\n" for line in tree_lines])
-            structure_markdown.append("```\n")
-
-            return "".join(structure_markdown)
+            root = limit_if_needed(root, settings, count_tokens, fixed_tokens)
+            return render_structure(root, project_name)
 
     except Exception as e:
         logger.error(f"Error generating project structure: {e}", exc_info=True)
@@ -91,13 +70,22 @@ def _generate_project_structure(app: FileBundlerApp):
 
 
 # TODO make asynchronous
-def save_project_structure(app: FileBundlerApp) -> Path:
+def save_project_structure(
+    app: FileBundlerApp,
+    settings: Optional[StructureSettings] = None,
+    force: bool = False,
+) -> Path:
     """
     Save the project structure to a file
 
+    The file is only rewritten when the tree's fingerprint (paths, token counts,
+    limits and, when focused on recent changes, mtimes) changed, so an unchanged structure keeps its mtime and its
+    cached token count.
+
     Args:
-        project_path: Root path of the project
-        structure_content: Markdown content to save
+        app: The app whose file tree is saved
+        settings: Depth, width and token limits, the project's structure settings by default
+        force: Rewrite the file even if the tree didn't change
 
     Returns:
         Path: Path to the saved file
@@ -105,12 +93,38 @@ def save_project_structure(app: FileBundlerApp) -> Path:
     try:
         # Create the output file
         output_file = app.psm.filebundler_dir / "project-structure.md"
+        fingerprint_file = app.psm.filebundler_dir / STRUCTURE_FINGERPRINT_FILE
+        settings = settings or app.psm.project_settings.structure_settings
+
+        root = build_structure(app.root_item) if app.root_item else None
+        fingerprint = None
+        if root:
+            fingerprint = structure_fingerprint(
+                root,
+                app.project_path.name,
+                settings,
+                # the files' own token counts and mtimes change whenever they are written
+                exclude={
+                    output_file.relative_to(app.project_path).as_posix(),
+                    fingerprint_file.relative_to(app.project_path).as_posix(),
+                },
+            )
+            if (
+                not force
+                and output_file.exists()
+                and fingerprint_file.exists()
+                and fingerprint_file.read_text(encoding="utf-8") == fingerprint
+            ):
+                logger.info(f"Project structure unchanged, keeping {output_file}")
+                return output_file
 
         # Generate the structure content
-        structure_content = _generate_project_structure(app)
+        structure_content = _generate_project_structure(app, settings, root)
 
         # Write the content
         output_file.write_text(structure_content, encoding="utf-8")
+        if fingerprint and not structure_content.startswith("Error"):
+            fingerprint_file.write_text(fingerprint, encoding="utf-8")
 
         logger.info(f"Project structure saved to {output_file}")
         return output_file
@@ -120,11 +134,14 @@ def save_project_structure(app: FileBundlerApp) -> Path:
         raise
 
 
-def cli_entrypoint(argv: list[str] | None = None):
+def cli_entrypoint(
+    argv: list[str] | None = None, overrides: Optional[dict] = None
+):
     """
     CLI entrypoint for generating and saving the project structure.
     Args:
         argv: List of command-line arguments (default: sys.argv)
+        overrides: StructureSettings fields overriding the project's structure settings
     """
     if argv is None:
         argv = sys.argv
@@ -136,7 +153,12 @@ def cli_entrypoint(argv: list[str] | None = None):
         #     f"Path {filepath} does not exist or is not a directory."
         # )
         app = FileBundlerApp(filepath)
-        output_file = save_project_structure(app)
+        settings = app.psm.project_settings.structure_settings
+        if overrides:
+            settings = StructureSettings.model_validate(
+                {**settings.model_dump(), **overrides}
+            )
+        output_file = save_project_structure(app, settings)
         print(f"[filebundler CLI] Project structure saved to: {output_file}")
         logging.info(f"Project structure saved to {output_file}")
     except Exception as e:
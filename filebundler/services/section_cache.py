@@ -0,0 +1,132 @@
+# filebundler/services/section_cache.py
+"""
+In-memory cache of rendered export sections.
+
+Each entry is keyed by the file, its displayed source path and the export
+format, and remembers the file identity (mtime + size) it was rendered from.
+Re-exporting a bundle only re-reads and re-renders the files whose identity
+changed; every other section is served from memory.
+"""
+
+import logging
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from filebundler.utils import BaseModel
+from filebundler.models.FileItem import FileItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SECTIONS = 2000
+
+
+class FileIdentity(NamedTuple):
+    mtime_ns: int
+    size: int
+
+
+class RenderedSection(NamedTuple):
+    body: str
+    tokens: int
+    size_bytes: int
+    # tokens saved by each export transform applied to the content
+    saved_tokens: Optional[Dict[str, int]] = None
+    # sha256 of the exported content, identical documents are only exported once
+    content_hash: str = ""
+
+
+class SectionCacheStats(BaseModel):
+    """Hit/miss counters for a single export"""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    @property
+    def hit_rate_str(self) -> str:
+        return f"{self.hits}/{self.total} sections cached ({self.hit_rate:.0%})"
+
+
+def get_file_identity(file_path: Path) -> FileIdentity:
+    stat = file_path.stat()
+    return FileIdentity(stat.st_mtime_ns, stat.st_size)
+
+
+class SectionCache:
+    """
+    LRU cache of rendered sections, one entry per (file, source, export format).
+
+    A changed file replaces its previous entry instead of adding a new one,
+    so stale renderings never accumulate.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_SECTIONS):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[
+            Tuple[str, str, str], Tuple[FileIdentity, RenderedSection]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_render(
+        self,
+        file_item: FileItem,
+        export_format: str,
+        render: Callable[[], RenderedSection],
+        stats: SectionCacheStats,
+    ) -> RenderedSection:
+        """
+        Return the cached section for a file, rendering it on a miss.
+
+        Args:
+            file_item: The file the section is rendered from
+            export_format: Name of the export format the section is rendered for
+            render: Callable producing the section (only called on a miss)
+            stats: Counters updated with the outcome of the lookup
+
+        Returns:
+            The rendered section with its token count and size
+        """
+        # the same file shows a different source when exported from another root
+        key = (file_item.path.as_posix(), str(file_item), export_format)
+        identity = get_file_identity(file_item.path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == identity:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return entry[1]
+
+        section = render()
+        stats.misses += 1
+
+        with self._lock:
+            self._entries[key] = (identity, section)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return section
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries}
+
+
+section_cache = SectionCache()
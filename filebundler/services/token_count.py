@@ -20,3 +20,25 @@ def count_tokens(text: str, model: str = "o200k_base") -> int:
     """
     encoder = get_tiktoken_encoder(model)
     return len(encoder.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "o200k_base") -> str:
+    """
+    Cut text down to at most max_tokens tokens, ending on a line boundary.
+
+    Args:
+        text: The text to truncate
+        max_tokens: Maximum number of tokens to keep
+        model: The tokenizer model to use (default: o200k_base for GPT-4)
+
+    Returns:
+        The longest run of whole lines from the start of text that fits max_tokens
+    """
+    encoder = get_tiktoken_encoder(model)
+    tokens = encoder.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+
+    kept = encoder.decode(tokens[:max_tokens])
+    # never send half a line
+    return kept[: kept.rfind("\n") + 1]
@@ -3,6 +3,8 @@ import time
 import random
 import streamlit as st
 
+from filebundler.utils.notifications import set_notification_handler
+
 
 def show_temp_notification(message: str, type="info", duration=3):
     """
@@ -114,3 +116,7 @@ def show_temp_notification(message: str, type="info", duration=3):
         + notifications_html,
         unsafe_allow_html=True,
     )
+
+
+# notifications raised by core code are shown as toasts in the web app
+set_notification_handler(show_temp_notification)
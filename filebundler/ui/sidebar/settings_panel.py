@@ -37,6 +37,43 @@ def render_settings_panel(app: FileBundlerApp):
             help="Automatically include relevant files in the bundle",
         )
 
+        st.subheader("Project Structure Limits")
+        structure_settings = app.psm.project_settings.structure_settings
+        structure_settings.max_depth = (
+            st.number_input(
+                "Max depth (0 = no limit)",
+                min_value=0,
+                value=structure_settings.max_depth or 0,
+                help="Directories deeper than this are shown collapsed",
+            )
+            or None
+        )
+        structure_settings.max_children = (
+            st.number_input(
+                "Max entries per directory (0 = no limit)",
+                min_value=0,
+                value=structure_settings.max_children or 0,
+                help="Larger directories show their most important entries and a summary of the rest",
+            )
+            or None
+        )
+        structure_settings.token_budget = (
+            st.number_input(
+                "Token budget (0 = no limit)",
+                min_value=0,
+                value=structure_settings.token_budget or 0,
+                step=1000,
+                help="The project structure is cut down to fit this many tokens",
+            )
+            or None
+        )
+        structure_settings.focus = st.radio(  # type: ignore
+            "Keep detail in the subtrees with",
+            options=["tokens", "recent"],
+            format_func=lambda focus: "the most tokens" if focus == "tokens" else "the most recent changes",
+            index=0 if structure_settings.focus == "tokens" else 1,
+        )
+
         st.subheader("Include Patterns")
         st.write("Only files matching these patterns will be included (glob syntax)")  # type: ignore
 
@@ -5,6 +5,7 @@ import streamlit as st
 
 from filebundler.constants import get_env_settings
 from filebundler.models.Bundle import Bundle
+from filebundler.utils import tracing
 from filebundler.FileBundlerApp import FileBundlerApp
 
 from filebundler.services.project_structure import save_project_structure
@@ -26,7 +27,7 @@ def render_auto_bundler_before_submit_tab(app: FileBundlerApp):
 
     # Auto-select files when the tab is opened
     if not st.session_state.get("auto_bundle_initialized", False):
-        with logfire.span("initializing auto-bundle tab"):
+        with tracing.span("initializing auto-bundle tab"):
             msgs = []
             try:
                 if app.psm.project_settings.auto_bundle_settings.auto_refresh_project_structure:
@@ -1,10 +1,64 @@
 # filebundler/ui/tabs/debug.py
 import streamlit as st
 
+from filebundler.utils import profiler
 from filebundler.ui.notification import show_temp_notification
 
 
+def render_phase_timings():
+    st.subheader("Phase Timings")
+    stats = profiler.snapshot()
+    if not stats:
+        st.info("No phases have been recorded yet.")
+        return
+
+    st.dataframe(
+        [
+            {
+                "phase": name,
+                "count": summary["count"],
+                "total (ms)": round(summary["total_ms"], 1),
+                "mean (ms)": round(summary["mean_ms"], 3),
+                "p50 (ms)": round(summary["p50_ms"], 3),
+                "p95 (ms)": round(summary["p95_ms"], 3),
+                "max (ms)": round(summary["max_ms"], 3),
+            }
+            for name, summary in stats.items()
+        ],
+        hide_index=True,
+    )
+    phase = st.selectbox(
+        f"Durations of the last {profiler.WINDOW} calls",
+        list(stats),
+        key="debug_profiler_phase",
+    )
+    st.bar_chart(
+        [
+            {"duration": bucket, "calls": calls}
+            for bucket, calls in stats[phase]["histogram"].items()
+        ],
+        x="duration",
+        y="calls",
+        sort=False,
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Download as JSON",
+            profiler.dump_json(),
+            file_name="filebundler-profile.json",
+            mime="application/json",
+        )
+    with col2:
+        if st.button("Reset Timings"):
+            profiler.reset()
+            st.rerun()
+
+
 def render_debug_tab():
+    render_phase_timings()
+
     st.subheader("Test Notifications")
     col1, col2 = st.columns(2)
 
@@ -5,7 +5,15 @@ import streamlit as st
 from filebundler.constants import SELECTIONS_BUNDLE_NAME
 
 from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
 from filebundler.FileBundlerApp import FileBundlerApp
+from filebundler.features.export.priority import (
+    PRIORITY_REGISTRY,
+    relevance_ranks_from_response,
+)
+from filebundler.features.export.formats import FORMAT_REGISTRY
+from filebundler.features.export.ordering import ORDERING_REGISTRY
+from filebundler.features.export.transforms import TRANSFORM_REGISTRY
 
 from filebundler.ui.notification import show_temp_notification
 from filebundler.services.code_export_service import copy_code_from_bundle
@@ -20,6 +28,8 @@ def render_export_contents_tab(app: FileBundlerApp):
 
     st.write(f"{app.selections.nr_of_selected_files} files selected for export.")
 
+    export_options = render_export_options(app)
+
     if st.button("Show Preview - Copy to Clipboard", use_container_width=True):
         if app.selections.nr_of_selected_files == 0:
             show_temp_notification(
@@ -48,13 +58,131 @@ def render_export_contents_tab(app: FileBundlerApp):
 
         if bundle_to_export:
             # copies the contents to clipboard and displays notification
-            copy_code_from_bundle(bundle_to_export)
+            export_result = copy_code_from_bundle(
+                bundle_to_export, options=export_options
+            )
+            if not export_result:
+                return
+
+            if export_options.since_last_export and bundle_to_export is app.bundles.current_bundle:
+                # the next delta export starts from this one, as with the cli's --since-last-export
+                app.bundles.save_one_bundle(bundle_to_export)
+
+            if export_result.truncated or export_result.dropped:
+                st.warning(
+                    f"To fit {export_result.token_budget} tokens, "
+                    f"truncated: {', '.join(export_result.truncated) or 'none'}; "
+                    f"dropped: {', '.join(export_result.dropped) or 'none'}"
+                )
+
+            if export_result.saved_tokens:
+                st.caption(
+                    f"{export_result.tokens} tokens exported, "
+                    f"{bundle_to_export.tokens} tokens in the bundle's files: "
+                    f"{export_result.saved_tokens_str}"
+                )
+
             st.subheader("Export Preview")
             preview_expander = st.expander("Expand preview")
 
             with preview_expander:
-                try:
-                    st.code(bundle_to_export.export_code(), language="xml")
-                except Exception as e:
-                    logger.error(f"Preview error: {e}", exc_info=True)
-                    st.error(f"Error generating preview: {str(e)}")
+                st.code(export_result.content, language=export_result.language)
+
+
+def render_export_options(app: FileBundlerApp) -> ExportOptions:
+    with st.expander("Export options", expanded=False):
+        export_format = st.selectbox(
+            "Format",
+            options=list(FORMAT_REGISTRY.keys()),
+            help="xml: contents wrapped in CDATA, xml-escaped: contents escaped as XML entities, "
+            "markdown: one code fence per file, jsonl: one JSON object per file",
+            key="export_format",
+        )
+        order = st.selectbox(
+            "Document order",
+            options=list(ORDERING_REGISTRY.keys()),
+            help="tree: project tree order, explicit: bundle order, "
+            "stable_first: files changed in the last hour last, "
+            "a stable order lets LLM providers reuse their prompt cache",
+            key="export_order",
+        )
+        transforms = st.multiselect(
+            "Shrink file contents",
+            options=list(TRANSFORM_REGISTRY.keys()),
+            help="outline: keep only imports, signatures and docstrings, "
+            "strip_comments: drop comments and license headers, "
+            "collapse_whitespace: drop trailing whitespace and repeated blank lines, "
+            "compact_indentation: indent with one space per level, "
+            "minify_data: minify JSON and drop hashes from lockfiles",
+            key="export_transforms",
+        )
+        outline_files = st.multiselect(
+            "Export as outline (signatures and docstrings only)",
+            options=[str(fi) for fi in app.selections.selected_file_items],
+            key="export_outline_files",
+        )
+        dedup = st.checkbox(
+            "Export identical files once",
+            value=True,
+            help="Copies of a file are exported as a reference to the first copy",
+            key="export_dedup",
+        )
+        delta_col1, delta_col2 = st.columns(2)
+        with delta_col1:
+            # the selections aren't saved, so only a saved bundle remembers its last export
+            has_saved_bundle = app.bundles.current_bundle is not None
+            since_last_export = st.checkbox(
+                "Only files changed since the last export",
+                help="Unchanged files are listed at the end of the export. "
+                "Needs an active saved bundle, which records when it was last exported",
+                disabled=not has_saved_bundle,
+                key="export_since_last_export",
+            ) and has_saved_bundle
+        with delta_col2:
+            changed_since_revision = st.text_input(
+                "Only files changed since git revision",
+                placeholder="e.g. HEAD~1 or main",
+                key="export_since_revision",
+            )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            token_budget = st.number_input(
+                "Fit the export into N tokens (0 = no limit)",
+                min_value=0,
+                value=0,
+                step=1000,
+                key="export_token_budget",
+            )
+        with col2:
+            priority = st.selectbox(
+                "Keep files by",
+                options=list(PRIORITY_REGISTRY.keys()),
+                help="explicit: bundle order, recency: most recently modified first, "
+                "size: smallest first, relevance: the last auto-bundle suggestion first",
+                key="export_priority",
+            )
+        with col3:
+            overflow = st.radio(
+                "Files that don't fit",
+                options=["truncate", "omit"],
+                help="truncate: cut the first file that doesn't fit and drop the rest, "
+                "omit: drop every file that doesn't fit",
+                key="export_overflow",
+            )
+
+    auto_bundle_response = st.session_state.get("auto_bundle_response", None)
+    return ExportOptions(
+        format=export_format or "xml",
+        token_budget=int(token_budget) or None,
+        priority=priority or "explicit",
+        overflow=overflow or "truncate",  # type: ignore
+        relevance_ranks=relevance_ranks_from_response(auto_bundle_response)
+        if auto_bundle_response
+        else {},
+        transforms=transforms,
+        outline_files=outline_files,
+        order=order or "tree",
+        dedup=dedup,
+        since_last_export=since_last_export,
+        changed_since_revision=changed_since_revision.strip() or None,
+    )
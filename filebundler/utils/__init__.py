@@ -36,11 +36,13 @@ def json_load(f: io.TextIOWrapper) -> Any:
         return None
 
 
-def read_file(file_path: Path):
+def read_file(file_path: Path, newline: Optional[str] = None):
+    """Read a text file, newline="" keeps its line endings as they are (see open)"""
     assert file_path.exists(), f"Can't read file {file_path} because it doesn't exist"
 
     try:
-        return file_path.read_text(encoding="utf-8")
+        with open(file_path, encoding="utf-8", newline=newline) as f:
+            return f.read()
     except UnicodeDecodeError as e:
         logger.error(f"UnicodeDecodeError for {file_path.name}: {e}")
         return f"Could not read {file_path.name} as text. It may be a binary file."
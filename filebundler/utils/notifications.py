@@ -0,0 +1,44 @@
+# filebundler/utils/notifications.py
+"""
+Notifications raised by core code (scanning, bundles, exports).
+
+The web app registers a handler that shows them as toasts (see
+ui.notification); headless commands (cli, mcp) never import Streamlit and
+log them instead.
+"""
+
+import logging
+
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[str, str, float], None]
+
+_LOG_LEVELS = {
+    "info": logging.INFO,
+    "success": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+_handler: Optional[NotificationHandler] = None
+
+
+def set_notification_handler(handler: Optional[NotificationHandler]):
+    global _handler
+    _handler = handler
+
+
+def show_temp_notification(message: str, type="info", duration=3):
+    """
+    Show a notification in the web app, or log it when running headless.
+
+    Args:
+        message: The message to display
+        type: "info", "success", "warning", or "error"
+        duration: Time in seconds before notification disappears
+    """
+    if _handler is not None:
+        _handler(message, type, duration)
+    else:
+        logger.log(_LOG_LEVELS.get(type, logging.INFO), message)
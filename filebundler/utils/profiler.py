@@ -0,0 +1,120 @@
+# filebundler/utils/profiler.py
+"""
+Local per-phase timings, available without a logfire token.
+
+Every phase keeps its call count, total and maximum duration, and the last
+WINDOW durations for rolling percentiles and a histogram. Recording is a
+counter update and a deque append under a lock (the MCP server records from
+several threads), cheap enough for per-file phases (stat, tokenize). The Debug tab shows the timings of the web app's process; the cli
+dumps them with --profile.
+"""
+
+import json
+import time
+import threading
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator
+
+PHASES = (
+    "scan",
+    "filter",
+    "sort",
+    "stat",
+    "tokenize",
+    "export",
+    "structure",
+    "bundle_load",
+)
+# durations kept per phase for the rolling percentiles and histogram
+WINDOW = 1000
+# upper bounds of the histogram buckets in milliseconds, the last bucket is unbounded
+BUCKET_BOUNDS_MS = (0.01, 0.1, 1, 10, 100, 1000, 10_000)
+
+
+@dataclass(slots=True)
+class PhaseStats:
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    recent: Deque[int] = field(default_factory=lambda: deque(maxlen=WINDOW))
+
+    def add(self, duration_ns: int):
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.recent.append(duration_ns)
+
+    def histogram(self) -> Dict[str, int]:
+        """Number of the recent durations per bucket, keyed by the bucket's upper bound"""
+        labels = [f"<{bound:g}ms" for bound in BUCKET_BOUNDS_MS] + [f">={BUCKET_BOUNDS_MS[-1]:g}ms"]
+        counts = dict.fromkeys(labels, 0)
+        for duration_ns in self.recent:
+            duration_ms = duration_ns / 1e6
+            for bound, label in zip(BUCKET_BOUNDS_MS, labels):
+                if duration_ms < bound:
+                    counts[label] += 1
+                    break
+            else:
+                counts[labels[-1]] += 1
+        return counts
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent)
+
+        def percentile(fraction: float) -> float:
+            return recent[min(len(recent) - 1, int(fraction * len(recent)))] / 1e6 if recent else 0.0
+
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "max_ms": self.max_ns / 1e6,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "histogram": self.histogram(),
+        }
+
+
+_stats: Dict[str, PhaseStats] = {name: PhaseStats() for name in PHASES}
+_lock = threading.Lock()
+
+
+def record(name: str, duration_ns: int):
+    """
+    Record one duration of a phase.
+
+    Args:
+        name: One of PHASES
+        duration_ns: Duration from time.perf_counter_ns()
+    """
+    with _lock:
+        _stats[name].add(duration_ns)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter_ns() - start)
+
+
+def snapshot() -> Dict[str, dict]:
+    """Summaries of the phases recorded so far, by phase"""
+    with _lock:
+        return {name: stats.summary() for name, stats in _stats.items() if stats.count}
+
+
+def reset():
+    with _lock:
+        for name in PHASES:
+            _stats[name] = PhaseStats()
+
+
+def dump_json(indent: int = 2) -> str:
+    return json.dumps(snapshot(), indent=indent)
@@ -0,0 +1,94 @@
+# filebundler/utils/tracing.py
+"""
+Spans for core code that don't import logfire.
+
+Spans are no-ops until the web app calls configure() after logfire.configure(),
+so headless commands never import logfire and an imported but unconfigured
+logfire (pydantic's plugin imports it) doesn't warn on every span.
+
+The policy has two knobs:
+    granularity  "off", "coarse" (phase spans only) or "full" (also the
+                 detail spans opened per directory, bundle file, etc.)
+    sample_rate  share of root spans recorded, decided once per trace: the
+                 spans nested in a sampled root are recorded, the ones nested
+                 in a dropped root aren't
+"""
+
+import random
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Iterator, Literal, Optional
+
+Granularity = Literal["off", "coarse", "full"]
+GRANULARITIES = ("off", "coarse", "full")
+
+_NOOP = nullcontext()
+# the logfire module once configure() enabled tracing, None while it's off
+_logfire: Any = None
+_detail = False
+_sample_rate = 1.0
+# whether the trace the current span belongs to is sampled, None outside of a trace
+_sampled: ContextVar[Optional[bool]] = ContextVar("filebundler_trace_sampled", default=None)
+
+
+def configure(granularity: Granularity = "coarse", sample_rate: float = 1.0):
+    """
+    Send spans to logfire with the given policy. Call after logfire.configure().
+
+    Args:
+        granularity: "off" to keep every span a no-op, "coarse" for phase spans
+            only, "full" to also record detail spans
+        sample_rate: Share of traces recorded, from 0 to 1
+    """
+    global _logfire, _detail, _sample_rate
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown tracing granularity: {granularity}, expected one of {GRANULARITIES}")
+    if not 0 <= sample_rate <= 1:
+        raise ValueError(f"The trace sample rate must be between 0 and 1, got {sample_rate}")
+
+    if granularity == "off" or sample_rate == 0:
+        _logfire = None
+    else:
+        import logfire
+
+        _logfire = logfire
+    _detail = granularity == "full"
+    _sample_rate = sample_rate
+
+
+def is_enabled() -> bool:
+    return _logfire is not None
+
+
+@contextmanager
+def _trace(msg_template: str, attributes: dict) -> Iterator[Any]:
+    sampled = _sample_rate >= 1 or random.random() < _sample_rate
+    token = _sampled.set(sampled)
+    try:
+        if sampled:
+            with _logfire.span(msg_template, **attributes) as logfire_span:
+                yield logfire_span
+        else:
+            yield None
+    finally:
+        _sampled.reset(token)
+
+
+def span(msg_template: str, *, detail: bool = False, **attributes: Any) -> ContextManager:
+    """
+    A logfire span if the policy records it, else a no-op.
+
+    Args:
+        msg_template: logfire message template, formatted with the attributes
+        detail: Only record the span with "full" granularity, for spans opened
+            per item (directory, file, tree node) rather than per phase
+    """
+    if _logfire is None or (detail and not _detail):
+        return _NOOP
+    sampled = _sampled.get()
+    if sampled is None:
+        return _trace(msg_template, attributes)
+    if not sampled:
+        return _NOOP
+    return _logfire.span(msg_template, **attributes)
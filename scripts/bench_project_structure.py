@@ -0,0 +1,95 @@
+# bench_project_structure.py
+"""
+Benchmark of the project structure renderer on a synthetic in-memory tree.
+
+Compares the single-pass renderer (one post-order walk for totals, one
+pre-order walk for lines) with a recursive renderer that sorts and re-sums
+every directory at every level, like the previous implementation did.
+
+    python scripts/bench_project_structure.py --nodes 100000
+"""
+
+import io
+import time
+import random
+import argparse
+
+from typing import List
+
+from filebundler.features.structure.tree import (
+    StructureNode,
+    compute_totals,
+    render_tree_lines,
+)
+
+
+def synthetic_tree(nodes: int, fan_out: int = 12, seed: int = 0) -> StructureNode:
+    """A tree of `nodes` files and directories, one directory per fan_out nodes"""
+    rng = random.Random(seed)
+    root = StructureNode("project", True)
+    directories = [root]
+    for index in range(nodes):
+        parent = directories[rng.randrange(len(directories))]
+        if index % fan_out == 0:
+            child = StructureNode(f"dir_{index}", True)
+            directories.append(child)
+        else:
+            child = StructureNode(
+                f"File_{index}.py", False, rng.randrange(2000), rng.random() * 1e9
+            )
+        parent.children.append(child)
+    return root
+
+
+def subtree_tokens(node: StructureNode) -> int:
+    if not node.is_dir:
+        return node.tokens
+    return sum(subtree_tokens(child) for child in node.children)
+
+
+def render_recursive(node: StructureNode, prefix: str = "") -> List[str]:
+    lines: List[str] = []
+    children = sorted(node.children, key=lambda x: (not x.is_dir, x.name.lower()))
+    for i, child in enumerate(children):
+        is_last = i == len(children) - 1
+        line_prefix = prefix + ("└── " if is_last else "├── ")
+        if child.is_dir:
+            lines.append(f"{line_prefix}📁 {child.name}/ ({subtree_tokens(child)} tokens)")
+            lines.extend(render_recursive(child, prefix + ("    " if is_last else "│   ")))
+        else:
+            lines.append(f"{line_prefix}📄 {child.name} ({child.tokens} tokens)")
+    return lines
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    def single_pass():
+        root = compute_totals(synthetic_tree(args.nodes))
+        render_tree_lines(root, io.StringIO())
+
+    def recursive():
+        render_recursive(synthetic_tree(args.nodes))
+
+    build = best_of(args.repeat, lambda: synthetic_tree(args.nodes))
+    single = best_of(args.repeat, single_pass) - build
+    previous = best_of(args.repeat, recursive) - build
+    print(f"{args.nodes} nodes (best of {args.repeat}, tree construction excluded)")
+    print(f"  single pass: {single * 1000:8.1f} ms")
+    print(f"  recursive:   {previous * 1000:8.1f} ms ({previous / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# bench_startup.py
+"""
+Benchmark of cold and warm startup for each FileBundler entry point.
+
+Every run is a fresh interpreter (bench_startup_child.py) that makes the
+calls its command makes:
+
+    cli-tree       FileBundlerApp(project), then save_project_structure
+    cli-unbundle   cli_unbundle of a bundle of the project's files
+    mcp            import the MCP server, then one export_file_bundle call
+    streamlit      import the web app, logfire.configure, then FileBundlerApp(project)
+
+Cold runs start with an empty bytecode cache (PYTHONPYCACHEPREFIX), warm runs
+reuse it. For each entry point this records the wall time, the time to the
+first FileItem tree, the peak RSS and an `-X importtime` breakdown (from one
+extra warm run, so it doesn't slow down the timed ones). Results are written
+to JSON; --compare prints the change against an earlier run.
+
+The project is a copy of this checkout's sources unless --project is given
+(its .filebundler directory is written to, like the commands do).
+
+    python scripts/bench_startup.py --output startup.json
+    python scripts/bench_startup.py --compare startup-main.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from pathlib import Path
+from statistics import median
+from typing import Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENTRIES = ["cli-tree", "cli-unbundle", "mcp", "streamlit"]
+CHILD = Path(__file__).with_name("bench_startup_child.py")
+RESULT_MARKER = "BENCH_RESULT "
+
+
+def parse_importtime(stderr: str, top: int = 15) -> dict:
+    """Total import time, slowest top-level imports and self time per package"""
+    total_us = 0
+    top_level: Dict[str, int] = {}
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.strip()
+        packages[module.split(".")[0]] = packages.get(module.split(".")[0], 0) + int(self_us)
+        # nested imports are indented by two spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative_us)
+            top_level[module] = int(cumulative_us)
+
+    def slowest(times: Dict[str, int]) -> Dict[str, float]:
+        ranked = sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {name: round(us / 1000, 1) for name, us in ranked}
+
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "top_level_ms": slowest(top_level),
+        "packages_self_ms": slowest(packages),
+    }
+
+
+def run_entry(entry: str, fixture_file: Path, env: dict, importtime: bool = False) -> dict:
+    """Runs an entry point in a fresh interpreter and times it"""
+    fixture = json.loads(fixture_file.read_text(encoding="utf-8"))
+    # unbundle into an empty directory, so every run writes every file
+    output = Path(tempfile.mkdtemp(prefix="unbundle-", dir=fixture["workdir"]))
+    fixture_file.write_text(
+        json.dumps({**fixture, "unbundle_output": str(output)}), encoding="utf-8"
+    )
+
+    command = [sys.executable, *(["-X", "importtime"] if importtime else [])]
+    command += [str(CHILD), entry, str(fixture_file)]
+    spawned = time.time()
+    start = time.perf_counter()
+    process = subprocess.run(command, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    results = [
+        line[len(RESULT_MARKER) :]
+        for line in process.stdout.splitlines()
+        if line.startswith(RESULT_MARKER)
+    ]
+    if process.returncode or not results:
+        return {"error": (process.stderr or process.stdout).strip().splitlines()[-5:]}
+    result = json.loads(results[-1])
+    run = {
+        "wall_ms": round(wall_ms, 1),
+        # interpreter startup and site imports, before the entry point's first import
+        "interpreter_ms": round((result["driver_started"] - spawned) * 1000, 1),
+        **{f"{name}_ms": round(value, 1) for name, value in result["marks"].items()},
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+    }
+    if importtime:
+        run["imports"] = parse_importtime(process.stderr)
+    return run
+
+
+def copy_sources(workdir: Path) -> Path:
+    """A project with this checkout's sources, matched by the default include patterns"""
+    project = workdir / "project"
+    shutil.copytree(
+        REPO_ROOT / "filebundler",
+        project / "src" / "filebundler",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    shutil.copy(REPO_ROOT / "README.md", project / "README.md")
+    return project
+
+
+def make_fixture(project: Path, workdir: Path) -> Path:
+    """A bundle of the project's files for unbundling and the files the MCP call exports"""
+    # the parent isn't timed, importing filebundler here doesn't matter
+    sys.path.insert(0, str(REPO_ROOT))
+    from filebundler.FileBundlerApp import FileBundlerApp
+    from filebundler.models.Bundle import Bundle
+
+    app = FileBundlerApp(project)
+    files = [
+        item
+        for item in app.file_items.values()
+        if not item.is_dir and item.path.suffix in (".py", ".md", ".toml", ".txt")
+    ]
+    bundle_file = workdir / "bundle.xml"
+    bundle_file.write_text(Bundle(name="startup", file_items=files).export_code(), encoding="utf-8")
+
+    fixture_file = workdir / "fixture.json"
+    fixture = {
+        "project": str(project),
+        "workdir": str(workdir),
+        "bundle": str(bundle_file),
+        "files": [item.path.relative_to(project).as_posix() for item in files],
+    }
+    fixture_file.write_text(json.dumps(fixture), encoding="utf-8")
+    return fixture_file
+
+
+def benchmark_entry(entry: str, fixture_file: Path, env: dict, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="pycache-") as pycache:
+        env = {**env, "PYTHONPYCACHEPREFIX": pycache}
+        # warm runs need the bytecode the cold run writes
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        cold = run_entry(entry, fixture_file, env)
+        warm = [run_entry(entry, fixture_file, env) for _ in range(repeat)]
+        imports = run_entry(entry, fixture_file, env, importtime=True)
+
+    failed = [run for run in [cold, *warm, imports] if "error" in run]
+    if failed:
+        return {"error": failed[0]["error"]}
+    return {
+        "cold": cold,
+        "warm": min(warm, key=lambda run: run["wall_ms"]),
+        "warm_median_wall_ms": round(median(run["wall_ms"] for run in warm), 1),
+        "imports": imports["imports"],
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results: dict, previous: Optional[dict] = None):
+    header = f"{'entry point':14} {'cold':>9} {'warm':>9} {'tree':>9} {'imports':>9} {'rss':>8}"
+    print(header + ("  warm vs previous" if previous else ""))
+    for entry, result in results["entries"].items():
+        if "error" in result:
+            print(f"{entry:14} failed: {' / '.join(result['error'])}")
+            continue
+        first_tree = result["warm"].get("first_tree_ms", result["warm"].get("first_response_ms"))
+        line = (
+            f"{entry:14} {result['cold']['wall_ms']:7.0f}ms {result['warm']['wall_ms']:7.0f}ms "
+            f"{(f'{first_tree:7.0f}ms' if first_tree is not None else '-'):>9} "
+            f"{result['imports']['total_ms']:7.0f}ms {result['warm']['peak_rss_mb']:6.0f}MB"
+        )
+        before = (previous or {}).get("entries", {}).get(entry, {}).get("warm")
+        if before:
+            change = result["warm"]["wall_ms"] / before["wall_ms"] - 1
+            line += f"  {change:+.0%} ({before['wall_ms']:.0f}ms)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--project", type=Path, default=None)
+    parser.add_argument("--entry", action="append", choices=ENTRIES, default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=Path("startup-benchmark.json"))
+    parser.add_argument("--compare", type=Path, default=None, metavar="JSON")
+    args = parser.parse_args()
+
+    # children import this checkout, not an installed filebundler
+    python_path = [str(REPO_ROOT), os.environ.get("PYTHONPATH")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, python_path))}
+    results: dict = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "project": str(args.project.resolve()) if args.project else "checkout sources",
+        "repeat": args.repeat,
+        "entries": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        project = args.project.resolve() if args.project else copy_sources(Path(workdir))
+        fixture_file = make_fixture(project, Path(workdir))
+        for entry in args.entry or ENTRIES:
+            print(f"benchmarking {entry}...", file=sys.stderr)
+            results["entries"][entry] = benchmark_entry(entry, fixture_file, env, args.repeat)
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    previous = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print_summary(results, previous)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_startup_child.py
+"""
+One timed run of an entry point, started by bench_startup.py.
+
+Only imports what every entry point imports anyway, so the harness doesn't
+add to the startup it measures.
+
+    python scripts/bench_startup_child.py ENTRY FIXTURE_JSON
+"""
+
+import sys
+import json
+import time
+
+from pathlib import Path
+
+RESULT_MARKER = "BENCH_RESULT "
+MCP_FILES = 20
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss of a child started by fork and exec can still be the parent's peak
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run(entry: str, fixture_file: str):
+    driver_started = time.time()
+    start = time.perf_counter()
+    marks = {}
+
+    def mark(name: str):
+        marks[name] = (time.perf_counter() - start) * 1000
+
+    fixture = json.loads(Path(fixture_file).read_text(encoding="utf-8"))
+    project = Path(fixture["project"])
+
+    if entry == "streamlit":
+        from filebundler import app  # noqa: F401  (Streamlit, the UI and logfire)
+
+        mark("imported")
+        import logfire
+
+        # what app.main() does before rendering
+        logfire.configure(send_to_logfire="if-token-present")
+        mark("configured")
+        from filebundler.FileBundlerApp import FileBundlerApp
+
+        FileBundlerApp(project)
+        mark("first_tree")
+    else:
+        from filebundler.main import prepare_headless
+
+        prepare_headless()
+        if entry == "cli-tree":
+            from filebundler.FileBundlerApp import FileBundlerApp
+            from filebundler.services.project_structure import save_project_structure
+
+            mark("imported")
+            app = FileBundlerApp(project)
+            mark("first_tree")
+            save_project_structure(app)
+        elif entry == "cli-unbundle":
+            from filebundler.services.cli_unbundle import cli_unbundle
+
+            mark("imported")
+            cli_unbundle(Path(fixture["unbundle_output"]), fixture["bundle"])
+        elif entry == "mcp":
+            from filebundler import mcp_server
+
+            mark("imported")
+            mcp_server.export_file_bundle(fixture["files"][:MCP_FILES], str(project))
+            mark("first_response")
+        else:
+            raise ValueError(f"Unknown entry point: {entry}")
+
+    mark("done")
+    result = {"driver_started": driver_started, "marks": marks, "peak_rss_mb": peak_rss_mb()}
+    print(RESULT_MARKER + json.dumps(result))
+
+
+if __name__ == "__main__":
+    run(*sys.argv[1:3])
@@ -0,0 +1,276 @@
+# bench_suite.py
+"""
+Benchmark of scanning, token counting and exporting on synthetic repositories.
+
+For every repository size a project is generated (file count, directory
+depth, log-normal file sizes and a share of binary files, which are scanned
+but can't be decoded), then these phases run in order, like a session in the
+app would:
+
+    scan              FileBundlerApp(project), which also counts every file's tokens
+    tokens            SelectionsManager.tokens with every file selected
+    tokens_cached     the same again
+    export            Bundle.export_code of the selected files, with an empty section cache
+    export_cached     the same again, every section from the section cache
+    structure         _generate_project_structure
+    unbundle          cli_unbundle of the export into an empty directory
+    unbundle_again    cli_unbundle of the export over the unbundled files
+
+Every phase records its duration, throughput (files, and MB of text, per
+second) and peak memory (RSS above the phase's start, on Linux). Results are
+written to JSON.
+
+    python scripts/bench_suite.py --files 1000 10000 100000 --output suite.json
+"""
+
+import io
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+
+from pathlib import Path
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from bench_startup import REPO_ROOT, git_revision
+
+BINARY_SUFFIXES = [".png", ".bin", ".so"]
+TEXT_SUFFIXES = [".py", ".py", ".py", ".md", ".json", ".ts"]
+CODE_LINES = [
+    "import os",
+    "from pathlib import Path",
+    "def handle_{n}(request, *args, **kwargs):",
+    '    """Handle the request and return the response."""',
+    "    result = compute(value_{n}, limit={n})",
+    "    if not result:",
+    "        raise ValueError(f'invalid value: {{result}}')",
+    "    return {{'status': 'ok', 'items': [x for x in range({n})]}}",
+    "class Model{n}(BaseModel):",
+    "    name: str = 'model_{n}'",
+    "# TODO revisit the caching of {n} entries",
+    "",
+]
+
+
+@dataclass
+class RepoSpec:
+    files: int
+    depth: int = 6
+    files_per_directory: int = 40
+    median_bytes: int = 1_200
+    # spread of the log-normal file sizes, 1.0 gives a few files 10x the median
+    size_sigma: float = 1.0
+    binary_ratio: float = 0.05
+    seed: int = 0
+
+
+def text_pool(lines: int, rng: random.Random) -> str:
+    return "\n".join(
+        rng.choice(CODE_LINES).format(n=rng.randrange(10_000)) for _ in range(lines)
+    )
+
+
+def generate_repo(root: Path, spec: RepoSpec) -> Dict[str, int]:
+    """
+    Write a synthetic project under root/src, matched by the default include patterns.
+
+    Args:
+        root: Empty directory for the project
+        spec: Size, shape and content mix of the project
+
+    Returns:
+        Counts of the generated text files, binary files, directories and text bytes
+    """
+    rng = random.Random(spec.seed)
+    pool = text_pool(20_000, rng)
+    directories: List[Path] = [root / "src"]
+    depths = [1]
+    for index in range(max(1, spec.files // spec.files_per_directory) - 1):
+        candidates = [i for i, depth in enumerate(depths) if depth < spec.depth]
+        parent = rng.choice(candidates)
+        directories.append(directories[parent] / f"pkg_{index}")
+        depths.append(depths[parent] + 1)
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    stats = {"text_files": 0, "binary_files": 0, "directories": len(directories), "text_bytes": 0}
+    for index in range(spec.files):
+        directory = rng.choice(directories)
+        size = max(16, int(rng.lognormvariate(math.log(spec.median_bytes), spec.size_sigma)))
+        if rng.random() < spec.binary_ratio:
+            path = directory / f"asset_{index}{rng.choice(BINARY_SUFFIXES)}"
+            path.write_bytes(rng.randbytes(size))
+            stats["binary_files"] += 1
+            continue
+        start = rng.randrange(len(pool) - size) if size < len(pool) else 0
+        # a unique first line, so exports don't deduplicate identical files
+        content = f"# module {index}\n" + pool[start : start + size]
+        path = directory / f"module_{index}{rng.choice(TEXT_SUFFIXES)}"
+        path.write_text(content, encoding="utf-8")
+        stats["text_files"] += 1
+        stats["text_bytes"] += len(content)
+    return stats
+
+
+def _memory_kb(field: str) -> Optional[int]:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(run: Callable[[], object], files: int, text_bytes: int) -> dict:
+    """Duration, throughput and peak memory of one phase"""
+    try:
+        # resets the peak RSS (VmHWM) to the current RSS, Linux only
+        Path("/proc/self/clear_refs").write_text("5")
+        start_kb = _memory_kb("VmRSS")
+    except OSError:
+        start_kb = None
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    peak_kb = _memory_kb("VmHWM")
+    return {
+        "seconds": round(seconds, 4),
+        "files_per_s": round(files / seconds, 1),
+        "mb_per_s": round(text_bytes / 1e6 / seconds, 2),
+        "peak_mb": round((peak_kb - start_kb) / 1024, 1) if start_kb and peak_kb else None,
+    }
+
+
+def run_phases(project: Path, workdir: Path, repo: Dict[str, int]) -> Dict[str, dict]:
+    """
+    Run the phases on a generated project.
+
+    Args:
+        project: The generated project
+        workdir: Scratch directory for the bundle and the unbundled files
+        repo: The generator's counts, throughput is per file and per byte of text
+
+    Returns:
+        The measurements of every phase, by phase name
+    """
+    from filebundler.FileBundlerApp import FileBundlerApp
+    from filebundler.models.Bundle import Bundle
+    from filebundler.services.cached_operations import clear_file_caches, get_tiktoken_encoder
+    from filebundler.services.cli_unbundle import cli_unbundle
+    from filebundler.services.project_structure import _generate_project_structure
+    from filebundler.services.section_cache import section_cache
+
+    # the encoder loads once per process, don't charge it to the first phase
+    get_tiktoken_encoder()
+    # every run starts cold, including repeated runs in the same process
+    clear_file_caches()
+    section_cache.clear()
+    files = repo["text_files"] + repo["binary_files"]
+    text_bytes = repo["text_bytes"]
+    state: dict = {}
+    phases: Dict[str, dict] = {}
+
+    def scan():
+        state["app"] = FileBundlerApp(project)
+
+    phases["scan"] = measure(scan, files, text_bytes)
+    app = state["app"]
+    app.selections.select_all_files()
+    selected = app.selections.selected_file_items
+
+    phases["tokens"] = measure(lambda: app.selections.tokens, files, text_bytes)
+    phases["tokens_cached"] = measure(lambda: app.selections.tokens, files, text_bytes)
+
+    def export():
+        state["bundle"] = Bundle(name="benchmark", file_items=selected).export_code()
+
+    phases["export"] = measure(export, files, text_bytes)
+    phases["export_cached"] = measure(export, files, text_bytes)
+    phases["structure"] = measure(lambda: _generate_project_structure(app), files, text_bytes)
+
+    workdir.mkdir(parents=True, exist_ok=True)
+    bundle_file = workdir / "bundle.xml"
+    bundle_file.write_text(state["bundle"], encoding="utf-8")
+
+    def unbundle():
+        with redirect_stdout(io.StringIO()):
+            cli_unbundle(workdir / "unbundled", str(bundle_file))
+
+    phases["unbundle"] = measure(unbundle, files, text_bytes)
+    phases["unbundle_again"] = measure(unbundle, files, text_bytes)
+    return phases
+
+
+def benchmark_repo(spec: RepoSpec) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"bench-suite-{spec.files}-") as workdir:
+        project = Path(workdir) / "project"
+        start = time.perf_counter()
+        repo = generate_repo(project, spec)
+        repo["generate_seconds"] = round(time.perf_counter() - start, 2)
+        return {"spec": asdict(spec), "repo": repo, "phases": run_phases(project, Path(workdir), repo)}
+
+
+def print_summary(results: dict):
+    sizes = list(results["repos"])
+    print(f"{'phase':16}" + "".join(f"{size + ' files':>28}" for size in sizes))
+    phases = results["repos"][sizes[0]]["phases"]
+    for phase in phases:
+        cells = []
+        for size in sizes:
+            measured = results["repos"][size]["phases"][phase]
+            peak = f"{measured['peak_mb']:.0f}MB" if measured["peak_mb"] is not None else "-"
+            cells.append(
+                f"{measured['seconds'] * 1000:8.0f}ms {measured['mb_per_s']:7.1f}MB/s {peak:>7}"
+            )
+        print(f"{phase:16}" + "".join(f"{cell:>28}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--depth", type=int, default=RepoSpec.depth)
+    parser.add_argument("--median-bytes", type=int, default=RepoSpec.median_bytes)
+    parser.add_argument("--size-sigma", type=float, default=RepoSpec.size_sigma)
+    parser.add_argument("--binary-ratio", type=float, default=RepoSpec.binary_ratio)
+    parser.add_argument("--seed", type=int, default=RepoSpec.seed)
+    parser.add_argument("--output", type=Path, default=Path("suite-benchmark.json"))
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from filebundler.main import prepare_headless
+
+    # measure what the cli and the MCP server run, without logfire
+    prepare_headless()
+    results: dict = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repos": {},
+    }
+    for files in args.files:
+        print(f"benchmarking {files} files...", file=sys.stderr)
+        spec = RepoSpec(
+            files=files,
+            depth=args.depth,
+            median_bytes=args.median_bytes,
+            size_sigma=args.size_sigma,
+            binary_ratio=args.binary_ratio,
+            seed=args.seed,
+        )
+        results["repos"][str(files)] = benchmark_repo(spec)
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print_summary(results)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
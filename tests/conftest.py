@@ -0,0 +1,185 @@
+import io
+import os
+import json
+import pytest
+
+from pathlib import Path
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from filebundler.models.FileItem import FileItem
+
+PERF_BASELINE_FILE = Path(__file__).with_name("perf_baseline.json")
+# phases this much slower than the baseline (in seconds) are within noise whatever the ratio
+PERF_NOISE_SECONDS = 0.02
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("perf", "performance regression gate")
+    group.addoption(
+        "--perf",
+        action="store_true",
+        help="run the benchmarks marked perf and compare them with tests/perf_baseline.json",
+    )
+    group.addoption(
+        "--perf-threshold",
+        type=float,
+        default=float(os.environ.get("FILEBUNDLER_PERF_THRESHOLD", 30)),
+        metavar="PERCENT",
+        help="fail a perf benchmark when a phase is this much slower than the baseline "
+        "(default: $FILEBUNDLER_PERF_THRESHOLD or 30)",
+    )
+    group.addoption(
+        "--perf-update-baseline",
+        action="store_true",
+        help="run the perf benchmarks and write their results to tests/perf_baseline.json",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line(
+        "markers", "perf: timing benchmark compared with tests/perf_baseline.json (needs --perf)"
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]):
+    if config.getoption("--perf") or config.getoption("--perf-update-baseline"):
+        return
+    skip_perf = pytest.mark.skip(reason="timing benchmark, run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
+
+@dataclass
+class PerfGate:
+    """
+    Compares phase timings with the committed baseline.
+
+    Timings are stored relative to a calibration workload timed in the same
+    run, so a baseline recorded on one machine holds on another.
+    """
+
+    threshold: float
+    update: bool
+    baseline: dict
+    # (benchmark, phase, baseline units, measured units)
+    rows: List[Tuple[str, str, float, float]] = field(default_factory=list)
+
+    def check(self, benchmark: str, spec: dict, seconds: Dict[str, float], calibration: float):
+        """
+        Record a benchmark's phases and fail if any of them regressed.
+
+        Args:
+            benchmark: Name of the benchmark in the baseline file
+            spec: The benchmark's parameters, the baseline must have been recorded with them
+            seconds: Best duration of every phase
+            calibration: Duration of the calibration workload in this run
+        """
+        measured = {phase: value / calibration for phase, value in seconds.items()}
+        if self.update:
+            self.baseline[benchmark] = {"spec": spec, "phases": measured}
+            PERF_BASELINE_FILE.write_text(
+                json.dumps(self.baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            return
+
+        recorded = self.baseline.get(benchmark)
+        if not recorded or recorded["spec"] != spec:
+            pytest.fail(f"No baseline for {benchmark} with {spec}, run pytest --perf-update-baseline")
+
+        regressions = []
+        for phase, units in measured.items():
+            baseline_units = recorded["phases"][phase]
+            self.rows.append((benchmark, phase, baseline_units, units))
+            slower_seconds = (units - baseline_units) * calibration
+            if (
+                units > baseline_units * (1 + self.threshold / 100)
+                and slower_seconds > PERF_NOISE_SECONDS
+            ):
+                regressions.append(f"{phase} {units / baseline_units - 1:+.0%}")
+        if regressions:
+            pytest.fail(
+                f"{benchmark} is more than {self.threshold:g}% slower than the baseline: "
+                + ", ".join(regressions)
+            )
+
+
+@pytest.fixture(scope="session")
+def perf_gate(pytestconfig: pytest.Config) -> PerfGate:
+    baseline = (
+        json.loads(PERF_BASELINE_FILE.read_text(encoding="utf-8"))
+        if PERF_BASELINE_FILE.exists()
+        else {}
+    )
+    gate = PerfGate(
+        threshold=pytestconfig.getoption("--perf-threshold"),
+        update=pytestconfig.getoption("--perf-update-baseline"),
+        baseline=baseline,
+    )
+    pytestconfig.stash[perf_gate_key] = gate
+    return gate
+
+
+perf_gate_key = pytest.StashKey[PerfGate]()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config):
+    gate = config.stash.get(perf_gate_key, None)
+    if not gate or not gate.rows:
+        return
+    terminalreporter.section("perf: phases relative to the baseline")
+    for benchmark, phase, baseline_units, units in gate.rows:
+        terminalreporter.write_line(
+            f"{benchmark:24} {phase:14} {baseline_units:9.2f} -> {units:9.2f}"
+            f"  {units / baseline_units - 1:+7.1%}"
+        )
+
+
+@pytest.fixture
+def make_file_item() -> Callable[..., "FileItem"]:
+    """Writes a file under a project and returns its FileItem"""
+    from filebundler.models.FileItem import FileItem
+
+    def write_file_item(project_path: Path, relative: str, content: str = "") -> FileItem:
+        file_path = project_path / relative
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # bytes, so line endings and separators reach the file as given
+        file_path.write_bytes(content.encode("utf-8"))
+        return FileItem(path=Path(relative), project_path=project_path)
+
+    return write_file_item
+
+
+@pytest.fixture
+def make_project() -> Callable[[Path, Dict[str, str]], Path]:
+    """Writes a project from a mapping of relative paths to contents, returns its root"""
+
+    def write_project(root: Path, files: Dict[str, str]) -> Path:
+        for relative, content in files.items():
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        return root
+
+    return write_project
+
+
+@pytest.fixture
+def unbundled(tmp_path_factory: pytest.TempPathFactory) -> Callable[[str], Dict[str, str]]:
+    """Unbundles a bundle the way `cli unbundle` does, returns the written files in bundle order"""
+    from filebundler.services.cli_unbundle import unbundle
+
+    def unbundle_text(content: str) -> Dict[str, str]:
+        output = tmp_path_factory.mktemp("unbundled")
+        with redirect_stdout(io.StringIO()):
+            result = unbundle(io.StringIO(content), output)
+        files: Dict[str, str] = {}
+        for relative in result.created:
+            with open(output / relative, encoding="utf-8", newline="") as f:
+                files[relative] = f.read()
+        return files
+
+    return unbundle_text
@@ -0,0 +1,54 @@
+
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+
+VENDORED = "def helper(value):\n    return [value] * 10\n" * 20
+
+
+class TestExportDedup:
+    """Test that identical files are exported once and referenced by their copies"""
+
+    def test_copies_reference_the_first_document(self, tmp_path: Path, make_file_item):
+        items = [
+            make_file_item(tmp_path, "a/helper.py", VENDORED),
+            make_file_item(tmp_path, "b/helper.py", VENDORED),
+            make_file_item(tmp_path, "main.py", "print('main')\n"),
+        ]
+        bundle = Bundle(name="dedup-test", file_items=items)
+
+        deduped = bundle.export()
+        full = bundle.export(options=ExportOptions(dedup=False))
+
+        assert deduped.content.count("return [value] * 10") == 20
+        assert full.content.count("return [value] * 10") == 40
+        assert deduped.duplicates == ["b/helper.py"]
+        assert '<document index="1" duplicate-of="0">' in deduped.content
+        assert deduped.tokens == full.tokens - deduped.dedup_saved_tokens
+        assert "1 duplicate files referenced" in deduped.summary
+
+    def test_tiny_identical_files_are_repeated(self, tmp_path: Path, make_file_item):
+        items = [make_file_item(tmp_path, f"{name}.py", "x = 1\n") for name in "ab"]
+
+        result = Bundle(name="dedup-test", file_items=items).export()
+
+        assert not result.duplicates
+        assert result.content.count("x = 1") == 2
+
+
+class TestUnbundleDuplicates:
+    """Test that unbundling restores every copy of a deduplicated file"""
+
+    def test_references_get_the_original_content(self, tmp_path: Path, make_file_item, unbundled):
+        items = [
+            make_file_item(tmp_path, "a/helper.py", VENDORED),
+            make_file_item(tmp_path, "b/helper.py", VENDORED),
+        ]
+        content = Bundle(name="dedup-test", file_items=items).export().content
+
+        documents = unbundled(content)
+
+        assert list(documents) == ["a/helper.py", "b/helper.py"]
+        assert documents["a/helper.py"] == documents["b/helper.py"]
+        assert VENDORED in documents["b/helper.py"]
@@ -0,0 +1,135 @@
+import os
+import time
+import subprocess
+import pytest
+
+from pathlib import Path
+from datetime import datetime
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.services.cli_export import cli_export
+from filebundler.utils import dump_model_to_file
+
+
+def set_age(file_item: FileItem, seconds: float):
+    mtime = time.time() - seconds
+    os.utime(file_item.path, (mtime, mtime))
+
+
+class TestDeltaExport:
+    """Test cases for exporting only the files changed since the last export"""
+
+    def test_only_changed_files_are_exported(self, tmp_path: Path, make_file_item):
+        old = make_file_item(tmp_path, "old.py", "old = 1\n")
+        new = make_file_item(tmp_path, "new.py", "new = 1\n")
+        set_age(old, 3600)
+        bundle = Bundle(name="delta-test", file_items=[old, new])
+        bundle.metadata.export_stats.last_exported = datetime.fromtimestamp(time.time() - 60)
+
+        result = bundle.export(options=ExportOptions(since_last_export=True))
+
+        assert result.file_count == 1
+        assert "new = 1" in result.content and "old = 1" not in result.content
+        assert result.unchanged == ["old.py"]
+        assert '<unchanged source="old.py"' in result.content
+        assert "1 unchanged files skipped" in result.summary
+
+    def test_manifest_can_be_left_out(self, tmp_path: Path, make_file_item):
+        old = make_file_item(tmp_path, "old.py", "old = 1\n")
+        set_age(old, 3600)
+        bundle = Bundle(name="delta-test", file_items=[old])
+
+        result = bundle.export(
+            options=ExportOptions(
+                changed_since=datetime.fromtimestamp(time.time() - 60),
+                unchanged_manifest=False,
+            )
+        )
+
+        assert result.file_count == 0
+        assert "unchanged_documents" not in result.content
+
+    def test_never_exported_bundle_is_exported_in_full(self, tmp_path: Path, make_file_item):
+        bundle = Bundle(
+            name="delta-test", file_items=[make_file_item(tmp_path, "a.py", "a = 1\n")]
+        )
+
+        result = bundle.export(options=ExportOptions(since_last_export=True))
+
+        assert result.file_count == 1
+        assert result.changed_since is None
+
+
+class TestCliDeltaExport:
+    """Test when the cli saves the bundle's export stats"""
+
+    @pytest.fixture
+    def bundle_file(self, tmp_path: Path, make_file_item) -> Path:
+        bundle = Bundle(name="cli-delta", file_items=[make_file_item(tmp_path, "a.py", "a = 1\n")])
+        bundle_file = tmp_path / ".filebundler" / "bundles" / "cli-delta.json"
+        bundle_file.parent.mkdir(parents=True)
+        dump_model_to_file(bundle, bundle_file)
+        return bundle_file
+
+    def test_plain_export_leaves_the_bundle_file_alone(self, tmp_path: Path, bundle_file: Path):
+        saved = bundle_file.read_text(encoding="utf-8")
+
+        cli_export(tmp_path, "cli-delta", str(tmp_path / "out.xml"), ExportOptions())
+
+        assert bundle_file.read_text(encoding="utf-8") == saved
+
+    def test_since_last_export_records_the_export(self, tmp_path: Path, bundle_file: Path):
+
+        cli_export(
+            tmp_path, "cli-delta", str(tmp_path / "out.xml"), ExportOptions(since_last_export=True)
+        )
+
+        saved = Bundle.model_validate_json(bundle_file.read_text(encoding="utf-8"))
+        assert saved.metadata.export_stats.export_count == 1
+        assert saved.metadata.export_stats.last_exported is not None
+
+
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def git(project_path: Path, *args: str):
+    subprocess.run(
+        ["git", "-C", str(project_path), *args],
+        check=True,
+        capture_output=True,
+        env={**os.environ, **GIT_IDENTITY},
+    )
+
+
+class TestGitDeltaExport:
+    """Test cases for exporting only the files changed since a git revision"""
+
+    def test_modified_and_untracked_files_are_exported(self, tmp_path: Path, make_file_item):
+        items = [make_file_item(tmp_path, f"{name}.py", f"{name} = 1\n") for name in "abc"]
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "add", "a.py", "b.py")
+        git(tmp_path, "commit", "-q", "-m", "initial")
+        items[0].path.write_text("a = 2\n", encoding="utf-8")
+
+        result = Bundle(name="delta-test", file_items=items).export(
+            options=ExportOptions(changed_since_revision="HEAD")
+        )
+
+        assert result.unchanged == ["b.py"]
+        assert "a = 2" in result.content and "c = 1" in result.content
+
+    def test_unknown_revision_raises(self, tmp_path: Path, make_file_item):
+        item = make_file_item(tmp_path, "a.py", "a = 1\n")
+        git(tmp_path, "init", "-q")
+
+        with pytest.raises(ValueError, match="git diff"):
+            Bundle(name="delta-test", file_items=[item]).export(
+                options=ExportOptions(changed_since_revision="nope")
+            )
@@ -0,0 +1,113 @@
+import pytest
+
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.formats import (
+    FORMAT_REGISTRY,
+    get_format,
+    resolve_documents,
+    wrap_cdata,
+)
+
+FORMATS = list(FORMAT_REGISTRY.keys())
+
+TRICKY_CONTENTS = {
+    "markup.html": "<p class=\"a\">Fish &amp; chips & <b>peas</b></p>\n",
+    "cdata.py": "END = ']]>'\nnested = '<![CDATA[ x ]]]]>'\n",
+    "fences.md": "# Title\n\n## Document 7\n\n````python\nprint('`')\n````\n```\n",
+    "unicode.txt": "naïve — 日本語 \"quotes\" \\backslash\\\n\ttab\n",
+    "entities.xml": "<a>&lt;already escaped&gt; &#x27; &quot;</a>\n",
+    # characters XML can't hold, not even escaped
+    "controls.py": "RED = '\x1b[31m'\nreset = '\x1b[0m'\npage\x0cbreak \x00\n",
+    # line endings XML parsers turn into "\n"
+    "windows.bat": "@echo off\r\necho <hi> & ]]>\r\n",
+    "mixed.txt": "classic mac\rwindows\r\nunix\n",
+}
+
+
+@pytest.fixture
+def make_bundle(make_file_item):
+    def bundle_of(project_path: Path, contents: dict) -> Bundle:
+        items = [make_file_item(project_path, rel, text) for rel, text in contents.items()]
+        return Bundle(name="format-test", file_items=items)
+
+    return bundle_of
+
+
+class TestRoundTrip:
+    """Test that every export format is read back unchanged by the unbundler"""
+
+    @pytest.mark.parametrize("format", FORMATS)
+    def test_tricky_contents_round_trip(self, tmp_path: Path, make_bundle, format: str, unbundled):
+        bundle = make_bundle(tmp_path, TRICKY_CONTENTS)
+
+        result = bundle.export(options=ExportOptions(format=format))
+
+        assert result.format == format
+        assert unbundled(result.content) == TRICKY_CONTENTS
+
+    @pytest.mark.parametrize("format", ["xml", "xml-escaped", "jsonl"])
+    def test_missing_final_newline_is_kept(self, tmp_path: Path, make_bundle, format: str, unbundled):
+        contents = {"a.py": "x = 1", "empty.txt": ""}
+        bundle = make_bundle(tmp_path, contents)
+
+        result = bundle.export(options=ExportOptions(format=format))
+
+        assert unbundled(result.content) == contents
+
+    def test_markdown_adds_a_final_newline(self, tmp_path: Path, make_bundle, unbundled):
+        bundle = make_bundle(tmp_path, {"a.py": "x = 1"})
+
+        result = bundle.export(options=ExportOptions(format="markdown"))
+
+        assert unbundled(result.content) == {"a.py": "x = 1\n"}
+
+    @pytest.mark.parametrize("format", FORMATS)
+    def test_duplicates_and_parts_round_trip(self, tmp_path: Path, make_bundle, format: str, unbundled):
+        long_file = "".join(f"line_{i} = '<{i}> & ]]>'\n" for i in range(300))
+        # one chunk holds a character XML can't represent
+        long_file = long_file.replace("line_150 = ", "line_150 = '\x1b' + ")
+        contents = {"big.py": long_file, "a/copy.txt": "same\n", "b/copy.txt": "same\n"}
+        bundle = make_bundle(tmp_path, contents)
+
+        parts = bundle.export_parts(800, options=ExportOptions(format=format))
+
+        assert len(parts) > 1
+        export_format = get_format(format)
+        documents = [doc for part in parts for doc in export_format.parse(part.content)]
+        assert dict(resolve_documents(documents)) == contents
+
+        single = bundle.export(options=ExportOptions(format=format))
+        assert unbundled(single.content) == contents
+
+
+class TestEscaping:
+    """Test the escaping of contents and the unwrapping of pasted bundles"""
+
+    def test_cdata_splits_terminators(self):
+        wrapped = wrap_cdata("a]]>b")
+
+        assert wrapped == "<![CDATA[a]]]]><![CDATA[>b]]>"
+
+    def test_escaped_xml_has_no_raw_markup_in_contents(self, tmp_path: Path, make_bundle):
+        bundle = make_bundle(tmp_path, {"a.html": "<b>&</b>"})
+
+        content = bundle.export(options=ExportOptions(format="xml-escaped")).content
+
+        assert "&lt;b&gt;&amp;&lt;/b&gt;" in content
+        assert "CDATA" not in content
+
+    def test_code_fenced_paste_is_unwrapped(self, tmp_path: Path, make_bundle, unbundled):
+        bundle = make_bundle(tmp_path, {"a.py": "x = 1\n"})
+        content = bundle.export(options=ExportOptions(format="markdown")).content
+
+        # markdown bundles end with a fence of their own, which must be kept
+        assert unbundled(content) == {"a.py": "x = 1\n"}
+        fenced = f"```markdown\n{content}\n```"
+        assert unbundled(fenced) == {"a.py": "x = 1\n"}
+
+    def test_unknown_format_raises(self):
+        with pytest.raises(ValueError, match="yaml"):
+            get_format("yaml")
@@ -0,0 +1,75 @@
+import os
+import time
+import pytest
+
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.ordering import order_file_items
+
+
+def set_age(file_item: FileItem, seconds: float):
+    mtime = time.time() - seconds
+    os.utime(file_item.path, (mtime, mtime))
+
+
+class TestOrderings:
+    """Test cases for the export document orderings"""
+
+    def test_tree_order_puts_directories_before_files(self, tmp_path: Path, make_file_item):
+        items = [
+            make_file_item(tmp_path, relative)
+            for relative in ["b.py", "src/z.py", "A.md", "src/lib/a.py"]
+        ]
+        ordered = order_file_items(items, ExportOptions(order="tree"))
+
+        assert [str(fi) for fi in ordered] == ["src/lib/a.py", "src/z.py", "A.md", "b.py"]
+
+    def test_stable_first_puts_recent_changes_last(self, tmp_path: Path, make_file_item):
+        old_b, recent, old_a, newest = [
+            make_file_item(tmp_path, relative)
+            for relative in ["b.py", "recent.py", "a.py", "newest.py"]
+        ]
+        set_age(old_a, 7200)
+        set_age(old_b, 7200)
+        set_age(recent, 60)
+        set_age(newest, 1)
+
+        ordered = order_file_items(
+            [old_b, recent, old_a, newest], ExportOptions(order="stable_first")
+        )
+        assert ordered == [old_a, old_b, recent, newest]
+
+    def test_unknown_order_raises(self, tmp_path: Path, make_file_item):
+        with pytest.raises(ValueError, match="nope"):
+            order_file_items([make_file_item(tmp_path, "a.py")], ExportOptions(order="nope"))
+
+
+class TestDeterministicExport:
+    """Test that the export doesn't depend on the order files were added in"""
+
+    def test_tree_order_export_is_byte_identical(self, tmp_path: Path, make_file_item):
+        items = [
+            make_file_item(tmp_path, f"pkg{i % 3}/module_{i}.py", f"x = {i}\n")
+            for i in range(12)
+        ]
+
+        first = Bundle(name="order-test", file_items=items).export()
+        second = Bundle(name="order-test", file_items=list(reversed(items))).export()
+
+        assert first.content == second.content
+
+    def test_explicit_order_keeps_bundle_order_without_duplicates(
+        self, tmp_path: Path, make_file_item
+    ):
+        a, b = make_file_item(tmp_path, "a.py"), make_file_item(tmp_path, "b.py")
+        bundle = Bundle(name="order-test", file_items=[b, a])
+
+        content = bundle.export(
+            further_documents=[b], options=ExportOptions(order="explicit")
+        ).content
+
+        assert content.count("b.py") == 1
+        assert content.index("b.py") < content.index("a.py")
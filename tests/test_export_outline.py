@@ -0,0 +1,103 @@
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.outline import outline
+
+PYTHON_MODULE = '''"""Module docstring"""
+import os
+
+TIMEOUT = 30
+
+
+class Client:
+    """Talks to the server"""
+
+    retries: int = 3
+
+    def fetch(self, path: str) -> bytes:
+        """Fetch a path"""
+        with open(os.path.join("root", path), "rb") as f:
+            return f.read()
+
+
+async def main():
+    client = Client()
+    await client.fetch("x")
+'''
+
+TS_MODULE = """import { a,
+  b } from "./x";
+/** A shape */
+export class Square {
+  side: number = 1;
+  area(): number {
+    if (this.side) { return "}".length; }
+    return this.side * this.side;
+  }
+}
+export function helper(x: number) {
+  return x;
+}
+"""
+
+
+class TestOutline:
+    """Test cases for signature-only outlines"""
+
+    def test_python_keeps_signatures_and_docstrings(self):
+        outlined = outline(PYTHON_MODULE, Path("client.py"))
+
+        assert '"""Module docstring"""' in outlined
+        assert "import os" in outlined and "TIMEOUT = 30" in outlined
+        assert "retries: int = 3" in outlined
+        assert "def fetch(self, path: str) -> bytes:" in outlined
+        assert '"""Fetch a path"""' in outlined
+        assert "async def main():" in outlined
+        assert "f.read()" not in outlined and "Client()" not in outlined
+
+    def test_unparsable_python_keeps_declaration_lines(self):
+        outlined = outline("import os\ndef broken(:\n    return 1\n", Path("broken.py"))
+
+        assert outlined == "import os\ndef broken(:\n"
+
+    def test_brace_languages_collapse_bodies(self):
+        outlined = outline(TS_MODULE, Path("shapes.ts"))
+
+        assert outlined == (
+            'import { a,\n  b } from "./x";\n/** A shape */\nexport class Square {\n'
+            "  side: number = 1;\n  area(): number { ... }\n}\n"
+            "export function helper(x: number) { ... }\n"
+        )
+
+    def test_other_files_are_unchanged(self):
+        assert outline("# Title\n", Path("README.md")) == "# Title\n"
+
+
+class TestOutlineExport:
+    """Test exporting single files or whole bundles as outlines"""
+
+    def test_outline_files_only_outlines_those_files(self, tmp_path: Path, make_file_item):
+        client = make_file_item(tmp_path, "client.py", PYTHON_MODULE)
+        other = make_file_item(tmp_path, "other.py", PYTHON_MODULE.replace("Client", "Other"))
+        bundle = Bundle(name="outline-test", file_items=[client, other])
+
+        result = bundle.export(options=ExportOptions(outline_files=["client.py"]))
+
+        assert result.content.count("f.read()") == 1
+        assert "Other()" in result.content
+        assert result.saved_tokens["outline"] > 0
+        assert result.tokens == bundle.tokens - result.saved_tokens["outline"]
+
+    def test_outline_transform_outlines_every_file(self, tmp_path: Path, make_file_item):
+        items = [
+            make_file_item(tmp_path, "client.py", PYTHON_MODULE),
+            make_file_item(tmp_path, "shapes.ts", TS_MODULE),
+        ]
+
+        result = Bundle(name="outline-test", file_items=items).export(
+            options=ExportOptions(transforms=["outline"])
+        )
+
+        assert "f.read()" not in result.content
+        assert "area(): number { ... }" in result.content
@@ -0,0 +1,114 @@
+import os
+import time
+import pytest
+
+from pathlib import Path
+from datetime import datetime
+from typing import List, Optional
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.models.ExportResult import ExportResult
+from filebundler.features.export.formats import get_format
+from filebundler.services.bundle_export import export_manifest, parse_cursor
+from filebundler.services.token_count import count_tokens
+
+
+def all_pages(bundle: Bundle, **limits) -> List[ExportResult]:
+    pages: List[ExportResult] = []
+    cursor: Optional[str] = None
+    while True:
+        page = bundle.export_page(cursor=cursor, **limits)
+        pages.append(page)
+        cursor = page.next_cursor
+        if not cursor:
+            return pages
+
+
+def reassemble(pages: List[ExportResult], format_name: str = "xml") -> dict:
+    contents: dict = {}
+    for page in pages:
+        for document in get_format(format_name).parse(page.content):
+            contents[document.source] = contents.get(document.source, "") + document.content
+    return contents
+
+
+class TestExportPages:
+    """Test that paged exports stay under their limits and hand over with cursors"""
+
+    @pytest.fixture
+    def bundle(self, tmp_path: Path, make_file_item) -> Bundle:
+        items = [
+            make_file_item(tmp_path, f"small_{i}.py", f"value_{i} = {i}  # <&>\n" * 10)
+            for i in range(4)
+        ]
+        items.append(make_file_item(tmp_path, "big.py", "".join(f"line_{i} = {i}\n" for i in range(300))))
+        return Bundle(name="paged", file_items=items)
+
+    def test_token_limited_pages_hold_every_document(self, bundle: Bundle):
+        pages = all_pages(bundle, max_tokens=300)
+
+        assert len(pages) > 2
+        assert all(count_tokens(page.content) <= 300 for page in pages)
+        assert reassemble(pages) == {str(fi): fi.path.read_text() for fi in bundle.file_items}
+
+    def test_byte_limited_pages_hold_every_document(self, bundle: Bundle):
+        pages = all_pages(bundle, max_bytes=1200)
+
+        assert all(len(page.content.encode("utf-8")) <= 1200 for page in pages)
+        assert reassemble(pages) == {str(fi): fi.path.read_text() for fi in bundle.file_items}
+
+    def test_cursors_chain_and_the_last_page_has_none(self, bundle: Bundle):
+        pages = all_pages(bundle, max_tokens=300)
+
+        assert pages[0].cursor is None
+        assert [page.cursor for page in pages[1:]] == [page.next_cursor for page in pages[:-1]]
+        assert f'next-cursor="{pages[0].next_cursor}"' in pages[0].content
+        assert "next-cursor" not in pages[-1].content
+
+    def test_a_large_enough_page_holds_everything(self, bundle: Bundle):
+        page = bundle.export_page(max_tokens=100_000)
+
+        assert page.next_cursor is None
+        assert page.file_count == len(bundle.file_items)
+
+    def test_invalid_cursors_are_rejected(self, bundle: Bundle):
+        with pytest.raises(ValueError):
+            bundle.export_page(max_tokens=300, cursor="not-a-cursor")
+        with pytest.raises(ValueError):
+            bundle.export_page(max_tokens=300, cursor="99:0")
+
+    @pytest.mark.parametrize("file_count", [3, 60])
+    def test_unchanged_files_manifest_stays_within_the_limit(
+        self, tmp_path: Path, make_file_item, file_count: int
+    ):
+        items = [make_file_item(tmp_path, f"old_{i}.py", f"old_{i} = {i}\n") for i in range(file_count)]
+        for file_item in items:
+            os.utime(file_item.path, (time.time() - 3600, time.time() - 3600))
+        items.append(make_file_item(tmp_path, "new.py", "new = 1\n" * 5))
+        bundle = Bundle(name="paged", file_items=items)
+        options = ExportOptions(changed_since=datetime.fromtimestamp(time.time() - 60))
+
+        pages = all_pages(bundle, max_tokens=300, options=options)
+
+        assert all(count_tokens(page.content) <= 300 for page in pages)
+        assert reassemble(pages) == {"new.py": "new = 1\n" * 5}
+        listed = "".join(page.content for page in pages)
+        assert all(f'source="old_{i}.py"' in listed for i in range(file_count))
+        assert (len(pages) == 1) == (file_count == 3)
+
+    def test_parse_cursor(self):
+        assert parse_cursor(None) == (0, 0)
+        assert parse_cursor("3:2") == (3, 2)
+
+
+class TestExportManifest:
+    @pytest.mark.parametrize("format_name", ["xml", "xml-escaped", "markdown", "jsonl"])
+    def test_manifest_lists_files_without_contents(self, format_name: str):
+        manifest = export_manifest(
+            "plan", [("src/a.py", 10), ("src/b.py", 32)], ExportOptions(format=format_name)
+        )
+
+        assert "src/a.py" in manifest and "src/b.py" in manifest
+        assert "32" in manifest
+        assert get_format(format_name).parse(manifest) == []
@@ -0,0 +1,90 @@
+import re
+import pytest
+
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.formats import get_format
+from filebundler.features.export.shards import (
+    ShardPiece,
+    pack_shards,
+    split_lines_to_tokens,
+)
+from filebundler.services.cli_export import part_path
+from filebundler.services.token_count import count_tokens
+
+
+def count_chars(text: str) -> int:
+    return len(text)
+
+
+class TestShardPlanning:
+    """Test cases for splitting and packing documents into parts"""
+
+    def test_split_keeps_whole_lines(self):
+        chunks = split_lines_to_tokens("aaa\nbbb\ncc\nd\n", 8, count_chars)
+
+        assert chunks == ["aaa\nbbb\n", "cc\nd\n"]
+
+    def test_overlong_lines_are_cut(self):
+        chunks = split_lines_to_tokens("x" * 20 + "\n", 8, count_chars)
+
+        assert "".join(chunks) == "x" * 20 + "\n"
+        assert all(len(chunk) <= 8 for chunk in chunks)
+
+    def test_first_fit_decreasing_fills_parts(self):
+        sizes = [6, 5, 4, 3, 2]
+        pieces = [ShardPiece(None, position, tokens) for position, tokens in enumerate(sizes)]
+
+        parts = pack_shards(pieces, 10)
+
+        assert [[p.tokens for p in part] for part in parts] == [[6, 4], [5, 3, 2]]
+
+    def test_part_file_names_are_numbered(self):
+        assert part_path(Path("out/bundle.xml"), 3, 12) == Path("out/bundle.part03of12.xml")
+
+
+class TestExportParts:
+    """Test that a bundle export is split into self-describing parts under the limit"""
+
+    def test_parts_fit_the_limit_and_hold_every_line(self, tmp_path: Path, make_file_item):
+        big_content = "".join(f"line_{i} = {i}\n" for i in range(400))
+        items = [
+            make_file_item(tmp_path, "big.py", big_content),
+            *[make_file_item(tmp_path, f"small_{i}.py", f"x = {i}\n") for i in range(5)],
+        ]
+        bundle = Bundle(name="shard-test", file_items=items)
+
+        results = bundle.export_parts(1000)
+
+        assert len(results) > 1
+        for number, result in enumerate(results, start=1):
+            assert count_tokens(result.content) <= 1000
+            assert f'part="{number}" parts="{len(results)}"' in result.content
+        all_content = "".join(result.content for result in results)
+        for i in range(5):
+            assert f"x = {i}" in all_content
+        chunks = re.findall(r'chunks="(\d+)"', all_content)
+        assert chunks and len(chunks) == int(chunks[0])
+        for i in range(400):
+            assert f"line_{i} = {i}\n" in all_content
+
+    @pytest.mark.parametrize("export_format", ["xml", "xml-escaped", "markdown", "jsonl"])
+    @pytest.mark.parametrize("max_part_tokens", [1000, 3000])
+    def test_escaped_parts_fit_the_limit(
+        self, tmp_path: Path, make_file_item, export_format: str, max_part_tokens: int
+    ):
+        # escaping makes these lines cost more than their raw tokens
+        line = 'if a < b && c > "d": return "<&>"\n'
+        items = [make_file_item(tmp_path, f"m{i}.py", line * 40 * i) for i in range(1, 8)]
+        bundle = Bundle(name="shard-test", file_items=items)
+
+        results = bundle.export_parts(max_part_tokens, options=ExportOptions(format=export_format))
+
+        contents: dict = {}
+        for result in results:
+            assert count_tokens(result.content) <= max_part_tokens
+            for document in get_format(export_format).parse(result.content):
+                contents[document.source] = contents.get(document.source, "") + document.content
+        assert contents == {f"m{i}.py": line * 40 * i for i in range(1, 8)}
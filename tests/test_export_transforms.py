@@ -0,0 +1,113 @@
+import pytest
+
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.transforms import (
+    collapse_whitespace,
+    compact_indentation,
+    minify_data,
+    strip_comments,
+)
+
+
+PYTHON_SOURCE = '''#!/usr/bin/env python
+# Copyright (c) Someone
+# Licensed under MIT
+
+import os  # trailing comment
+url = "http://example.com/#anchor"
+
+
+def main():
+    # explain
+    return os.sep
+'''
+
+
+class TestStripComments:
+    """Test cases for removing comments per language"""
+
+    def test_python_keeps_shebang_and_strings(self):
+        stripped = strip_comments(PYTHON_SOURCE, Path("main.py"))
+
+        assert stripped.startswith("#!/usr/bin/env python\n")
+        assert "Copyright" not in stripped and "explain" not in stripped
+        assert "import os\n" in stripped
+        assert '"http://example.com/#anchor"' in stripped
+
+    @pytest.mark.parametrize("separator", ["\u2028", "\x0c", "\x85"])
+    def test_python_line_separators_inside_strings(self, separator: str):
+        source = f'doc = "a{separator}b"\nvalue_here = compute(1)\nz = 3 # trailing\n'
+
+        assert strip_comments(source, Path("main.py")) == (
+            f'doc = "a{separator}b"\nvalue_here = compute(1)\nz = 3\n'
+        )
+
+    def test_c_style_keeps_urls_in_strings(self):
+        source = '/* License */\nconst url = "http://example.com"; // why\n'
+
+        assert strip_comments(source, Path("a.ts")) == 'const url = "http://example.com";\n'
+
+    def test_c_style_unclosed_block_comment_keeps_the_rest(self):
+        source = "const re = /\\/*foo/; // why\nconst x = 1;\n"
+
+        assert strip_comments(source, Path("a.js")) == source
+
+    def test_unknown_languages_are_left_alone(self):
+        assert strip_comments("# not a comment\n", Path("notes.txt")) == "# not a comment\n"
+
+
+class TestWhitespaceTransforms:
+    """Test cases for collapsing whitespace and indentation"""
+
+    def test_blank_line_runs_are_collapsed(self):
+        assert collapse_whitespace("a  \n\n\n\nb\n\n", Path("a.py")) == "a\n\nb\n"
+
+    def test_indentation_is_one_space_per_level(self):
+        source = "def f():\n    if x:\n        return 1\n"
+
+        assert compact_indentation(source, Path("a.py")) == "def f():\n if x:\n  return 1\n"
+
+
+class TestMinifyData:
+    """Test cases for minifying data files and lockfiles"""
+
+    def test_json_is_minified(self):
+        assert minify_data('{\n  "a": [1, 2]\n}', Path("a.json")) == '{"a":[1,2]}'
+
+    def test_invalid_json_is_left_alone(self):
+        assert minify_data("{nope", Path("a.json")) == "{nope"
+
+    def test_lockfile_hashes_are_dropped(self):
+        lock = 'name = "x"\nversion = "1"\nsdist = { url = "u", hash = "sha256:abc" }\n'
+
+        assert minify_data(lock, Path("uv.lock")) == 'name = "x"\nversion = "1"\n'
+
+
+class TestTransformedExport:
+    """Test that transforms shrink the export and report what they saved"""
+
+    def test_export_reports_saved_tokens(self, tmp_path: Path, make_file_item):
+        source = make_file_item(tmp_path, "main.py", PYTHON_SOURCE)
+        bundle = Bundle(name="transform-test", file_items=[source])
+
+        raw = bundle.export()
+        transformed = bundle.export(
+            options=ExportOptions(transforms=["strip_comments", "collapse_whitespace"])
+        )
+
+        assert "Copyright" in raw.content
+        assert "Copyright" not in transformed.content
+        assert transformed.saved_tokens["strip_comments"] > 0
+        assert transformed.tokens == source.tokens - sum(transformed.saved_tokens.values())
+        assert "tokens saved by transforms" in transformed.summary
+        # transformed sections are cached apart from the raw ones
+        assert transformed.cache_stats.misses == 1
+
+    def test_unknown_transform_raises(self, tmp_path: Path, make_file_item):
+        bundle = Bundle(name="transform-test", file_items=[make_file_item(tmp_path, "a.py", "")])
+
+        with pytest.raises(ValueError, match="nope"):
+            bundle.export(options=ExportOptions(transforms=["nope"]))
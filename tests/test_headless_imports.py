@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+UI_MODULES = ("streamlit", "logfire", "opentelemetry", "pydantic_ai")
+UI_PACKAGES = ("filebundler.ui", "filebundler.app")
+
+REPORT_UI_MODULES = f"""
+import json
+ui_modules = sorted(
+    name
+    for name in sys.modules
+    if name.split(".")[0] in {UI_MODULES!r} or name.startswith({UI_PACKAGES!r})
+)
+print(json.dumps(ui_modules))
+"""
+
+
+def imported_ui_modules(code: str) -> list:
+    """UI modules a fresh interpreter imported while running code"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys\n" + code + REPORT_UI_MODULES],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestHeadlessImports:
+    """Test that the cli and the MCP server never import Streamlit, logfire or the UI"""
+
+    def test_cli_tree(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src/app.py").write_text("print('hello')\n", encoding="utf-8")
+
+        ui_modules = imported_ui_modules(
+            f"sys.argv = ['filebundler', 'cli', 'tree', {str(tmp_path)!r}]\n"
+            "from filebundler.main import main\n"
+            "main()\n"
+        )
+
+        assert ui_modules == []
+        assert (tmp_path / ".filebundler/project-structure.md").exists()
+
+    def test_cli_and_mcp_modules(self):
+        ui_modules = imported_ui_modules(
+            "from filebundler.main import prepare_headless\n"
+            "prepare_headless()\n"
+            "import filebundler.mcp_server\n"
+            "import filebundler.services.cli_export\n"
+            "import filebundler.services.cli_unbundle\n"
+            "import filebundler.services.cli_chat_instruction\n"
+        )
+
+        assert ui_modules == []
+
+    def test_cli_modules_import_quickly(self):
+        # loose: the headless modules import in ~0.1-0.3 s, Streamlit and logfire alone take ~1 s
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import time\n"
+                "start = time.perf_counter()\n"
+                "from filebundler.main import prepare_headless\n"
+                "prepare_headless()\n"
+                "import filebundler.services.cli_export\n"
+                "import filebundler.services.project_structure\n"
+                "print(time.perf_counter() - start)\n",
+            ],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert float(result.stdout.splitlines()[-1]) < 1.0
@@ -0,0 +1,166 @@
+import time
+import anyio
+import inspect
+import threading
+
+from pathlib import Path
+
+from filebundler import mcp_server
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+
+
+def modules(count: int) -> dict:
+    return {
+        f"src/module_{number}.py": f"def f{number}():\n    return {number}\n"
+        for number in range(count)
+    }
+
+
+def test_tools_are_coroutines_and_keep_their_schema():
+    assert inspect.iscoroutinefunction(mcp_server.export_file_bundle)
+    assert inspect.iscoroutinefunction(mcp_server.token_counts)
+
+    tools = {tool.name: tool for tool in anyio.run(mcp_server.mcp.list_tools)}
+    assert set(tools["token_counts"].inputSchema["properties"]) == {"project_path", "paths"}
+    assert "token count" in tools["token_counts"].description
+
+
+def test_export_matches_the_synchronous_export(tmp_path: Path, make_project):
+    project = make_project(tmp_path / "p", modules(20))
+    paths = [f"src/module_{number}.py" for number in range(20)]
+
+    exported = anyio.run(mcp_server.export_file_bundle, paths, str(project))
+
+    index = mcp_server.project_indexes.get(project)
+    expected = Bundle(name="mcp-bundle", file_items=index.get_file_items(paths)).export_code()
+    assert exported == expected
+
+
+def test_a_blocked_call_does_not_hold_up_other_calls(tmp_path: Path, make_project):
+    project = make_project(tmp_path / "p", modules(3))
+    mcp_server.project_indexes.get(project)
+    release = threading.Event()
+
+    async def scenario():
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(mcp_server.run_blocking, release.wait)
+            with anyio.fail_after(5):
+                counts = await mcp_server.token_counts(str(project), ["src"])
+            release.set()
+        return counts
+
+    assert anyio.run(scenario)["src"] > 0
+
+
+def test_a_cancelled_call_keeps_its_slot_until_its_thread_is_done(monkeypatch):
+    monkeypatch.setattr(mcp_server, "request_limiter", anyio.CapacityLimiter(1))
+    release = threading.Event()
+
+    @mcp_server.blocking_tool
+    def slow_tool() -> bool:
+        return release.wait()
+
+    async def scenario():
+        scope = anyio.CancelScope()
+
+        async def cancelled_call():
+            with scope:
+                await slow_tool()
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(cancelled_call)
+            await anyio.sleep(0.1)
+            scope.cancel()
+            await anyio.sleep(0.1)
+            # the thread still runs, so the slot isn't free yet
+            assert mcp_server.request_limiter.borrowed_tokens == 1
+            release.set()
+        return mcp_server.request_limiter.borrowed_tokens
+
+    try:
+        assert anyio.run(scenario) == 0
+    finally:
+        release.set()
+
+
+def test_a_cancelled_export_stops_between_files(tmp_path: Path, make_project, monkeypatch):
+    project = make_project(tmp_path / "p", modules(20))
+    file_items = mcp_server.project_indexes.get(project).get_file_items(
+        [f"src/module_{number}.py" for number in range(20)]
+    )
+    rendered = []
+
+    def slow_render(file_item, *args):
+        time.sleep(0.05)
+        rendered.append(file_item)
+
+    monkeypatch.setattr(mcp_server, "render_section", slow_render)
+    monkeypatch.setattr(mcp_server, "EXPORT_IO_WORKERS", 2)
+
+    async def scenario():
+        with anyio.move_on_after(0.12):
+            await mcp_server.prerender_sections(file_items, ExportOptions())
+
+    anyio.run(scenario)
+    # the files being rendered when the request was cancelled are finished, no others
+    assert len(rendered) <= 6
+    time.sleep(0.2)
+    assert len(rendered) <= 6
+
+
+def test_an_export_renders_in_at_most_max_concurrency_threads(
+    tmp_path: Path, make_project, monkeypatch
+):
+    project = make_project(tmp_path / "p", modules(20))
+    file_items = mcp_server.project_indexes.get(project).get_file_items(
+        [f"src/module_{number}.py" for number in range(20)]
+    )
+    monkeypatch.setattr(mcp_server, "request_limiter", anyio.CapacityLimiter(3))
+    lock = threading.Lock()
+    running = []
+    most_running = []
+
+    def slow_render(file_item, *args):
+        with lock:
+            running.append(file_item)
+            most_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(file_item)
+
+    monkeypatch.setattr(mcp_server, "render_section", slow_render)
+
+    async def scenario():
+        async with mcp_server.request_limiter:
+            await mcp_server.prerender_sections(file_items, ExportOptions())
+        return mcp_server.request_limiter.borrowed_tokens
+
+    assert anyio.run(scenario) == 0
+    assert len(most_running) == 20
+    assert max(most_running) <= 3
+
+
+def test_calls_wait_for_a_free_slot(tmp_path: Path, make_project, monkeypatch):
+    project = make_project(tmp_path / "p", modules(3))
+    monkeypatch.setattr(mcp_server, "request_limiter", anyio.CapacityLimiter(1))
+
+    async def scenario():
+        held = anyio.Event()
+        release = anyio.Event()
+
+        async def hold_the_slot():
+            async with mcp_server.request_limiter:
+                held.set()
+                await release.wait()
+
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(hold_the_slot)
+            await held.wait()
+            with anyio.move_on_after(0.2) as scope:
+                await mcp_server.token_counts(str(project), ["src"])
+            assert scope.cancelled_caught
+            release.set()
+        return await mcp_server.token_counts(str(project), ["src"])
+
+    assert anyio.run(scenario)["src"] > 0
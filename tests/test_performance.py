@@ -0,0 +1,56 @@
+import sys
+import json
+import time
+import pytest
+
+from pathlib import Path
+from dataclasses import asdict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from bench_suite import RepoSpec, generate_repo, run_phases  # noqa: E402
+
+SMALL_REPO = RepoSpec(files=1000, depth=4, median_bytes=800)
+GATED_PHASES = ["scan", "tokens", "export", "export_cached", "structure", "unbundle"]
+REPEAT = 5
+
+
+def calibrate() -> float:
+    """Best duration of a fixed pure Python workload, the unit of the baseline"""
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for index in range(20_000):
+            json.dumps({"path": f"src/pkg_{index}/module.py", "tokens": index})
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.fixture(scope="module")
+def small_repo(tmp_path_factory: pytest.TempPathFactory) -> tuple:
+    project = tmp_path_factory.mktemp("perf") / "project"
+    return project, generate_repo(project, SMALL_REPO)
+
+
+@pytest.mark.perf
+def test_scan_tokens_export_stay_within_the_baseline(
+    small_repo: tuple, perf_gate, tmp_path: Path
+):
+    from filebundler.services.cached_operations import get_tiktoken_encoder
+
+    try:
+        get_tiktoken_encoder()
+    except Exception as e:
+        pytest.skip(f"tiktoken's encoding isn't available offline: {e}")
+
+    project, repo = small_repo
+    best = {}
+    calibration = float("inf")
+    for run in range(REPEAT):
+        # calibrated between runs, so both see the same load on the machine
+        calibration = min(calibration, calibrate())
+        phases = run_phases(project, tmp_path / f"run-{run}", repo)
+        for phase in GATED_PHASES:
+            best[phase] = min(best.get(phase, float("inf")), phases[phase]["seconds"])
+
+    perf_gate.check("small_repo", asdict(SMALL_REPO), best, calibration)
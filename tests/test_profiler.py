@@ -0,0 +1,83 @@
+import sys
+import pytest
+import threading
+
+from filebundler.utils import profiler
+
+
+@pytest.fixture(autouse=True)
+def clean_profiler():
+    profiler.reset()
+    yield
+    profiler.reset()
+
+
+def test_snapshot_only_lists_recorded_phases():
+    profiler.record("stat", 2_000_000)
+    profiler.record("stat", 4_000_000)
+
+    snapshot = profiler.snapshot()
+    assert list(snapshot) == ["stat"]
+    assert snapshot["stat"]["count"] == 2
+    assert snapshot["stat"]["total_ms"] == pytest.approx(6.0)
+    assert snapshot["stat"]["mean_ms"] == pytest.approx(3.0)
+    assert snapshot["stat"]["max_ms"] == pytest.approx(4.0)
+
+
+def test_histogram_buckets_by_upper_bound():
+    profiler.record("tokenize", 5_000)  # 0.005ms
+    profiler.record("tokenize", 500_000)  # 0.5ms
+    profiler.record("tokenize", 20_000_000_000)  # 20s
+
+    histogram = profiler.snapshot()["tokenize"]["histogram"]
+    assert histogram["<0.01ms"] == 1
+    assert histogram["<1ms"] == 1
+    assert histogram[">=10000ms"] == 1
+    assert sum(histogram.values()) == 3
+
+
+def test_percentiles_use_the_recent_window():
+    for duration_ms in range(1, profiler.WINDOW + 101):
+        profiler.record("export", duration_ms * 1_000_000)
+
+    summary = profiler.snapshot()["export"]
+    assert summary["count"] == profiler.WINDOW + 100
+    # the first 100 durations fell out of the window
+    assert summary["p50_ms"] == pytest.approx(601)
+    assert summary["p95_ms"] == pytest.approx(1051)
+
+
+def test_phase_context_manager_records_on_error():
+    with pytest.raises(RuntimeError):
+        with profiler.phase("scan"):
+            raise RuntimeError("boom")
+
+    assert profiler.snapshot()["scan"]["count"] == 1
+
+
+def test_reset_clears_every_phase():
+    profiler.record("sort", 1_000)
+    profiler.reset()
+    assert profiler.snapshot() == {}
+
+
+def test_concurrent_records_are_all_counted():
+    def record_many():
+        for _ in range(20_000):
+            profiler.record("stat", 1)
+
+    interval = sys.getswitchinterval()
+    # switch threads as often as possible, so unguarded updates would race
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=record_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    summary = profiler.snapshot()["stat"]
+    assert summary["count"] == 160_000
+    assert summary["total_ms"] == pytest.approx(160_000 / 1e6)
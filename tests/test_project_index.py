@@ -0,0 +1,155 @@
+import os
+import threading
+
+from pathlib import Path
+
+from filebundler.services import project_index
+from filebundler.services.project_index import ProjectIndexCache
+
+
+def touch_later(path: Path, content: str):
+    """Write content with an mtime that differs even on coarse-grained filesystems"""
+    stat = path.stat()
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestProjectIndex:
+    def test_index_is_built_once_and_reused(self, tmp_path: Path, make_project):
+        project = make_project(tmp_path / "p", {"a.py": "x = 1\n", "src/b.py": "y = 2\n"})
+        cache = ProjectIndexCache(check_interval=60)
+
+        index = cache.get(project)
+        assert set(index.files) == {"a.py", "src/b.py"}
+        assert all(entry.tokens > 0 for entry in index.files.values())
+        assert cache.get(project) is index
+        assert index.builds == 1
+
+    def test_changed_file_is_updated_in_place(self, tmp_path: Path, make_project):
+        project = make_project(tmp_path / "p", {"a.py": "x = 1\n", "b.py": "y = 2\n"})
+        cache = ProjectIndexCache(check_interval=0)
+        index = cache.get(project)
+        tokens = index.files["a.py"].tokens
+
+        touch_later(project / "a.py", "x = 1\n" * 50)
+        assert cache.get(project).files["a.py"].tokens > tokens
+        assert index.builds == 1
+        assert index.app.highest_token_item is index.files["a.py"].item
+
+    def test_added_file_triggers_a_rescan(self, tmp_path: Path, make_project):
+        project = make_project(tmp_path / "p", {"src/a.py": "x = 1\n"})
+        cache = ProjectIndexCache(check_interval=0)
+        cache.get(project)
+
+        (project / "src" / "new.py").write_text("z = 3\n", encoding="utf-8")
+        os.utime(project / "src", ns=(0, (project / "src").stat().st_mtime_ns + 10**9))
+        index = cache.get(project)
+        assert "src/new.py" in index.files
+        assert index.builds == 2
+
+    def test_changes_are_not_checked_within_the_interval(self, tmp_path: Path, make_project):
+        project = make_project(tmp_path / "p", {"a.py": "x = 1\n"})
+        cache = ProjectIndexCache(check_interval=60)
+        tokens = cache.get(project).files["a.py"].tokens
+
+        touch_later(project / "a.py", "x = 1\n" * 50)
+        assert cache.get(project).files["a.py"].tokens == tokens
+        assert cache.get(project, refresh=True).files["a.py"].tokens > tokens
+
+
+class TestProjectIndexCache:
+    def test_least_recently_used_project_is_evicted(self, tmp_path: Path, make_project):
+        projects = [make_project(tmp_path / name, {"a.py": "x = 1\n"}) for name in "abc"]
+        cache = ProjectIndexCache(max_projects=2, check_interval=60)
+
+        cache.get(projects[0])
+        cache.get(projects[1])
+        cache.get(projects[0])
+        cache.get(projects[2])
+        assert projects[0] in cache
+        assert projects[1] not in cache
+        assert len(cache) == 2
+
+    def test_idle_projects_are_evicted(self, tmp_path: Path, make_project):
+        projects = [make_project(tmp_path / name, {"a.py": "x = 1\n"}) for name in "ab"]
+        cache = ProjectIndexCache(idle_seconds=0, check_interval=60)
+
+        cache.get(projects[0])
+        cache.get(projects[1])
+        assert projects[0] not in cache
+        assert projects[1] in cache
+
+
+class TestIndexQueries:
+    FILES = {
+        "src/a.py": "a = 1\n",
+        "src/pkg/big.py": "value = compute(1, 2, 3)\n" * 40,
+        "src/pkg/small.py": "b = 2\n" * 5,
+        "lib/test_util.py": "def test(): pass\n",
+    }
+
+    def test_token_counts_of_files_and_directories(self, tmp_path: Path, make_project):
+        index = ProjectIndexCache().get(make_project(tmp_path / "p", self.FILES))
+        files = {path: entry.tokens for path, entry in index.files.items()}
+
+        counts = index.token_counts(["src/pkg", "./src/a.py", ".", "missing.py"])
+        assert counts["src/pkg"] == files["src/pkg/big.py"] + files["src/pkg/small.py"]
+        assert counts["./src/a.py"] == files["src/a.py"]
+        assert counts["."] == sum(files.values())
+        assert counts["missing.py"] is None
+
+    def test_largest_files_and_directories(self, tmp_path: Path, make_project):
+        index = ProjectIndexCache().get(make_project(tmp_path / "p", self.FILES))
+
+        assert [entry.relative for entry in index.largest_files(2)] == ["src/pkg/big.py", "src/pkg/small.py"]
+        assert [path for path, _ in index.largest_directories(2)] == ["src", "src/pkg"]
+        assert index.largest_directories(1)[0][1].files == 3
+
+    def test_search_by_glob_and_substring(self, tmp_path: Path, make_project):
+        index = ProjectIndexCache().get(make_project(tmp_path / "p", self.FILES))
+
+        def paths(query: str, limit: int = 10):
+            found, total = index.search(query, limit)
+            return [entry.relative for entry in found], total
+
+        assert paths("test_*.py") == (["lib/test_util.py"], 1)
+        assert paths("src/pkg/*") == (["src/pkg/big.py", "src/pkg/small.py"], 2)
+        assert paths("PKG/S") == (["src/pkg/small.py"], 1)
+        assert paths(".py", limit=1) == (["lib/test_util.py"], 4)
+
+    def test_search_during_a_rescan(self, tmp_path: Path, make_project, monkeypatch):
+        project = make_project(tmp_path / "p", {**self.FILES, "src/extra.py": "e = 1\n"})
+        index = ProjectIndexCache().get(project)
+        (project / "src" / "extra.py").unlink()
+        rescan = threading.Thread(target=index.build)
+        fnmatchcase = project_index.fnmatch.fnmatchcase
+
+        def match_while_rescanning(name: str, pattern: str) -> bool:
+            # a rescan starts in the middle of the search and gets as far as the lock lets it
+            if rescan.ident is None:
+                rescan.start()
+                rescan.join(timeout=0.2)
+            return fnmatchcase(name, pattern)
+
+        monkeypatch.setattr(project_index.fnmatch, "fnmatchcase", match_while_rescanning)
+        found, total = index.search("*.py", 10)
+        rescan.join()
+
+        assert "src/extra.py" in [entry.relative for entry in found]
+        assert "src/extra.py" not in index.files
+
+    def test_structure_matches_the_scanned_structure(self, tmp_path: Path, make_project):
+        from filebundler.services.project_structure import _generate_project_structure
+
+        index = ProjectIndexCache().get(make_project(tmp_path / "p", self.FILES))
+        assert _generate_project_structure(index.app, root=index.structure()) == (
+            _generate_project_structure(index.app)
+        )
+
+    def test_structure_follows_changed_files(self, tmp_path: Path, make_project):
+        project = make_project(tmp_path / "p", self.FILES)
+        cache = ProjectIndexCache(check_interval=0)
+        tokens = cache.get(project).structure().tokens
+
+        touch_later(project / "src" / "a.py", "a = 1\n" * 100)
+        assert cache.get(project).structure().tokens > tokens
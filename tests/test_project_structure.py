@@ -0,0 +1,225 @@
+import os
+import time
+
+from pathlib import Path
+
+from filebundler.FileBundlerApp import FileBundlerApp
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ProjectSettings import StructureSettings
+from filebundler.features.structure.limits import limit_structure
+from filebundler.services.project_structure import save_project_structure
+from filebundler.features.structure.tree import (
+    StructureNode,
+    build_structure,
+    compute_totals,
+    render_structure,
+)
+
+
+def file_node(name: str, tokens: int, mtime: float = 0.0) -> StructureNode:
+    return StructureNode(name, False, tokens, mtime)
+
+
+def dir_node(name: str, *children: StructureNode) -> StructureNode:
+    return StructureNode(name, True, children=list(children))
+
+
+def make_item_tree(project_path: Path, relatives: list) -> FileItem:
+    """FileItem tree like FileBundlerApp loads it, for the given files"""
+    root = FileItem(path=project_path, project_path=project_path)
+    items = {project_path: root}
+    for relative in relatives:
+        path = project_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("word " * 10, encoding="utf-8")
+        for parent in reversed([path, *path.parents]):
+            if parent in items or project_path not in [parent, *parent.parents]:
+                continue
+            item = FileItem(path=parent, project_path=project_path)
+            items[parent.parent].children.append(item)
+            items[parent] = item
+    return root
+
+
+class TestRenderStructure:
+    """Test the single-pass project structure renderer"""
+
+    def test_totals_order_and_lines(self):
+        root = compute_totals(
+            dir_node(
+                "project",
+                file_node("b.py", 3, mtime=5),
+                dir_node("src", file_node("Z.py", 1, mtime=9), file_node("a.py", 2)),
+                file_node("A.md", 4),
+                dir_node("empty"),
+            )
+        )
+
+        assert (root.tokens, root.mtime) == (10, 9)
+        assert render_structure(root, "project") == (
+            "# Project Structure: project\n"
+            "## Directory Structure\n```\n"
+            "project/ (10)\n"
+            "├── 📁 empty/ (0 tokens)\n"
+            "├── 📁 src/ (3 tokens)\n"
+            "│   ├── 📄 a.py (2 tokens)\n"
+            "│   └── 📄 Z.py (1 tokens)\n"
+            "├── 📄 A.md (4 tokens)\n"
+            "└── 📄 b.py (3 tokens)\n"
+            "```\n"
+        )
+
+    def test_deep_trees_do_not_recurse(self):
+        root = leaf = dir_node("project")
+        for depth in range(5000):
+            child = dir_node(f"d{depth}")
+            leaf.children.append(child)
+            leaf = child
+        leaf.children.append(file_node("deep.py", 7))
+
+        content = render_structure(compute_totals(root), "project")
+
+        assert content.count("(7 tokens)") == 5001
+        assert content.splitlines()[-2].endswith("└── 📄 deep.py (7 tokens)")
+
+    def test_build_structure_from_file_items(self, tmp_path: Path):
+        root_item = make_item_tree(tmp_path, ["src/app.py", "src/lib/util.py", "README.md"])
+
+        root = build_structure(root_item)
+
+        assert [child.name for child in root.children] == ["src", "README.md"]
+        src = root.children[0]
+        assert [child.name for child in src.children] == ["lib", "app.py"]
+        assert src.tokens == src.children[0].tokens + src.children[1].tokens
+        assert root.tokens == src.tokens + root.children[1].tokens > 0
+
+
+def sample_structure() -> StructureNode:
+    return compute_totals(
+        dir_node(
+            "project",
+            dir_node(
+                "big",
+                dir_node("inner", file_node("x.py", 500), file_node("y.py", 400)),
+                file_node("b1.py", 100),
+            ),
+            dir_node("fresh", file_node("new.py", 5, mtime=100), file_node("n2.py", 1)),
+            file_node("top.py", 50),
+        )
+    )
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+class TestLimitStructure:
+    """Test depth-, width- and budget-limited project structures"""
+
+    def test_max_depth_collapses_deeper_directories(self):
+        limited = limit_structure(sample_structure(), StructureSettings(max_depth=1), count_words)
+
+        lines = render_structure(limited, "project").splitlines()[4:-1]
+        assert lines == [
+            "├── 📁 big/ (1000 tokens, 3 files not shown)",
+            "├── 📁 fresh/ (6 tokens, 2 files not shown)",
+            "└── 📄 top.py (50 tokens)",
+        ]
+
+    def test_max_children_keeps_the_largest_entries(self):
+        settings = StructureSettings(max_children=1)
+
+        limited = limit_structure(sample_structure(), settings, count_words)
+
+        lines = render_structure(limited, "project").splitlines()[4:-1]
+        assert lines == [
+            "├── 📁 big/ (1000 tokens)",
+            "│   ├── 📁 inner/ (900 tokens)",
+            "│   │   ├── 📄 x.py (500 tokens)",
+            "│   │   └── … 1 more entries (1 files, 400 tokens)",
+            "│   └── … 1 more entries (1 files, 100 tokens)",
+            "└── … 2 more entries (3 files, 56 tokens)",
+        ]
+
+    def test_focus_recent_keeps_the_latest_changes(self):
+        settings = StructureSettings(max_children=1, focus="recent")
+
+        limited = limit_structure(sample_structure(), settings, count_words)
+
+        assert [child.name for child in limited.children] == ["fresh"]
+        assert [child.name for child in limited.children[0].children] == ["new.py"]
+
+    def test_token_budget_expands_the_largest_subtrees_first(self):
+        full = render_structure(sample_structure(), "project")
+        budget = count_words(full) - 1
+        header = render_structure(StructureNode("project", True, 1061), "project")
+
+        limited = limit_structure(
+            sample_structure(),
+            StructureSettings(token_budget=budget),
+            count_words,
+            fixed_tokens=count_words(header),
+        )
+
+        content = render_structure(limited, "project")
+        assert count_words(content) <= budget
+        assert "x.py" in content
+        assert "📁 fresh/ (6 tokens, 2 files not shown)" in content
+
+    def test_input_structure_is_left_unchanged(self):
+        root = sample_structure()
+        full = render_structure(root, "project")
+
+        limit_structure(root, StructureSettings(max_depth=1, max_children=1), count_words)
+
+        assert render_structure(root, "project") == full
+
+
+class TestSaveProjectStructure:
+    """Test that project-structure.md is only rewritten when the tree changed"""
+
+    def save_and_age(self, app: FileBundlerApp, **kwargs) -> Path:
+        output_file = save_project_structure(app, **kwargs)
+        os.utime(output_file, (1_000_000_000, 1_000_000_000))
+        return output_file
+
+    def was_rewritten(self, output_file: Path) -> bool:
+        return output_file.stat().st_mtime != 1_000_000_000
+
+    def test_unchanged_tree_keeps_the_file(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src/app.py").write_text("print('hello')\n", encoding="utf-8")
+        output_file = self.save_and_age(FileBundlerApp(tmp_path))
+
+        app = FileBundlerApp(tmp_path)
+        save_project_structure(app)
+        assert not self.was_rewritten(output_file)
+
+        save_project_structure(app, force=True)
+        assert self.was_rewritten(output_file)
+
+    def test_token_and_settings_changes_rewrite_the_file(self, tmp_path: Path):
+        (tmp_path / "src").mkdir()
+        source = tmp_path / "src/app.py"
+        source.write_text("print('hello')\n", encoding="utf-8")
+        output_file = self.save_and_age(FileBundlerApp(tmp_path))
+        old_content = output_file.read_text(encoding="utf-8")
+
+        source.write_text("print('hello')\n" * 20, encoding="utf-8")
+        self.save_and_age(FileBundlerApp(tmp_path))
+        assert output_file.read_text(encoding="utf-8") != old_content
+
+        save_project_structure(FileBundlerApp(tmp_path), StructureSettings(max_depth=1))
+        assert self.was_rewritten(output_file)
+
+    def test_recent_focus_rewrites_the_file_when_mtimes_change(self, tmp_path: Path):
+        for name, age in [("a.py", 200), ("b.py", 100)]:
+            (tmp_path / name).write_text("x = 1\n", encoding="utf-8")
+            os.utime(tmp_path / name, (time.time() - age, time.time() - age))
+        settings = StructureSettings(max_children=1, focus="recent")
+        output_file = save_project_structure(FileBundlerApp(tmp_path), settings)
+        assert "b.py" in output_file.read_text(encoding="utf-8")
+
+        os.utime(tmp_path / "a.py")
+        save_project_structure(FileBundlerApp(tmp_path), settings)
+        assert "a.py" in output_file.read_text(encoding="utf-8")
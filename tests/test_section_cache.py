@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.FileItem import FileItem
+from filebundler.services.cached_operations import FileContentCache
+from filebundler.services.section_cache import (
+    RenderedSection,
+    SectionCache,
+    SectionCacheStats,
+)
+
+
+def touch_with_new_content(file_item: FileItem, content: str):
+    stat = file_item.path.stat()
+    file_item.path.write_text(content, encoding="utf-8")
+    # make sure the identity changes even on filesystems with coarse mtimes
+    os.utime(file_item.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestSectionCache:
+    """Test cases for the export section cache"""
+
+    def test_second_lookup_is_a_hit(self, tmp_path: Path, make_file_item):
+        cache = SectionCache()
+        file_item = make_file_item(tmp_path, "a.py", "print('a')")
+        renders: list[str] = []
+
+        def render():
+            renders.append(str(file_item))
+            return RenderedSection("section", 3, 10)
+
+        stats = SectionCacheStats()
+        first = cache.get_or_render(file_item, "xml", render, stats)
+        second = cache.get_or_render(file_item, "xml", render, stats)
+
+        assert first == second == RenderedSection("section", 3, 10)
+        assert renders == ["a.py"]
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_changed_file_is_rendered_again(self, tmp_path: Path, make_file_item):
+        cache = SectionCache()
+        file_item = make_file_item(tmp_path, "a.py", "print('a')")
+        stats = SectionCacheStats()
+
+        cache.get_or_render(file_item, "xml", lambda: RenderedSection("old", 1, 0), stats)
+        touch_with_new_content(file_item, "print('changed')")
+
+        rendered = cache.get_or_render(file_item, "xml", lambda: RenderedSection("new", 2, 0), stats)
+        assert (rendered.body, rendered.tokens) == ("new", 2)
+        assert stats.misses == 2
+        # the changed file replaces its previous entry
+        assert len(cache) == 1
+
+    def test_formats_are_cached_separately(self, tmp_path: Path, make_file_item):
+        cache = SectionCache()
+        file_item = make_file_item(tmp_path, "a.py", "print('a')")
+        stats = SectionCacheStats()
+
+        cache.get_or_render(file_item, "xml", lambda: RenderedSection("xml", 1, 0), stats)
+        assert cache.get_or_render(file_item, "md", lambda: RenderedSection("md", 1, 0), stats).body == "md"
+        assert stats.misses == 2
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path: Path, make_file_item):
+        cache = SectionCache(max_entries=2)
+        items = [make_file_item(tmp_path, f"{name}.py", name) for name in "abc"]
+        stats = SectionCacheStats()
+
+        for item in items:
+            cache.get_or_render(item, "xml", lambda: RenderedSection("section", 1, 0), stats)
+
+        assert len(cache) == 2
+        cache.get_or_render(items[0], "xml", lambda: RenderedSection("section", 1, 0), stats)
+        assert stats.misses == 4
+
+
+class TestFileContentCache:
+    """Test cases for the file content cache"""
+
+    def test_contents_are_bounded_by_their_length(self):
+        cache = FileContentCache(max_chars=800)
+        reads: list[str] = []
+
+        def read(file_path: str) -> str:
+            reads.append(file_path)
+            return "x" * 100
+
+        for name in ["a", "b", "c", "d", "e", "f", "g", "h", "i"]:
+            cache.get(name, 1.0, read)
+        cache.get("a", 1.0, read)
+
+        assert cache.chars <= 800
+        # "a" was the least recently used, so it was evicted and read again
+        assert reads.count("a") == 2
+
+    def test_new_mtime_replaces_the_entry_and_large_contents_are_not_kept(self):
+        cache = FileContentCache(max_chars=800)
+
+        assert cache.get("a", 1.0, lambda path: "old") == "old"
+        assert cache.get("a", 2.0, lambda path: "new!") == "new!"
+        assert cache.chars == 4
+        cache.get("big", 1.0, lambda path: "x" * 101)
+        assert cache.chars == 4
+
+
+class TestBundleExportCache:
+    """Test that re-exports only re-render changed files"""
+
+    def test_reexport_reuses_unchanged_sections(self, tmp_path: Path, make_file_item):
+        unchanged = make_file_item(tmp_path, "unchanged.py", "x = 1\n")
+        changed = make_file_item(tmp_path, "changed.py", "y = 2\n")
+        bundle = Bundle(name="cache-test", file_items=[unchanged, changed])
+
+        bundle.export()
+        touch_with_new_content(changed, "y = 3\n")
+        second = bundle.export()
+
+        assert "y = 3" in second.content
+        assert (second.cache_stats.hits, second.cache_stats.misses) == (1, 1)
+        assert second.file_count == 2
+        assert second.size_bytes == bundle.size_bytes
+        assert second.tokens == bundle.tokens
@@ -0,0 +1,168 @@
+import sys
+import pytest
+
+from pathlib import Path
+
+from filebundler.main import main
+from filebundler.models.Bundle import Bundle
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.features.export.budget import BudgetCostModel, plan_token_budget
+from filebundler.features.export.priority import rank_file_items
+from filebundler.services.token_count import count_tokens
+
+
+def make_costs(tokens: dict[str, int]) -> BudgetCostModel:
+    """One token per line, 10 tokens of markup per file, 5 per omitted listing"""
+    return BudgetCostModel(
+        content_tokens=lambda fi: tokens[fi.name],
+        section_overhead=lambda fi: 10,
+        omitted_listing=lambda fi: 5,
+        truncate=lambda fi, max_tokens: "line\n" * max_tokens,
+        count_tokens=lambda text: text.count("\n"),
+    )
+
+
+class TestPlanTokenBudget:
+    """Test cases for fitting files into a token budget"""
+
+    def test_everything_fits(self, tmp_path: Path, make_file_item):
+        items = [make_file_item(tmp_path, name, "") for name in ["a", "b"]]
+        plan = plan_token_budget(items, 100, "truncate", make_costs({"a": 20, "b": 20}))
+
+        assert plan.included == items
+        assert not plan.truncated and not plan.dropped
+        assert plan.used_tokens == 60
+
+    def test_truncate_fills_the_rest_of_the_budget(self, tmp_path: Path, make_file_item):
+        a, b, c = [make_file_item(tmp_path, name, "") for name in ["a", "b", "c"]]
+        costs = make_costs({"a": 100, "b": 500, "c": 10})
+        plan = plan_token_budget([a, b, c], 250, "truncate", costs)
+
+        assert plan.included == [a]
+        assert list(plan.truncated) == [b]
+        # c is dropped even though it would fit, and its listing is paid for
+        assert plan.dropped == [c]
+        assert plan.truncated[b].count("\n") == 250 - 110 - 5 - 10
+        assert plan.used_tokens == 250
+
+    def test_omit_lets_smaller_files_in(self, tmp_path: Path, make_file_item):
+        a, b, c = [make_file_item(tmp_path, name, "") for name in ["a", "b", "c"]]
+        costs = make_costs({"a": 100, "b": 500, "c": 10})
+        plan = plan_token_budget([a, b, c], 250, "omit", costs)
+
+        assert plan.included == [a, c]
+        assert plan.dropped == [b]
+        assert plan.used_tokens == 110 + 20 + 5
+
+    def test_tiny_remainders_are_not_truncated(self, tmp_path: Path, make_file_item):
+        a, b = [make_file_item(tmp_path, name, "") for name in ["a", "b"]]
+        plan = plan_token_budget([a, b], 140, "truncate", make_costs({"a": 100, "b": 500}))
+
+        assert not plan.truncated
+        assert plan.dropped == [b]
+
+
+class TestPriorities:
+    """Test cases for ranking files before fitting them into a budget"""
+
+    def test_relevance_ranks_come_first(self, tmp_path: Path, make_file_item):
+        items = [make_file_item(tmp_path, name, "") for name in ["a", "b", "c"]]
+        options = ExportOptions(priority="relevance", relevance_ranks={"c": 0, "b": 1})
+
+        assert [fi.name for fi in rank_file_items(items, options)] == ["c", "b", "a"]
+
+    def test_unknown_priority_raises(self, tmp_path: Path, make_file_item):
+        items = [make_file_item(tmp_path, "a", "")]
+        with pytest.raises(ValueError, match="nope"):
+            rank_file_items(items, ExportOptions(priority="nope"))
+
+
+class TestBudgetedExport:
+    """Test that a budgeted export reports what it left out"""
+
+    def test_export_fits_budget_and_lists_dropped_files(self, tmp_path: Path, make_file_item):
+        small = make_file_item(tmp_path, "small.py", "x = 1\n")
+        big = make_file_item(tmp_path, "big.py", "value = 'some text'\n" * 500)
+        bundle = Bundle(name="budget-test", file_items=[small, big])
+
+        result = bundle.export(
+            options=ExportOptions(token_budget=300, priority="size", overflow="omit")
+        )
+
+        assert result.dropped == ["big.py"]
+        assert '<omitted source="big.py"' in result.content
+        assert result.budget_used_tokens is not None
+        assert result.budget_used_tokens <= 300
+
+    def test_explicit_priority_keeps_bundle_order_over_tree_order(
+        self, tmp_path: Path, make_file_item
+    ):
+        b = make_file_item(tmp_path, "b.py", "value = 'some text'\n" * 250)
+        a = make_file_item(tmp_path, "a.py", "value = 'some text'\n" * 250)
+        bundle = Bundle(name="budget-test", file_items=[b, a])
+
+        result = bundle.export(options=ExportOptions(token_budget=2500, overflow="omit"))
+
+        assert result.dropped == ["a.py"]
+        assert "b.py" in result.content.split("<omitted_documents")[0]
+
+    def test_truncated_file_ends_on_a_line_boundary(self, tmp_path: Path, make_file_item):
+        big = make_file_item(tmp_path, "big.py", "value = 'some text'\n" * 500)
+        bundle = Bundle(name="budget-test", file_items=[big])
+
+        result = bundle.export(options=ExportOptions(token_budget=300))
+
+        assert result.truncated == ["big.py"]
+        assert 'truncated="true"' in result.content
+        assert count_tokens(result.content) <= 300
+        # the kept content ends with a whole line, followed by the section's own newline
+        assert "value = 'some text'\n]]>\n        </document_content>" in result.content
+
+    @pytest.mark.parametrize("export_format", ["xml", "xml-escaped", "markdown", "jsonl"])
+    @pytest.mark.parametrize("token_budget", [300, 500, 2000])
+    def test_truncated_export_fits_the_budget(
+        self, tmp_path: Path, make_file_item, export_format: str, token_budget: int
+    ):
+        line = "def f(a, b):\n    return a < b and '&'\n"
+        items = [make_file_item(tmp_path, f"m{i}.py", line * 100 * i) for i in range(1, 5)]
+        bundle = Bundle(name="budget-test", file_items=items)
+
+        result = bundle.export(
+            options=ExportOptions(token_budget=token_budget, format=export_format)
+        )
+
+        assert result.truncated
+        assert count_tokens(result.content) <= token_budget
+
+
+class TestCliOptions:
+    """Test that invalid cli export options are reported like other cli errors"""
+
+    @pytest.mark.parametrize(
+        "flag, value, error",
+        [
+            ("--max-tokens", "0", "token_budget: Input should be greater than 0"),
+            ("--max-part-tokens", "-1", "--max-part-tokens must be greater than 0"),
+        ],
+    )
+    def test_invalid_limits_exit_with_an_error(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys,
+        flag: str,
+        value: str,
+        error: str,
+    ):
+        # main sets both, monkeypatch restores them
+        monkeypatch.setenv("LOG_LEVEL", "info")
+        monkeypatch.setenv("PYDANTIC_DISABLE_PLUGINS", "logfire-plugin")
+        monkeypatch.setattr(
+            sys, "argv", ["filebundler", "cli", "export", str(tmp_path), "-o", "-", flag, value]
+        )
+
+        with pytest.raises(SystemExit) as exit_info:
+            main()
+
+        assert exit_info.value.code == 1
+        assert error in capsys.readouterr().out
@@ -0,0 +1,75 @@
+import pytest
+
+from contextlib import contextmanager
+
+from filebundler.utils import tracing
+
+
+class RecordingLogfire:
+    """Stands in for the logfire module, records the spans opened"""
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def span(self, msg_template, **attributes):
+        self.spans.append(msg_template)
+        yield
+
+
+@pytest.fixture
+def recorder():
+    def configure(granularity="coarse", sample_rate=1.0):
+        tracing.configure(granularity, sample_rate)
+        if tracing.is_enabled():
+            tracing._logfire = recorder
+
+    recorder = RecordingLogfire()
+    recorder.configure = configure
+    yield recorder
+    tracing.configure("off")
+
+
+def test_spans_are_noops_until_configured():
+    tracing.configure("off")
+    assert not tracing.is_enabled()
+    with tracing.span("phase"), tracing.span("item", detail=True):
+        pass
+
+
+def test_coarse_granularity_skips_detail_spans(recorder: RecordingLogfire):
+    recorder.configure("coarse")
+    with tracing.span("scan"):
+        for name in ("a", "b"):
+            with tracing.span("directory {name}", detail=True, name=name):
+                pass
+    assert recorder.spans == ["scan"]
+
+
+def test_full_granularity_records_detail_spans(recorder: RecordingLogfire):
+    recorder.configure("full")
+    with tracing.span("scan"):
+        with tracing.span("directory {name}", detail=True, name="a"):
+            pass
+    assert recorder.spans == ["scan", "directory {name}"]
+
+
+def test_sampling_drops_whole_traces(recorder: RecordingLogfire, monkeypatch: pytest.MonkeyPatch):
+    recorder.configure("full", sample_rate=0.5)
+    draws = iter([0.9, 0.1])
+    monkeypatch.setattr(tracing.random, "random", lambda: next(draws))
+
+    with tracing.span("dropped"):
+        with tracing.span("nested in dropped"):
+            pass
+    with tracing.span("kept"):
+        with tracing.span("nested in kept"):
+            pass
+    assert recorder.spans == ["kept", "nested in kept"]
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        tracing.configure("verbose")  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        tracing.configure("coarse", sample_rate=1.5)
@@ -0,0 +1,184 @@
+import io
+import os
+import sys
+import stat
+import pytest
+
+from pathlib import Path
+from typing import Iterator, List
+
+from filebundler.models.Bundle import Bundle
+from filebundler.models.FileItem import FileItem
+from filebundler.models.ExportOptions import ExportOptions
+from filebundler.services.cli_unbundle import cli_unbundle, unbundle
+
+CONTENTS = {
+    "src/app.py": "print('<hello> & ]]>')\n",
+    "docs/a.txt": "same\n",
+    "docs/b.txt": "same\n",
+}
+
+
+def export_bundle(project_path: Path, format: str = "xml") -> str:
+    items = []
+    for relative, content in CONTENTS.items():
+        (project_path / relative).parent.mkdir(parents=True, exist_ok=True)
+        (project_path / relative).write_text(content, encoding="utf-8")
+        items.append(FileItem(path=Path(relative), project_path=project_path))
+    bundle = Bundle(name="unbundle-test", file_items=items)
+    return bundle.export(options=ExportOptions(format=format)).content
+
+
+def read_tree(root: Path) -> dict:
+    return {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8")
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+class TestStreamingUnbundle:
+    """Test that bundles are unbundled while they are read"""
+
+    @pytest.mark.parametrize("format", ["xml", "xml-escaped", "markdown", "jsonl"])
+    def test_files_are_written_before_the_bundle_ends(self, tmp_path: Path, format: str):
+        content = export_bundle(tmp_path / "project", format)
+        output = tmp_path / "output"
+        written_while_reading: List[bool] = []
+
+        def lines() -> Iterator[str]:
+            all_lines = content.splitlines(keepends=True)
+            for position, line in enumerate(all_lines):
+                if position == len(all_lines) - 1:
+                    written_while_reading.append((output / "docs/a.txt").exists())
+                yield line
+
+        unbundle(lines(), output)
+
+        assert written_while_reading == [True]
+        assert read_tree(output) == CONTENTS
+
+    def test_fenced_bundle_is_unwrapped(self, tmp_path: Path):
+        content = export_bundle(tmp_path / "project")
+        fenced = f"Here you go:\n```xml\n{content}\n```\n"
+
+        unbundle(io.StringIO(fenced.split("\n", 1)[1]), tmp_path / "output")
+
+        assert read_tree(tmp_path / "output") == CONTENTS
+
+    def test_truncated_bundle_raises(self, tmp_path: Path):
+        content = export_bundle(tmp_path / "project")
+
+        with pytest.raises(SyntaxError):
+            unbundle(io.StringIO(content[: len(content) // 2]), tmp_path / "output")
+
+
+class TestChangeDetection:
+    """Test that only changed files are written, atomically, and that dry runs write nothing"""
+
+    def test_unchanged_files_keep_their_mtime(self, tmp_path: Path):
+        content = export_bundle(tmp_path / "project")
+        output = tmp_path / "output"
+        unbundle(io.StringIO(content), output)
+        old_mtime = 1_000_000_000
+        for path in output.rglob("*.txt"):
+            os.utime(path, (old_mtime, old_mtime))
+        (output / "src/app.py").write_text("print('old')\n", encoding="utf-8")
+
+        result = unbundle(io.StringIO(content), output, max_workers=4)
+
+        assert result.updated == ["src/app.py"]
+        assert sorted(result.unchanged) == ["docs/a.txt", "docs/b.txt"]
+        assert all(p.stat().st_mtime == old_mtime for p in output.rglob("*.txt"))
+        assert read_tree(output) == CONTENTS
+
+    @pytest.mark.parametrize("format", ["xml", "xml-escaped", "markdown", "jsonl"])
+    def test_crlf_files_round_trip_unchanged(
+        self, tmp_path: Path, format: str, capsys: pytest.CaptureFixture
+    ):
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "run.bat").write_bytes(b"@echo off\r\necho hi\r\n")
+        bundle = Bundle(name="crlf", file_items=[FileItem(path=Path("run.bat"), project_path=project)])
+        content = bundle.export(options=ExportOptions(format=format)).content
+        output = tmp_path / "output"
+        (output / "run.bat").parent.mkdir(parents=True)
+        (output / "run.bat").write_bytes(b"@echo off\r\necho hi\r\n")
+        os.utime(output / "run.bat", (1_000_000_000, 1_000_000_000))
+
+        dry_run = unbundle(io.StringIO(content), output, dry_run=True)
+        result = unbundle(io.StringIO(content), output)
+
+        assert dry_run.unchanged == result.unchanged == ["run.bat"]
+        assert "run.bat" not in capsys.readouterr().out
+        assert (output / "run.bat").stat().st_mtime == 1_000_000_000
+
+    def test_updates_keep_the_file_mode_and_leave_no_temporary_files(self, tmp_path: Path):
+        output = tmp_path / "output"
+        script = output / "src/app.py"
+        script.parent.mkdir(parents=True)
+        script.write_text("old\n", encoding="utf-8")
+        script.chmod(0o755)
+
+        unbundle(io.StringIO(export_bundle(tmp_path / "project")), output)
+
+        assert stat.S_IMODE(script.stat().st_mode) == 0o755
+        assert read_tree(output) == CONTENTS
+
+    def test_dry_run_prints_a_diff_and_writes_nothing(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture
+    ):
+        output = tmp_path / "output"
+        (output / "src").mkdir(parents=True)
+        (output / "src/app.py").write_text("print('old')\n", encoding="utf-8")
+
+        result = unbundle(
+            io.StringIO(export_bundle(tmp_path / "project")), output, dry_run=True
+        )
+
+        printed = capsys.readouterr().out
+        assert "M src/app.py (+1 -1)" in printed
+        assert "-print('old')" in printed
+        assert "A docs/b.txt (+1 lines)" in printed
+        assert result.created == ["docs/a.txt", "docs/b.txt"]
+        assert read_tree(output) == {"src/app.py": "print('old')\n"}
+
+
+class TestUnsafePaths:
+    """Test that documents are never written outside the output directory"""
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_paths_leading_out_are_skipped(self, tmp_path: Path, max_workers: int):
+        outside = tmp_path / "outside.txt"
+        content = (
+            export_bundle(tmp_path / "project")
+            .replace("docs/a.txt", "../x")
+            .replace("docs/b.txt", str(outside))
+        )
+        output = tmp_path / "output"
+
+        result = unbundle(io.StringIO(content), output, max_workers=max_workers)
+
+        assert result.rejected == ["../x", str(outside)]
+        assert result.created == ["src/app.py"]
+        assert not (tmp_path / "x").exists() and not outside.exists()
+        assert read_tree(output) == {"src/app.py": CONTENTS["src/app.py"]}
+
+
+class TestCliUnbundle:
+    """Test reading the bundle from a file or a pipe without prompting"""
+
+    def test_reads_input_file(self, tmp_path: Path):
+        bundle_file = tmp_path / "response.xml"
+        bundle_file.write_text(export_bundle(tmp_path / "project"), encoding="utf-8")
+
+        cli_unbundle(tmp_path / "output", str(bundle_file))
+
+        assert read_tree(tmp_path / "output") == CONTENTS
+
+    def test_reads_piped_stdin(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(sys, "stdin", io.StringIO(export_bundle(tmp_path / "p", "jsonl")))
+
+        cli_unbundle(tmp_path / "output")
+
+        assert read_tree(tmp_path / "output") == CONTENTS